@@ -7,9 +7,17 @@ that Claude can act on in next session or ignores if nothing notable.
 """
 
 import json
+import os
 import subprocess
 import sys
-from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Heuristics, counted as matching lines in the changed files (lib/scan.py)
+PATTERNS = {
+    "error": r"try\s*{|catch\s*\(|\.catch\(",
+    "type": r"type\s+\w+\s*=|interface\s+\w+",
+}
 
 def get_recent_changes():
     """Get files changed in recent commits."""
@@ -22,21 +30,6 @@ def get_recent_changes():
     except:
         return []
 
-def count_pattern_occurrences(pattern: str, files: list[str]) -> int:
-    """Count how many times a pattern appears across files."""
-    count = 0
-    for f in files:
-        try:
-            result = subprocess.run(
-                ["rg", "-c", pattern, f],
-                capture_output=True, text=True, timeout=5
-            )
-            if result.stdout.strip():
-                count += int(result.stdout.strip())
-        except:
-            pass
-    return count
-
 def main():
     # Get context from stdin (Claude Code hook protocol)
     try:
@@ -44,24 +37,30 @@ def main():
     except:
         context = {}
 
-    # Check for recent changes
-    changed_files = get_recent_changes()
+    # Files this session changed (commits and uncommitted edits); recent
+    # commits for sessions without a recorded starting point
+    from lib.session_changes import changes
+    session = changes(context)
+    if session is not None:
+        changed_files = [os.path.join(session["worktree"], f) for f in session["files"]]
+    else:
+        changed_files = get_recent_changes()
 
     if not changed_files:
         # No recent work, nothing to codify
         sys.exit(0)
 
-    # Look for potential patterns (simple heuristics)
+    # Look for potential patterns (simple heuristics), one pass per file
+    from lib.scan import scan
+    counts = scan(changed_files, PATTERNS)
     suggestions = []
 
     # Check for repeated error handling patterns
-    error_count = count_pattern_occurrences(r"try\s*{|catch\s*\(|\.catch\(", changed_files)
-    if error_count >= 5:
+    if counts["error"] >= 5:
         suggestions.append("Multiple error handling blocks - consider extracting to utility")
 
     # Check for repeated type definitions
-    type_count = count_pattern_occurrences(r"type\s+\w+\s*=|interface\s+\w+", changed_files)
-    if type_count >= 5:
+    if counts["type"] >= 5:
         suggestions.append("Multiple type definitions added - consider consolidating")
 
     # If we found patterns worth noting, add to staging
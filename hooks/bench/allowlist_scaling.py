@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Allowlist scaling for permission-auto-approve's is_safe_bash.
+
+Times typical Bash commands (hits and misses) against the real
+SAFE_BASH_COMMANDS grown with generated entries, two ways:
+- linear: every NEVER_APPROVE regex, then every safe regex (the old loop)
+- indexed: NEVER_APPROVE as one alternation, then only the safe patterns
+  in the command's SafeCommandIndex buckets
+
+Generated entries look like the real ones: plain tools (`^tool0042\\b`),
+git/gh/npm subcommands and subcommand alternations. None of them match
+the commands, so the linear scan pays for every one.
+
+Fails (exit 1) when indexed time at the largest allowlist exceeds --flat
+times its time at the real one.
+
+Usage:
+  python3 hooks/bench/allowlist_scaling.py [--calls 2000] [--runs 5] [--flat 1.5]
+"""
+import argparse
+import importlib.util
+import os
+import re
+import sys
+import time
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXTRA_ENTRIES = (0, 100, 300, 900)
+
+COMMANDS = [
+    "git status --short",
+    "git log --oneline -20",
+    "ls -la src",
+    "rg -n 'TODO' src",
+    "npm ls --depth 0",
+    "gh pr view 123 --json title",
+    "cat package.json | jq .scripts",
+    "pnpm install --frozen-lockfile",   # miss
+    "make build",                       # miss
+    "git push origin feature",          # miss
+]
+
+
+def load_hook(name: str):
+    spec = importlib.util.spec_from_file_location(
+        name.replace("-", "_"), os.path.join(HOOKS_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_entries(count: int) -> list[str]:
+    shapes = (
+        lambda i: rf"^tool{i:04d}\b",
+        lambda i: rf"^git\s+sub{i:04d}",
+        lambda i: rf"^gh\s+area{i:04d}\s+(view|list)",
+        lambda i: rf"^npm\s+(cmd{i:04d}|alt{i:04d})",
+    )
+    return [shapes[i % len(shapes)](i) for i in range(count)]
+
+
+def per_call_us(fn, calls: int, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        for i in range(calls):
+            fn(COMMANDS[i % len(COMMANDS)])
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--flat", type=float, default=1.5,
+                        help="max indexed slowdown from the real allowlist to the largest")
+    args = parser.parse_args()
+
+    hook = load_hook("permission-auto-approve")
+    deny = [re.compile(p, re.IGNORECASE | re.MULTILINE) for p in hook.NEVER_APPROVE]
+
+    print(f"{'allowlist':>9} {'linear us':>10} {'indexed us':>11}")
+    indexed_us = []
+    for extra in EXTRA_ENTRIES:
+        patterns = hook.SAFE_BASH_COMMANDS + make_entries(extra)
+        safe = [re.compile(p, re.IGNORECASE) for p in patterns]
+        index = hook.SafeCommandIndex(patterns)
+
+        def linear(cmd):
+            if any(p.search(cmd) for p in deny):
+                return False
+            return any(p.match(cmd.strip()) for p in safe)
+
+        def indexed(cmd):
+            if hook.NEVER_APPROVE_ANY.search(cmd):
+                return False
+            return index.match(cmd.strip())
+
+        for cmd in COMMANDS:
+            assert linear(cmd) == indexed(cmd), cmd
+        lin = per_call_us(linear, args.calls, args.runs)
+        idx = per_call_us(indexed, args.calls, args.runs)
+        indexed_us.append(idx)
+        print(f"{len(patterns):9} {lin:10.2f} {idx:11.2f}")
+
+    ratio = indexed_us[-1] / indexed_us[0]
+    print(f"\nindexed: {ratio:.2f}x from {len(hook.SAFE_BASH_COMMANDS)} to "
+          f"{len(hook.SAFE_BASH_COMMANDS) + EXTRA_ENTRIES[-1]} entries (limit {args.flat}x)")
+    if ratio > args.flat:
+        print("FAIL: indexed lookup grows with the allowlist")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
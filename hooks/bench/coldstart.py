@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Cold-start budget harness for hooks.
+
+Runs every hooks/*.py as Claude Code would (fresh interpreter, payload on
+stdin) under `-X importtime` and reports, per hook:
+
+- wall time of a full run (best of --runs), minus the interpreter floor
+  (`python3 -c "import json, sys"`)
+- import time and the modules imported beyond that floor
+
+Two payloads per hook:
+- noop: a tool/event the hook ignores. Must import nothing beyond json and
+  sys (modules the floor already loads, like re and os, are free).
+- work: a representative payload that exercises the real path.
+
+Fails (exit 1) when a hook's work-path time exceeds its budget, or when its
+noop path imports extra modules.
+
+Usage:
+  python3 hooks/bench/coldstart.py [--runs 5] [--scale 1.0] [hook-name ...]
+
+Budgets are milliseconds over the interpreter floor, so they hold across
+machines of different speeds. --scale multiplies all budgets (slow CI).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Long-running processes and build tools, not hooks
+NOT_HOOKS = {"hook-daemon.py", "gen-settings.py"}
+
+DEFAULT_BUDGET_MS = 30
+
+# Hooks whose real path forks external tools get a larger allowance
+BUDGET_MS = {
+    "session-health-check": 250,   # df, sysctl, pgrep
+    "auto-codify": 150,            # git diff (outside a repo here)
+    "knowledge-extraction-reminder": 150,
+    "commit-reminder": 100,        # git status
+    "stop-quality-gate": 60,
+    "hook-client": 80,             # socket + in-process fallback
+    "dispatch": 60,                # loads every Bash guard
+}
+
+BASH = {"hook_event_name": "PreToolUse", "tool_name": "Bash",
+        "tool_input": {"command": "git status && ls -la src/"}}
+EDIT = {"hook_event_name": "PreToolUse", "tool_name": "Edit",
+        "tool_input": {"file_path": "src/app.ts", "old_string": "a", "new_string": "const b = 1;\n"}}
+POST_EDIT = {**EDIT, "hook_event_name": "PostToolUse", "tool_response": {}}
+STOP = {"hook_event_name": "Stop", "stop_hook_active": False}
+SESSION_START = {"hook_event_name": "SessionStart", "source": "startup"}
+NOOP = {"hook_event_name": "PreToolUse", "tool_name": "NoSuchTool", "tool_input": {}}
+
+# hook name -> work payload. Hooks not listed get BASH.
+WORK_PAYLOADS = {
+    "billing-security-guard": EDIT,
+    "check-todo-quality": {**EDIT, "tool_input": {"file_path": "TODO.md", "new_string": "- [ ] ship it"}},
+    "codex-post-feedback": POST_EDIT,
+    "commit-reminder": POST_EDIT,
+    "delegation-guard": EDIT,
+    "exclusion-guard": EDIT,
+    "portable-code-guard": EDIT,
+    "qmd-auto-index": POST_EDIT,
+    "auto-codify": STOP,
+    "knowledge-extraction-reminder": STOP,
+    "stop-quality-gate": STOP,
+    "codex-session-init": SESSION_START,
+    "session-health-check": SESSION_START,
+    "time-context": SESSION_START,
+    "tdd-reminder": EDIT,
+}
+
+# hook-client always talks to the daemon, so its noop path needs socket,
+# plus the checks on the socket's directory and peer
+CLIENT_IMPORTS = {"socket", "_socket", "selectors", "select", "array", "math",
+                  "errno", "collections.abc", "struct", "_struct", "lib", "lib.statedir"}
+
+# Hooks that always do their work (Stop/SessionStart): no noop path to check
+NO_NOOP_PATH = {
+    "auto-codify", "knowledge-extraction-reminder", "stop-quality-gate",
+    "codex-session-init", "session-health-check", "time-context",
+}
+
+
+def discover_hooks(names: list[str]) -> list[str]:
+    hooks = sorted(
+        f[:-3] for f in os.listdir(HOOKS_DIR)
+        if f.endswith(".py") and f not in NOT_HOOKS
+    )
+    if names:
+        hooks = [h for h in hooks if h in names]
+    return hooks
+
+
+def parse_importtime(stderr: str) -> tuple[set[str], float]:
+    """Return (imported module names, total import ms) from -X importtime."""
+    modules, total_us = set(), 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        try:
+            self_us = int(parts[0].split(":")[1])
+        except ValueError:
+            continue  # header line
+        total_us += self_us
+        modules.add(parts[2].strip())
+    return modules, total_us / 1000
+
+
+def run_once(argv: list[str], payload: dict, cwd: str, env: dict) -> tuple[float, set[str], float]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        input=json.dumps({**payload, "cwd": cwd}),
+        capture_output=True, text=True, cwd=cwd, env=env, timeout=60,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    modules, import_ms = parse_importtime(result.stderr)
+    return wall_ms, modules, import_ms
+
+
+def measure(argv: list[str], payload: dict, runs: int, cwd: str, env: dict) -> dict:
+    walls, modules, imports = [], set(), []
+    for _ in range(runs):
+        wall, mods, imp = run_once(argv, payload, cwd, env)
+        walls.append(wall)
+        imports.append(imp)
+        modules |= mods
+    # Best-of-N: scheduler noise only ever adds time
+    return {
+        "wall_ms": min(walls),
+        "import_ms": min(imports),
+        "modules": modules,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("hooks", nargs="*", help="hook names (default: all)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="budget multiplier")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Isolated HOME and cwd: no user config, not a git repo, no project
+        env = {**os.environ, "HOME": tmp, "CLAUDE_HOOKD_IDLE_TIMEOUT": "1"}
+        floor = measure(["-c", "import json, sys"], {}, args.runs, tmp, env)
+
+        failures = []
+        print(f"interpreter floor: {floor['wall_ms']:.1f} ms "
+              f"({floor['import_ms']:.1f} ms imports)\n")
+        print(f"{'hook':34} {'work ms':>8} {'budget':>7} {'noop ms':>8}  extra noop imports")
+
+        for hook in discover_hooks(args.hooks):
+            script = os.path.join(HOOKS_DIR, f"{hook}.py")
+            budget = BUDGET_MS.get(hook, DEFAULT_BUDGET_MS) * args.scale
+
+            work = measure([script], WORK_PAYLOADS.get(hook, BASH), args.runs, tmp, env)
+            work_ms = work["wall_ms"] - floor["wall_ms"]
+            if work_ms > budget:
+                failures.append(f"{hook}: {work_ms:.1f} ms over floor (budget {budget:.0f} ms)")
+
+            noop_col, extra = "-", []
+            if hook not in NO_NOOP_PATH:
+                noop = measure([script], NOOP, args.runs, tmp, env)
+                noop_col = f"{noop['wall_ms'] - floor['wall_ms']:.1f}"
+                # hook-client legitimately needs socket to reach the daemon
+                allowed = floor["modules"] | (CLIENT_IMPORTS if hook == "hook-client" else set())
+                extra = sorted(noop["modules"] - allowed)
+                if extra:
+                    failures.append(f"{hook}: noop path imports {', '.join(extra)}")
+
+            print(f"{hook:34} {work_ms:8.1f} {budget:7.0f} {noop_col:>8}  {' '.join(extra)}")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nAll hooks within budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
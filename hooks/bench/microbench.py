@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the pure functions on the per-call hot path.
+
+Each function runs over generated inputs from 100 B to 10 MB, in the shapes
+that stall sessions: multi-megabyte heredocs, long quoted commit messages,
+long compound command chains and large Write contents.
+
+Fails (exit 1) when either:
+- throughput at >= 100 KB drops below the function's floor (MB/s), or
+- time grows superlinearly: between consecutive sizes >= 100 KB, the
+  scaling exponent log(t2/t1) / log(n2/n1) exceeds --max-exponent.
+
+Sizes from 100 KB up are timed --large-runs times and the median is
+asserted, so a single noisy run doesn't fail the exponent check.
+
+Usage:
+  python3 hooks/bench/microbench.py [--runs 3] [--large-runs 5] [--max-size 10M]
+      [--scale 1.0] [function ...]
+
+--scale multiplies every floor (e.g. 0.5 on a slow machine).
+"""
+import argparse
+import importlib.util
+import math
+import os
+import sys
+import time
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HOOKS_DIR)
+
+SIZES = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Throughput and exponent are only judged from here up; below it, fixed
+# per-call overhead dominates
+ASSERT_FROM = 100_000
+
+
+def load_hook(name: str):
+    spec = importlib.util.spec_from_file_location(
+        name.replace("-", "_"), os.path.join(HOOKS_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def fill(unit: str, size: int) -> str:
+    """Repeat unit to exactly size characters."""
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+# --- input shapes: size -> string -------------------------------------------
+
+def heredoc_command(size: int) -> str:
+    body = fill('print("hello | world")  # rm -rf "$HOME"\n', size)
+    return f"cat <<'EOF' > script.py\n{body}\nEOF\npython3 script.py"
+
+
+def quoted_message(size: int) -> str:
+    return f'git commit -m "{fill("fix: drop rm -rf; git reset --hard docs ", size)}"'
+
+
+def command_chain(size: int) -> str:
+    return fill("cd src && ls -la | grep -v node_modules; ", size).rstrip("; &|")
+
+
+def read_pipeline(size: int) -> str:
+    return fill("curl -s https://api.example.com/items | jq -r .name; ", size)
+
+
+def env_set_command(size: int) -> str:
+    filler = fill("OTHER_VAR=value ", size)
+    return f'npx convex env set --prod {filler}STRIPE_SECRET_KEY "sk_live_{"a" * 24}"'
+
+
+def source_file(size: int) -> str:
+    return fill("export function add(a: number, b: number): number {\n  return a + b;\n}\n", size)
+
+
+def test_file(size: int) -> str:
+    return fill('describe("add", () => {\n  it("adds", () => { try { add(1, 2) } catch (e) {} });\n});\n', size)
+
+
+# --- benchmarked functions --------------------------------------------------
+
+def targets() -> dict:
+    from lib import shell
+    from lib.scan import Scanner
+    destructive = load_hook("destructive-command-guard")
+    approve = load_hook("permission-auto-approve")
+    billing = load_hook("billing-security-guard")
+    exclusion = load_hook("exclusion-guard")
+    destructive.get_current_branch = lambda: "feature/bench"
+    scanner = Scanner(load_hook("knowledge-extraction-reminder").PATTERNS)
+
+    def uncached(fn):
+        # parse() is memoized; every timed call must do the real work
+        def call(arg):
+            shell.parse.cache_clear()
+            return fn(arg)
+        return call
+
+    # name -> (callable on one str, [(shape, floor MB/s)]). Floors sit ~3x
+    # under a 1-CPU dev box, so only real regressions trip them.
+    return {
+        "strip_quoted_content": (
+            uncached(destructive.strip_quoted_content),
+            [(heredoc_command, 30), (quoted_message, 30), (command_chain, 0.5)]),
+        "destructive.check_command": (
+            uncached(destructive.check_command),
+            [(heredoc_command, 8), (quoted_message, 3), (command_chain, 0.3)]),
+        "is_safe_bash": (
+            approve.is_safe_bash,
+            [(read_pipeline, 1.5), (command_chain, 1.5)]),
+        "check_env_mode_mismatch": (
+            billing.check_env_mode_mismatch,
+            [(env_set_command, 100), (heredoc_command, 8)]),
+        "detect_pattern": (
+            lambda content: exclusion.detect_pattern("src/math.ts", content),
+            [(source_file, 2.5)]),
+        "Scanner.count": (
+            lambda content: scanner.count(content.encode()),
+            [(source_file, 8), (test_file, 6)]),
+    }
+
+
+def timings(fn, arg, runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def best_seconds(fn, arg, runs: int) -> float:
+    return min(timings(fn, arg, runs))
+
+
+def median_seconds(fn, arg, runs: int) -> float:
+    """Median of runs: one noisy run at a large size can't fake superlinearity."""
+    import statistics
+    return statistics.median(timings(fn, arg, runs))
+
+
+def parse_size(text: str) -> int:
+    multiplier = {"K": 1_000, "M": 1_000_000}.get(text[-1:].upper(), 1)
+    return int(text.rstrip("kKmM")) * multiplier
+
+
+def fmt_size(size: int) -> str:
+    for unit, div in (("MB", 1_000_000), ("KB", 1_000)):
+        if size >= div:
+            return f"{size // div}{unit}"
+    return f"{size}B"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("functions", nargs="*", help="function names (default: all)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--large-runs", type=int, default=5,
+                        help="runs per size from 100KB up (median is asserted)")
+    parser.add_argument("--max-size", default="10M")
+    parser.add_argument("--scale", type=float, default=1.0, help="floor multiplier")
+    parser.add_argument("--max-exponent", type=float, default=1.35,
+                        help="largest allowed scaling exponent between sizes")
+    args = parser.parse_args()
+
+    sizes = [s for s in SIZES if s <= parse_size(args.max_size)]
+    failures = []
+    print(f"{'function / shape':46} " + " ".join(f"{fmt_size(s):>9}" for s in sizes))
+
+    for name, (fn, shapes) in targets().items():
+        if args.functions and name not in args.functions:
+            continue
+        for shape, floor in shapes:
+            floor *= args.scale
+            label = f"{name} / {shape.__name__}"
+            cells, prev = [], None
+            for size in sizes:
+                text = shape(size)
+                if size >= ASSERT_FROM:
+                    seconds = median_seconds(fn, text, args.large_runs)
+                else:
+                    seconds = best_seconds(fn, text, args.runs)
+                mb_s = len(text) / 1e6 / max(seconds, 1e-9)
+                cells.append(f"{mb_s:8.1f}M" if size >= ASSERT_FROM else f"{seconds * 1e6:7.0f}us")
+                if size >= ASSERT_FROM:
+                    if mb_s < floor:
+                        failures.append(f"{label} @ {fmt_size(size)}: {mb_s:.2f} MB/s < floor {floor:.2f}")
+                    if prev and prev[1] > 1e-4:
+                        exponent = math.log(seconds / prev[1]) / math.log(len(text) / prev[0])
+                        if exponent > args.max_exponent:
+                            failures.append(
+                                f"{label} {fmt_size(prev[0])}->{fmt_size(size)}: "
+                                f"superlinear (exponent {exponent:.2f})")
+                    prev = (len(text), seconds)
+            print(f"{label:46} " + " ".join(f"{c:>9}" for c in cells))
+
+    print("\nus = per-call time below 100KB; M = MB/s from 100KB up")
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("All functions above their floors and linear.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
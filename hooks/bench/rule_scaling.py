@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Rule-count scaling for destructive-command-guard's substring matching.
+
+Times one scan of a multi-kilobyte generated script against growing rule
+tables, two ways:
+- naive: one `in` scan per rule (the old check_command loops)
+- automaton: lib.multipattern.MultiPattern's Aho-Corasick pass, forced
+- MultiPattern: as used, naive below NAIVE_BELOW rules, automaton above
+
+Rules look like the real tables (git/gh subcommands, long flags) and none of
+them occur in the text, so every rule is fully scanned: the worst case.
+
+Fails (exit 1) when automaton time at the largest table exceeds --flat times
+its time at the smallest, or when MultiPattern is more than --slack times
+slower than the faster of the two at any table size (NAIVE_BELOW is off).
+
+Usage:
+  python3 hooks/bench/rule_scaling.py [--kb 256] [--runs 5] [--flat 2.0] [--slack 1.5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lib.multipattern import NAIVE_BELOW, MultiPattern  # noqa: E402
+
+RULE_COUNTS = (10, 30, 100, 300, 1000)
+
+SCRIPT_LINES = [
+    "set -euo pipefail",
+    'cd "$(git rev-parse --show-toplevel)"',
+    "git status --porcelain | while read -r status file; do",
+    '  echo "checking $file" >> /tmp/build.log',
+    "done",
+    "pnpm install --frozen-lockfile && pnpm build",
+    "gh pr view --json number,title | jq -r .title",
+    "npx vitest run --reporter=dot --coverage",
+]
+
+
+def make_rules(count: int) -> list[str]:
+    prefixes = ("git ", "gh ", "--")
+    return [f"{prefixes[i % 3]}rule{i:05d}-zq" for i in range(count)]
+
+
+def make_text(kb: int) -> str:
+    block = "\n".join(SCRIPT_LINES) + "\n"
+    return block * (kb * 1024 // len(block) + 1)
+
+
+def best_ms(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--kb", type=int, default=256, help="script size")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--flat", type=float, default=2.0,
+                        help="max automaton slowdown from smallest to largest table")
+    parser.add_argument("--slack", type=float, default=1.5,
+                        help="max MultiPattern slowdown versus the faster approach")
+    args = parser.parse_args()
+
+    text = make_text(args.kb)
+    print(f"text: {len(text) / 1024:.0f} KB\n")
+    print(f"{'rules':>6} {'naive ms':>10} {'automaton ms':>13} {'MultiPattern ms':>16}")
+
+    automaton_ms, failures = [], []
+    for count in RULE_COUNTS:
+        rules = make_rules(count)
+        automaton = MultiPattern(rules, naive_below=0)
+        matcher = MultiPattern(rules)
+        assert not automaton.search(text) and not matcher.search(text)
+        naive = best_ms(lambda: [r for r in rules if r in text], args.runs)
+        auto = best_ms(lambda: automaton.search(text), args.runs)
+        used = best_ms(lambda: matcher.search(text), args.runs)
+        automaton_ms.append(auto)
+        print(f"{count:6} {naive:10.2f} {auto:13.2f} {used:16.2f}")
+        if used > args.slack * min(naive, auto):
+            failures.append(f"MultiPattern at {count} rules: {used:.2f} ms, "
+                            f"{args.slack}x the faster approach is {args.slack * min(naive, auto):.2f} ms")
+
+    growth = automaton_ms[-1] / automaton_ms[0]
+    print(f"\nautomaton growth {RULE_COUNTS[0]} -> {RULE_COUNTS[-1]} rules: {growth:.2f}x "
+          f"(NAIVE_BELOW = {NAIVE_BELOW})")
+    if growth > args.flat:
+        failures.append(f"automaton growth exceeds {args.flat}x")
+    if failures:
+        print("FAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
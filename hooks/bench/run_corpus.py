@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Payload-corpus benchmark for hooks.
+
+Replays the checked-in payload corpus (bench/corpus/*.json) through every
+hook that handles each event, in two modes:
+
+- subprocess: fresh `python3 hook.py` per payload, as Claude Code runs it
+- inprocess:  module loaded once, main() called per payload (what the
+              dispatcher/daemon pay), plus tracemalloc peak memory
+
+Reports p50/p95/p99 latency, throughput and peak memory per hook, and
+writes everything to a JSON file so runs can be compared across commits.
+
+Runs offline: git, stripe, curl, rg, gh, vercel, pnpm, ... resolve to stub
+scripts generated in a temp dir, and hooks run with a temp HOME and cwd.
+
+Corpus entries are {"name", "payload"}. Payload strings may use
+{"$repeat": str, "times": n} and {"$join": [parts]} to describe large
+inputs without checking them in.
+
+Usage:
+  python3 hooks/bench/run_corpus.py [--mode both|subprocess|inprocess]
+      [--iterations 20] [--output results.json] [--compare old.json] [hook ...]
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+HOOKS_DIR = os.path.dirname(BENCH_DIR)
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Event each hook is registered for, from the hook manifest. dispatch and
+# tdd-reminder aren't registered directly but are still worth timing.
+UNREGISTERED_EVENTS = {"dispatch": ["PreToolUse"], "tdd-reminder": ["PostToolUse"]}
+
+
+def load_hook_events() -> dict[str, list[str]]:
+    with open(os.path.join(HOOKS_DIR, "manifest.json")) as f:
+        manifest = json.load(f)["hooks"]
+    events = {}
+    for hook in manifest:
+        events.setdefault(hook["name"], []).append(hook["event"])
+    return {**events, **UNREGISTERED_EVENTS}
+
+
+HOOK_EVENTS = load_hook_events()
+
+# Stub executables: name -> shell body. Everything network- or repo-bound
+# answers instantly with canned output.
+STUBS = {
+    "git": """case "$1 $2" in
+  "branch --show-current") echo feature/bench ;;
+  "rev-parse --is-inside-work-tree") echo true ;;
+  "status --porcelain") printf ' M src/app.ts\\n M src/lib.ts\\n' ;;
+  "diff --name-only") printf 'src/app.ts\\nsrc/lib.ts\\n' ;;
+esac""",
+    # Webhook probes hit the discard port on loopback: refused at once, offline
+    "stripe": """echo '{"data": [{"url": "https://127.0.0.1:9/api/webhooks/stripe"}, {"url": "https://127.0.0.1:9/api/stripe"}]}'""",
+    "rg": "echo 3",
+    "df": """echo 'Filesystem Size Used Avail Capacity Mounted'; echo 'disk 500G 250G 250G 50% /'""",
+    "sysctl": "echo 'vm.swapusage: total = 2048.00M  used = 512.00M  free = 1536.00M'",
+    "pgrep": "exit 1",
+}
+NOOP_STUBS = ["curl", "gh", "vercel", "npx", "pnpm", "npm", "wget", "pyright", "ruff",
+              "pytest", "cargo", "go", "qmd", "tsc", "eslint"]
+
+
+def expand(value):
+    """Expand $repeat/$join directives in corpus payloads."""
+    if isinstance(value, dict):
+        if "$repeat" in value:
+            return expand(value["$repeat"]) * value["times"]
+        if "$join" in value:
+            return "".join(expand(part) for part in value["$join"])
+        return {k: expand(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [expand(v) for v in value]
+    return value
+
+
+def load_corpus() -> dict[str, list[dict]]:
+    """Return event name -> list of {"name", "payload"}."""
+    corpus: dict[str, list[dict]] = {}
+    for filename in sorted(os.listdir(CORPUS_DIR)):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(CORPUS_DIR, filename)) as f:
+            for entry in json.load(f):
+                payload = expand(entry["payload"])
+                corpus.setdefault(payload["hook_event_name"], []).append(
+                    {"name": entry["name"], "payload": payload}
+                )
+    return corpus
+
+
+def make_sandbox(root: str) -> dict:
+    """Create stub bin dir, HOME and project cwd. Returns env for hooks."""
+    bin_dir = os.path.join(root, "bin")
+    home = os.path.join(root, "home")
+    cwd = os.path.join(root, "project")
+    for d in (bin_dir, home, cwd):
+        os.makedirs(d)
+    for name in [*STUBS, *NOOP_STUBS]:
+        path = os.path.join(bin_dir, name)
+        with open(path, "w") as f:
+            f.write(f"#!/bin/sh\n{STUBS.get(name, 'exit 0')}\nexit 0\n")
+        os.chmod(path, 0o755)
+    # A Stripe-integrated project so deploy checks take their full path
+    with open(os.path.join(cwd, ".env.local"), "w") as f:
+        f.write("STRIPE_SECRET_KEY=\nNEXT_PUBLIC_STRIPE_PUBLISHABLE_KEY=\n")
+    return {
+        **os.environ,
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        "HOME": home,
+        "CLAUDE_BENCH_CWD": cwd,
+    }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies_ms: list[float], payload_bytes: int) -> dict:
+    values = sorted(latencies_ms)
+    total_s = sum(values) / 1000
+    return {
+        "runs": len(values),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if values else 0,
+        "calls_per_s": round(len(values) / total_s, 1) if total_s else 0,
+        "mb_per_s": round(payload_bytes / 1e6 / total_s, 2) if total_s else 0,
+    }
+
+
+def run_subprocess(script: str, payloads: list[str], iterations: int, env: dict) -> dict:
+    latencies, total_bytes = [], 0
+    for raw in payloads:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, script], input=raw, capture_output=True,
+                           text=True, cwd=env["CLAUDE_BENCH_CWD"], env=env, timeout=120)
+            latencies.append((time.perf_counter() - start) * 1000)
+            total_bytes += len(raw)
+    return summarize(latencies, total_bytes)
+
+
+@contextlib.contextmanager
+def hook_environment(env: dict):
+    """Point PATH/HOME/cwd at the sandbox while running hooks in-process."""
+    saved_env, saved_cwd = dict(os.environ), os.getcwd()
+    os.environ.update(env)
+    os.chdir(env["CLAUDE_BENCH_CWD"])
+    try:
+        yield
+    finally:
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+
+def call_main(module, script: str, raw: str) -> None:
+    """Run one hook invocation in-process with payload on stdin."""
+    saved = sys.stdin, sys.stdout, sys.stderr
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(raw), io.StringIO(), io.StringIO()
+    try:
+        if module is not None:
+            module.main()
+        else:
+            # Hook does its work at import time: re-execute it
+            load_module(script)
+    except SystemExit:
+        pass
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved
+
+
+def load_module(script: str):
+    name = "bench_" + os.path.basename(script)[:-3].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_inprocess(script: str, payloads: list[str], iterations: int, env: dict) -> dict:
+    with hook_environment(env):
+        try:
+            module = load_module(script)
+            if not hasattr(module, "main"):
+                module = None
+        except SystemExit:
+            module = None
+
+        latencies, total_bytes = [], 0
+        for raw in payloads:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                call_main(module, script, raw)
+                latencies.append((time.perf_counter() - start) * 1000)
+                total_bytes += len(raw)
+
+        # Separate pass: tracemalloc slows allocation-heavy code a lot
+        peak = 0
+        for raw in payloads:
+            tracemalloc.start()
+            call_main(module, script, raw)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    result = summarize(latencies, total_bytes)
+    result["peak_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HOOKS_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or "unknown"
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+
+
+def print_table(results: dict, baseline: dict | None) -> None:
+    print(f"{'hook':32} {'mode':10} {'p50':>8} {'p95':>8} {'p99':>8} {'calls/s':>9} {'peak KB':>9}")
+    for hook, modes in results["hooks"].items():
+        for mode, r in modes.items():
+            line = (f"{hook:32} {mode:10} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} "
+                    f"{r['p99_ms']:8.2f} {r['calls_per_s']:9.1f} {r.get('peak_kb', ''):>9}")
+            old = (baseline or {}).get("hooks", {}).get(hook, {}).get(mode)
+            if old and old["p50_ms"]:
+                line += f"  p50 {(r['p50_ms'] / old['p50_ms'] - 1) * 100:+.0f}%"
+            print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("hooks", nargs="*", help="hook names (default: all)")
+    parser.add_argument("--mode", choices=["both", "subprocess", "inprocess"], default="both")
+    parser.add_argument("--iterations", type=int, default=5, help="runs per payload (in-process)")
+    parser.add_argument("--subprocess-iterations", type=int, default=1, help="runs per payload (subprocess)")
+    parser.add_argument("--output", help="results JSON (default: bench/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to diff p50 against")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    hooks = [h for h in HOOK_EVENTS if not args.hooks or h in args.hooks]
+    commit = git_commit()
+    results = {"commit": commit, "timestamp": int(time.time()),
+               "python": sys.version.split()[0], "hooks": {}}
+
+    with tempfile.TemporaryDirectory() as root:
+        env = make_sandbox(root)
+        for hook in hooks:
+            script = os.path.join(HOOKS_DIR, f"{hook}.py")
+            payloads = [
+                json.dumps({**entry["payload"], "cwd": env["CLAUDE_BENCH_CWD"]})
+                for event in HOOK_EVENTS[hook] for entry in corpus.get(event, [])
+            ]
+            modes = {}
+            if args.mode in ("both", "subprocess"):
+                modes["subprocess"] = run_subprocess(script, payloads, args.subprocess_iterations, env)
+            if args.mode in ("both", "inprocess"):
+                modes["inprocess"] = run_inprocess(script, payloads, args.iterations, env)
+            results["hooks"][hook] = modes
+            print(f"  {hook} ({len(payloads)} payloads)", file=sys.stderr)
+
+    # Session-state hooks write /tmp files keyed on our PID
+    for suffix in (".json", ".log"):
+        with contextlib.suppress(OSError):
+            os.unlink(f"/tmp/claude-delegation-{os.getpid()}{suffix}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
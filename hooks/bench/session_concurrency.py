@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Concurrent-update load test for lib/session_store.py.
+
+Parallel tool calls run delegation-guard once per edit, all at the same
+time, against one session's state. Two rounds:
+- hooks: --workers delegation-guard processes, one Edit/Write payload each,
+  released together
+- store: --workers processes calling SessionStore.record_edit --edits times
+  each, with compaction every --compact-after lines so snapshots are
+  rewritten while others append
+
+Fails (exit 1) when the final metrics lose any update (files, directories,
+new files, lines) or when any single record_edit waits longer than
+--max-wait-ms for the lock.
+
+Usage:
+  python3 hooks/bench/session_concurrency.py [--workers 32] [--edits 50]
+      [--compact-after 16] [--max-wait-ms 500]
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HOOKS_DIR)
+from lib import session_store  # noqa: E402
+
+# Runs in each store-round worker: wait for "go" on stdin, record edits,
+# print per-call lock waits
+WORKER = """
+import json, os, sys
+sys.path.insert(0, {hooks_dir!r})
+from lib import session_store
+session_store.STATE_PREFIX = {prefix!r}
+session_store.COMPACT_AFTER = {compact_after}
+worker, edits = {worker}, {edits}
+sys.stdin.read()
+waits = []
+for i in range(edits):
+    store = session_store.SessionStore({key!r})
+    store.record_edit(f"/repo/w{{worker}}/f{{i % 10}}.py", f"/repo/w{{worker}}",
+                      lines=worker + i, new_file=i == 0)
+    waits.append(store.lock_wait)
+print(json.dumps(waits))
+"""
+
+
+def release(procs: list, payloads: list[str]) -> list[str]:
+    """Feed every process its stdin at once, then collect stdout."""
+    for proc, payload in zip(procs, payloads):
+        proc.stdin.write(payload)
+        proc.stdin.close()
+    outputs = [proc.stdout.read() for proc in procs]
+    for proc in procs:
+        proc.wait()
+    return outputs
+
+
+def check(label: str, stats, expected: dict) -> list[str]:
+    actual = {
+        "files": stats.num_files if stats else 0,
+        "directories": stats.num_dirs if stats else 0,
+        "new_files": stats.new_files_created if stats else 0,
+        "lines": stats.total_lines_added if stats else 0,
+    }
+    print(f"{label:6} " + "  ".join(f"{k}={actual[k]}/{expected[k]}" for k in expected))
+    return [f"{label}: {k} {actual[k]} != {expected[k]} (lost updates)"
+            for k in expected if actual[k] != expected[k]]
+
+
+def hook_round(workers: int) -> list[str]:
+    # Hooks key their state on the parent PID: this process
+    store = session_store.SessionStore(os.getpid())
+    store.reset()
+    env = dict(os.environ, HOME=tempfile.mkdtemp())   # default delegation config
+    procs = [
+        subprocess.Popen([sys.executable, os.path.join(HOOKS_DIR, "delegation-guard.py")],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                         stderr=subprocess.DEVNULL, text=True, env=env)
+        for _ in range(workers)
+    ]
+    payloads, lines = [], 0
+    for i in range(workers):
+        content = "x\n" * (i + 1)
+        lines += i + 1
+        tool = "Write" if i % 4 == 0 else "Edit"
+        field = "content" if tool == "Write" else "new_string"
+        payloads.append(json.dumps({
+            "hook_event_name": "PreToolUse", "tool_name": tool, "cwd": "/tmp",
+            "tool_input": {"file_path": f"/repo/d{i % 8}/f{i}.py", field: content},
+        }))
+    release(procs, payloads)
+    try:
+        stats = store.stats()
+        return check("hooks", stats, {
+            "files": workers, "directories": min(workers, 8),
+            "new_files": len(range(0, workers, 4)), "lines": lines,
+        })
+    finally:
+        cleanup(store)
+
+
+def store_round(workers: int, edits: int, compact_after: int, max_wait_ms: float) -> list[str]:
+    prefix = os.path.join(tempfile.mkdtemp(), "delegation-")
+    key = "bench"
+    procs = [
+        subprocess.Popen([sys.executable, "-c", WORKER.format(
+            hooks_dir=HOOKS_DIR, prefix=prefix, compact_after=compact_after,
+            worker=w, edits=edits, key=key)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for w in range(workers)
+    ]
+    outputs = release(procs, ["go"] * workers)
+
+    session_store.STATE_PREFIX = prefix
+    store = session_store.SessionStore(key)
+    stats = store.stats()
+    cleanup(store)
+
+    waits_ms = sorted(
+        w * 1000 for out in outputs if out.strip() for w in json.loads(out))
+    failures = check("store", stats, {
+        "files": workers * min(edits, 10), "directories": workers, "new_files": workers,
+        "lines": sum(w + i for w in range(workers) for i in range(edits)),
+    })
+    if len(waits_ms) != workers * edits:
+        failures.append(f"store: {workers * edits - len(waits_ms)} record_edit calls failed")
+    if waits_ms:
+        p50 = waits_ms[len(waits_ms) // 2]
+        p99 = waits_ms[min(len(waits_ms) - 1, len(waits_ms) * 99 // 100)]
+        print(f"lock wait per record_edit: p50 {p50:.2f} ms  p99 {p99:.2f} ms  "
+              f"max {waits_ms[-1]:.2f} ms")
+        if waits_ms[-1] > max_wait_ms:
+            failures.append(f"store: lock wait {waits_ms[-1]:.1f} ms > {max_wait_ms} ms")
+    return failures
+
+
+def cleanup(store) -> None:
+    for path in glob.glob(store.snapshot_path.removesuffix(".json") + ".*"):
+        os.unlink(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--edits", type=int, default=50, help="edits per store worker")
+    parser.add_argument("--compact-after", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    failures = hook_round(args.workers)
+    failures += store_round(args.workers, args.edits, args.compact_after, args.max_wait_ms)
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nNo lost updates.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Webhook redirect probes of stripe-deploy-reminder against a local stand-in.
+
+Serves, on 127.0.0.1:
+- /ok/<n>        200 after --delay ms
+- /redirect/<n>  308 to https://www.example.invalid/<n> after --delay ms
+- /hang/<n>      never answers
+
+and runs probe_urls over --urls endpoints (every fifth one redirecting)
+plus one hanging endpoint. Checks that:
+- every redirect is reported with its Location, and nothing else is
+- the hanging endpoint comes back unchecked (None), not as a pass or fail
+- the whole run finishes within the deadline (--deadline plus slack),
+  however slow the hanging endpoint is
+- each probe made exactly one request
+
+Usage:
+  python3 hooks/bench/webhook_probe.py [--urls 12] [--delay 300] [--deadline 2]
+"""
+import argparse
+import http.server
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SLACK = 0.5     # seconds allowed past the deadline
+
+
+def load_hook(name: str):
+    spec = importlib.util.spec_from_file_location(
+        name.replace("-", "_"), os.path.join(HOOKS_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class StandIn(http.server.BaseHTTPRequestHandler):
+    delay = 0.0
+    requests: dict[str, int] = {}
+    release = threading.Event()
+
+    def do_POST(self):
+        StandIn.requests[self.path] = StandIn.requests.get(self.path, 0) + 1
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if self.path.startswith("/hang/"):
+            StandIn.release.wait()
+            return
+        time.sleep(self.delay)
+        if self.path.startswith("/redirect/"):
+            self.send_response(308)
+            self.send_header("Location", "https://www.example.invalid/" + self.path.rsplit("/", 1)[1])
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--urls", type=int, default=12, help="endpoints besides the hanging one")
+    parser.add_argument("--delay", type=int, default=300, help="ms per response")
+    parser.add_argument("--deadline", type=float, default=2.0, help="seconds for all probes")
+    args = parser.parse_args()
+
+    hook = load_hook("stripe-deploy-reminder")
+    StandIn.delay = args.delay / 1000
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    urls = [f"{base}/{'redirect' if i % 5 == 0 else 'ok'}/{i}" for i in range(args.urls)]
+    urls.append(f"{base}/hang/0")
+
+    start = time.perf_counter()
+    results = hook.probe_urls(urls, args.deadline)
+    elapsed = time.perf_counter() - start
+    sequential = args.urls * args.delay / 1000 + hook.PROBE_TIMEOUT
+    StandIn.release.set()
+
+    failures = []
+    for url in urls:
+        kind, n = url.rsplit("/", 2)[1:]
+        result = results[url]
+        if kind == "hang":
+            expected = None
+        elif kind == "redirect":
+            expected = (True, f"https://www.example.invalid/{n}")
+        else:
+            expected = (False, None)
+        if result != expected:
+            failures.append(f"{url}: got {result}, expected {expected}")
+    repeated = {path: n for path, n in StandIn.requests.items() if n != 1}
+    if repeated:
+        failures.append(f"paths requested more than once: {repeated}")
+    if elapsed > args.deadline + SLACK:
+        failures.append(f"took {elapsed:.2f}s, deadline {args.deadline}s")
+
+    print(f"endpoints: {len(urls)} ({args.urls // 5 + (args.urls % 5 > 0)} redirecting, 1 hanging), "
+          f"{args.delay} ms per response, {hook.PROBE_WORKERS} workers")
+    print(f"probe_urls: {elapsed:.2f}s (one by one with curl: >= {sequential:.1f}s)")
+    server.shutdown()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
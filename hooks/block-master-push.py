@@ -5,10 +5,75 @@ Exit 0 + JSON with permissionDecision: "deny" = block the command
 Exit 0 + no output = allow the command
 """
 import json
-import re
-import subprocess
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_current_branch() -> str | None:
+    """Get current git branch name, or None if it can't be determined."""
+    from lib.git import current_branch
+    return current_branch()
+
+
+# git push options whose value is the next argument (--opt=value forms
+# are single tokens and skipped like any other option)
+VALUE_OPTIONS = {"-o", "--push-option", "--repo", "--receive-pack", "--exec"}
+
+
+def push_destinations(args: list[str]) -> list[str | None]:
+    """Branch each explicit refspec pushes to; None where only implied."""
+    positional, remote_given = [], False
+    args = iter(args)
+    for arg in args:
+        option = arg.split("=", 1)[0]
+        if option == "--repo":
+            remote_given = True
+        if arg in VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith("-"):
+            positional.append(arg)
+    # The first positional is the remote, unless --repo named it
+    refspecs = positional if remote_given else positional[1:]
+    destinations = []
+    for refspec in refspecs:
+        dst = refspec.lstrip("+").split(":")[-1]
+        destinations.append(dst.removeprefix("refs/heads/") if dst != "HEAD" else None)
+    return destinations or [None]
+
+
+def check_command(cmd: str) -> tuple[bool, str]:
+    """
+    Check if command pushes to master/main.
+    Returns (should_block, reason).
+    """
+    if not cmd or "push" not in cmd:
+        return False, ""
+
+    from lib.shell import parse, git_subcommand
+    pushes = [
+        args for subcommand, args in map(git_subcommand, parse(cmd).segments)
+        if subcommand == "push"
+    ]
+    ambiguous = False
+    for args in pushes:
+        # Explicit destination: git push origin master / git push origin HEAD:main,
+        # in any position: git push origin feature main
+        destinations = push_destinations(args)
+        if any(dst in ("master", "main") for dst in destinations):
+            return True, "Direct push to master/main is prohibited."
+        ambiguous = ambiguous or None in destinations
+
+    # Ambiguous destination (git push / git push origin / git push origin HEAD):
+    # resolve via current branch
+    if ambiguous:
+        branch = get_current_branch()
+        if branch in ("master", "main"):
+            return True, f"Current branch is '{branch}' — direct push to master/main is prohibited."
+
+    return False, ""
+
 
 def deny(reason: str) -> None:
     output = {
@@ -25,29 +90,18 @@ def deny(reason: str) -> None:
     sys.exit(0)
 
 
-data = json.load(sys.stdin)
-if data.get("tool_name") != "Bash":
-    sys.exit(0)
+def main():
+    data = json.load(sys.stdin)
+    if data.get("tool_name") != "Bash":
+        sys.exit(0)
+
+    cmd = data.get("tool_input", {}).get("command", "")
+    should_block, reason = check_command(cmd)
+    if should_block:
+        deny(reason)
 
-cmd = data.get("tool_input", {}).get("command", "")
-if not re.search(r"\bgit\s+push\b", cmd):
     sys.exit(0)
 
-# Explicit destination: git push origin master / git push origin main
-if re.search(r"\bgit\s+push\b.*\b(master|main)\b", cmd):
-    deny("Direct push to master/main is prohibited.")
-
-# Ambiguous destination (git push / git push origin / git push origin HEAD):
-# resolve via current branch
-try:
-    branch = subprocess.check_output(
-        ["git", "branch", "--show-current"],
-        text=True,
-        stderr=subprocess.DEVNULL,
-    ).strip()
-    if branch in ("master", "main"):
-        deny(f"Current branch is '{branch}' — direct push to master/main is prohibited.")
-except Exception:
-    pass
-
-sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,67 @@ import json
 import sys
 import re
 
+# Pattern match for non-actionable words
+NON_ACTIONABLE_PATTERNS = [
+    r'\bfuture\b',
+    r'\bmaybe\b',
+    r'\bconsider\b',
+    r'\bpossibly\b',
+    r'\beventually\b',
+    r'\bsomeday\b',
+    r'\bshould\s+probably\b',
+    r'\bmight\s+want\b',
+    r'\bcould\s+be\b',
+    r'\bnice\s+to\s+have\b'
+]
+
+
+def build_warning(tool_name: str, tool_input: dict) -> str | None:
+    """Return a warning if a TODO.md edit adds non-actionable language."""
+    # Check for Edit or Write operations on TODO.md
+    if tool_name not in ["Edit", "Write", "MultiEdit"]:
+        return None
+
+    file_path = tool_input.get("file_path", "")
+
+    # Check if operating on TODO.md file
+    if "TODO.md" not in file_path and "todo.md" not in file_path.lower():
+        return None
+
+    # For Edit operations, check the new_string content
+    new_content = ""
+    if tool_name == "Edit":
+        new_content = tool_input.get("new_string", "")
+    elif tool_name == "Write":
+        new_content = tool_input.get("content", "")
+    elif tool_name == "MultiEdit":
+        # Check all edits for new_string content
+        edits = tool_input.get("edits", [])
+        new_content = " ".join([edit.get("new_string", "") for edit in edits])
+
+    # Check for non-actionable patterns in new content
+    found_patterns = []
+    for pattern in NON_ACTIONABLE_PATTERNS:
+        match = re.search(pattern, new_content, re.IGNORECASE)
+        if match:
+            # Extract the actual matched word
+            found_patterns.append(match.group(0))
+
+    if not found_patterns:
+        return None
+
+    return (
+        "⚠️ TODO Quality Warning: Detected non-actionable language in TODO.md\n\n"
+        f"Found words/phrases: {', '.join(set(found_patterns))}\n\n"
+        "The Torvalds Test: 'If it's not needed for this PR, it's not a TODO'\n\n"
+        "TODOs should be:\n"
+        "• Actionable - Clear steps that can be done now\n"
+        "• Specific - No ambiguity about what needs doing\n"
+        "• Current - Needed for active work, not 'someday' items\n\n"
+        "Consider moving wishful items to BACKLOG.md instead."
+    )
+
+
 def main():
     try:
         # Read JSON input from stdin
@@ -24,58 +85,10 @@ def main():
             "suppressOutput": True  # Don't show raw output in transcript
         }
 
-        # Check for Edit or Write operations on TODO.md
-        if tool_name in ["Edit", "Write", "MultiEdit"]:
-            file_path = tool_input.get("file_path", "")
-
-            # Check if operating on TODO.md file
-            if "TODO.md" in file_path or "todo.md" in file_path.lower():
-                # For Edit operations, check the new_string content
-                new_content = ""
-                if tool_name == "Edit":
-                    new_content = tool_input.get("new_string", "")
-                elif tool_name == "Write":
-                    new_content = tool_input.get("content", "")
-                elif tool_name == "MultiEdit":
-                    # Check all edits for new_string content
-                    edits = tool_input.get("edits", [])
-                    new_content = " ".join([edit.get("new_string", "") for edit in edits])
-
-                # Pattern match for non-actionable words
-                non_actionable_patterns = [
-                    r'\bfuture\b',
-                    r'\bmaybe\b',
-                    r'\bconsider\b',
-                    r'\bpossibly\b',
-                    r'\beventually\b',
-                    r'\bsomeday\b',
-                    r'\bshould\s+probably\b',
-                    r'\bmight\s+want\b',
-                    r'\bcould\s+be\b',
-                    r'\bnice\s+to\s+have\b'
-                ]
-
-                # Check for non-actionable patterns in new content
-                found_patterns = []
-                for pattern in non_actionable_patterns:
-                    if re.search(pattern, new_content, re.IGNORECASE):
-                        # Extract the actual matched word
-                        match = re.search(pattern, new_content, re.IGNORECASE)
-                        if match:
-                            found_patterns.append(match.group(0))
-
-                # Build warning message if patterns found
-                if found_patterns:
-                    response["systemMessage"] = (
-                        "⚠️ TODO Quality Warning: Detected non-actionable language in TODO.md\n\n"
-                        f"Found words/phrases: {', '.join(set(found_patterns))}\n\n"
-                        "The Torvalds Test: 'If it's not needed for this PR, it's not a TODO'\n\n"
-                        "TODOs should be:\n"
-                        "• Actionable - Clear steps that can be done now\n"
-                        "• Specific - No ambiguity about what needs doing\n"
-                        "• Current - Needed for active work, not 'someday' items\n\n"
-                        "Consider moving wishful items to BACKLOG.md instead."
-                    )
+        # Build warning message if patterns found
+        warning = build_warning(tool_name, tool_input)
+        if warning:
+            response["systemMessage"] = warning
 
         # Output the response
         print(json.dumps(response))
@@ -91,4 +104,4 @@ def main():
         sys.exit(0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -8,27 +8,8 @@ Includes a gentle reminder about Moonbridge for larger sessions.
 import json
 import os
 import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent))
-from lib.team_utils import is_in_active_team
-
-
-def get_state_file() -> Path:
-    """Get session state file path based on parent PID."""
-    ppid = os.getppid()
-    return Path(f"/tmp/claude-delegation-{ppid}.json")
-
-
-def load_state() -> dict:
-    """Load session state."""
-    state_file = get_state_file()
-    if state_file.exists():
-        try:
-            return json.loads(state_file.read_text())
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {}
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 
 def count_lines(tool_input: dict) -> int:
@@ -55,18 +36,19 @@ def main():
 
     file_path = tool_input.get("file_path", "unknown")
     lines = count_lines(tool_input)
-    state = load_state()
+    from lib.session_store import SessionStore
+    stats = SessionStore().stats()
 
-    if not state:
+    if stats is None:
         # No state = first edit or state cleared
         print(f"[codex] Edited {file_path} ({lines} lines)")
         sys.exit(0)
 
     # Show cumulative stats
-    num_files = len(state.get("files_touched", []))
-    total_lines = state.get("total_lines_added", lines)
-    num_dirs = len(state.get("directories_touched", []))
-    new_files = state.get("new_files_created", 0)
+    num_files = stats.num_files
+    total_lines = stats.total_lines_added
+    num_dirs = stats.num_dirs
+    new_files = stats.new_files_created
 
     stats = f"{num_files} files | {total_lines} lines | {num_dirs} dirs"
     if new_files > 0:
@@ -75,6 +57,7 @@ def main():
     print(f"[codex] {file_path} (+{lines}) → Session: {stats}")
 
     # Suppress delegation pressure for agent team teammates
+    from lib.team_utils import is_in_active_team
     if is_in_active_team():
         print(f"[team] {file_path} (+{lines}) → Session: {stats}")
         sys.exit(0)
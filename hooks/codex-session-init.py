@@ -4,6 +4,8 @@ Codex session initialization - resets delegation state.
 
 SessionStart hook that:
 - Clears previous session state
+- Records where the session started, for Stop hooks' view of what it
+  changed (lib/session_changes.py)
 - Shows enforcement mode for current repo
 - Reminds about delegation options
 """
@@ -12,6 +14,8 @@ import os
 import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 CONFIG_PATH = Path.home() / ".claude/config/delegation-enforcement.json"
 
 
@@ -25,12 +29,6 @@ def load_config() -> dict:
     return {"enabled": True, "exclusions": {"repositories": [], "patterns": []}}
 
 
-def get_state_file() -> Path:
-    """Get session state file path based on parent PID."""
-    ppid = os.getppid()
-    return Path(f"/tmp/claude-delegation-{ppid}.json")
-
-
 def is_excluded_repo(cwd: str, config: dict) -> bool:
     """Check if current working directory is in excluded repos."""
     import fnmatch
@@ -48,16 +46,18 @@ def is_excluded_repo(cwd: str, config: dict) -> bool:
 
 
 def main():
+    try:
+        hook_input = json.load(sys.stdin)
+    except (json.JSONDecodeError, ValueError):
+        hook_input = {}
+
     # Initialize fresh state
-    state = {
-        "files_touched": [],
-        "new_files_created": 0,
-        "total_lines_added": 0,
-        "directories_touched": [],
-    }
-
-    state_file = get_state_file()
-    state_file.write_text(json.dumps(state, indent=2))
+    from lib.session_store import SessionStore
+    SessionStore().reset()
+
+    from lib.session_changes import record_baseline
+    record_baseline(hook_input.get("session_id", ""), hook_input.get("cwd") or os.getcwd(),
+                    hook_input.get("source"))
 
     # Load config and determine status
     config = load_config()
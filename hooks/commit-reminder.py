@@ -4,51 +4,124 @@ Claude Code PostToolUse hook to remind about atomic commits when uncommitted cha
 
 This hook runs after Edit/Write/MultiEdit operations to check git status and remind
 about the Carmack Rule: "A task without a commit is a task not done."
+
+Session state: /tmp/claude-dirty-{session_id}.json (dirty files per worktree)
 """
 
 import json
-import sys
-import subprocess
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Reconcile the event-maintained dirty set with git after this many edits,
+# to catch changes made outside Edit/Write (sed -i, git checkout, codegen)
+RECONCILE_EVERY = 25
+
 
-def check_git_status():
-    """Check if there are uncommitted changes in the git repository."""
+def get_state_file(session_id: str) -> str:
+    """Per-session dirty-file state."""
+    return f"/tmp/claude-dirty-{session_id}.json"
+
+
+def load_state(path: str) -> dict:
     try:
-        # Check if we're in a git repository
-        result = subprocess.run(
-            ["git", "rev-parse", "--is-inside-work-tree"],
-            capture_output=True,
-            text=True,
-            timeout=1
-        )
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(path: str, state: dict) -> None:
+    """Write via temp file + rename so readers never see a partial file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
 
-        if result.returncode != 0:
-            return False, []
 
-        # Get git status
+def git_dirty_files(worktree: str, candidates: list[str]) -> list[str] | None:
+    """Tracked files with changes, plus candidates git doesn't track yet.
+    None if git fails or times out."""
+    import subprocess
+    try:
         result = subprocess.run(
             ["git", "status", "--porcelain", "--untracked-files=no"],
             capture_output=True,
             text=True,
-            timeout=2
+            timeout=2,
+            cwd=worktree,
         )
-
-        if result.returncode == 0 and result.stdout.strip():
-            # Parse changed files
-            changed_files = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    # Extract filename (skip first 3 chars which are status codes)
-                    filename = line[3:].strip()
-                    changed_files.append(filename)
-            return True, changed_files
-
+        if result.returncode != 0:
+            return None
+        # Extract filename (skip first 3 chars which are status codes);
+        # renames are "old -> new"
+        dirty = [line[3:].strip().split(" -> ")[-1] for line in result.stdout.splitlines() if line]
+
+        # Files this session created are untracked; a pathspec-limited
+        # ls-files stays cheap in large repos
+        tracked_dirty = set(dirty)
+        candidates = [c for c in candidates if c not in tracked_dirty]
+        if candidates:
+            result = subprocess.run(
+                ["git", "ls-files", "--others", "--exclude-standard", "--", *candidates],
+                capture_output=True,
+                text=True,
+                timeout=2,
+                cwd=worktree,
+            )
+            if result.returncode == 0:
+                dirty += result.stdout.splitlines()
+        return dirty
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+
+
+def check_git_status(session_id: str, file_path: str) -> tuple[bool, list[str]]:
+    """
+    Check if there are uncommitted changes in the git repository.
+
+    Keeps a per-session dirty set fed by edit events, so the common case
+    costs a few stat() calls regardless of repo size. git status only runs
+    when the index or HEAD changed (add, commit, reset, checkout), every
+    RECONCILE_EVERY edits, or on the first edit of the session.
+    """
+    from lib.git import find_repo, fingerprint
+    repo = find_repo()
+    if repo is None or repo.worktree is None:
         return False, []
 
-    except subprocess.TimeoutExpired:
-        return False, []
-    except Exception:
-        return False, []
+    state_path = get_state_file(session_id)
+    state = load_state(state_path)
+    entry = state.get(repo.worktree) or {}
+    dirty = set(entry.get("dirty", []))
+    edits = entry.get("edits", 0) + 1
+
+    if file_path:
+        path = os.path.abspath(file_path)
+        if path.startswith(repo.worktree + os.sep):
+            dirty.add(os.path.relpath(path, repo.worktree))
+
+    def current_fingerprint():
+        return [list(stamp) if stamp else None for stamp in fingerprint(repo)]
+
+    if current_fingerprint() != entry.get("fingerprint") or edits >= RECONCILE_EVERY:
+        reconciled = git_dirty_files(repo.worktree, sorted(dirty))
+        if reconciled is not None:
+            dirty = set(reconciled)
+            edits = 0
+            # Taken after git status, which may refresh the index itself
+            entry["fingerprint"] = current_fingerprint()
+        # On failure keep the event-derived set and retry next edit
+
+    entry.update(dirty=sorted(dirty), edits=edits)
+    state[repo.worktree] = entry
+    try:
+        save_state(state_path, state)
+    except OSError:
+        pass
+    return bool(dirty), sorted(dirty)
+
 
 def main():
     try:
@@ -71,8 +144,11 @@ def main():
                 print(json.dumps(response))
                 sys.exit(0)
 
-            # Check git status for uncommitted changes
-            has_changes, changed_files = check_git_status()
+            # Check for uncommitted changes
+            tool_input = input_data.get("tool_input") or {}
+            session_id = input_data.get("session_id") or str(os.getppid())
+            file_path = tool_input.get("file_path") or tool_input.get("notebook_path", "")
+            has_changes, changed_files = check_git_status(session_id, file_path)
 
             if has_changes:
                 # Build the reminder message
@@ -9,18 +9,15 @@ PreToolUse hook with advisory responses:
 Never blocks or denies edits. Just surfaces awareness.
 
 Config: ~/.claude/config/delegation-enforcement.json
-Session state: /tmp/claude-delegation-{PPID}.json
+Session state: /tmp/claude-delegation-{PPID}.{json,log} (lib/session_store.py)
 """
-import fnmatch
 import json
 import os
 import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent))
-from lib.team_utils import is_in_active_team
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-CONFIG_PATH = Path.home() / ".claude/config/delegation-enforcement.json"
+CONFIG_PATH = os.path.expanduser("~/.claude/config/delegation-enforcement.json")
 
 DEFAULT_CONFIG = {
     "enabled": True,
@@ -40,9 +37,10 @@ DEFAULT_CONFIG = {
 
 def load_config() -> dict:
     """Load config with fallback to defaults."""
-    if CONFIG_PATH.exists():
+    if os.path.exists(CONFIG_PATH):
         try:
-            config = json.loads(CONFIG_PATH.read_text())
+            with open(CONFIG_PATH) as f:
+                config = json.load(f)
             # Merge with defaults for missing keys
             for key, value in DEFAULT_CONFIG.items():
                 if key not in config:
@@ -53,35 +51,9 @@ def load_config() -> dict:
     return DEFAULT_CONFIG
 
 
-def get_state_file() -> Path:
-    """Get session state file path based on parent PID."""
-    ppid = os.getppid()
-    return Path(f"/tmp/claude-delegation-{ppid}.json")
-
-
-def load_state() -> dict:
-    """Load session state, creating fresh if missing."""
-    state_file = get_state_file()
-    if state_file.exists():
-        try:
-            return json.loads(state_file.read_text())
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {
-        "files_touched": [],
-        "new_files_created": 0,
-        "total_lines_added": 0,
-        "directories_touched": [],
-    }
-
-
-def save_state(state: dict) -> None:
-    """Save session state."""
-    get_state_file().write_text(json.dumps(state, indent=2))
-
-
 def is_excluded_repo(cwd: str, config: dict) -> bool:
     """Check if current working directory is in excluded repos."""
+    import fnmatch
     exclusions = config.get("exclusions", {})
 
     # Check exact repo paths
@@ -99,6 +71,7 @@ def is_excluded_repo(cwd: str, config: dict) -> bool:
 
 def is_always_silent(file_path: str, config: dict) -> bool:
     """Check if file matches always-silent patterns."""
+    import fnmatch
     for pattern in config.get("alwaysSilent", []):
         if fnmatch.fnmatch(file_path, pattern):
             return True
@@ -107,6 +80,7 @@ def is_always_silent(file_path: str, config: dict) -> bool:
 
 def get_directory(file_path: str) -> str:
     """Extract directory from file path."""
+    from pathlib import Path
     return str(Path(file_path).parent)
 
 
@@ -120,7 +94,7 @@ def count_lines(tool_input: dict) -> int:
     return len(text.strip().split("\n"))
 
 
-def calculate_tier(state: dict, config: dict) -> str:
+def calculate_tier(stats, config: dict) -> str:
     """
     Determine enforcement tier based on session metrics.
 
@@ -128,9 +102,9 @@ def calculate_tier(state: dict, config: dict) -> str:
     """
     thresholds = config.get("thresholds", DEFAULT_CONFIG["thresholds"])
 
-    num_files = len(state["files_touched"])
-    total_lines = state["total_lines_added"]
-    new_files = state["new_files_created"]
+    num_files = stats.num_files
+    total_lines = stats.total_lines_added
+    new_files = stats.new_files_created
 
     # Check thresholds from lowest to highest
     silent = thresholds.get("silent", {})
@@ -159,11 +133,11 @@ def calculate_tier(state: dict, config: dict) -> str:
     return "block"
 
 
-def format_session_summary(state: dict) -> str:
+def format_session_summary(stats) -> str:
     """Format session metrics for display."""
-    num_files = len(state["files_touched"])
-    total_lines = state["total_lines_added"]
-    new_files = state["new_files_created"]
+    num_files = stats.num_files
+    total_lines = stats.total_lines_added
+    new_files = stats.new_files_created
 
     summary = f"Session: {num_files} files, {total_lines} lines"
     if new_files > 0:
@@ -220,6 +194,13 @@ def main():
     except json.JSONDecodeError:
         sys.exit(0)
 
+    tool_name = data.get("tool_name", "")
+    tool_input = data.get("tool_input") or {}
+    cwd = data.get("cwd", os.getcwd())
+
+    if tool_name not in ("Edit", "Write", "MultiEdit"):
+        sys.exit(0)
+
     config = load_config()
 
     # Check if enforcement is disabled
@@ -228,16 +209,10 @@ def main():
 
     # Suspend for active agent teams — teammates implement directly
     if config.get("teamMode", {}).get("suspendForTeams", False):
+        from lib.team_utils import is_in_active_team
         if is_in_active_team():
             output_silent()
 
-    tool_name = data.get("tool_name", "")
-    tool_input = data.get("tool_input") or {}
-    cwd = data.get("cwd", os.getcwd())
-
-    if tool_name not in ("Edit", "Write", "MultiEdit"):
-        sys.exit(0)
-
     file_path = tool_input.get("file_path", "")
     if not file_path:
         sys.exit(0)
@@ -255,25 +230,18 @@ def main():
     if is_always_silent(file_path, config):
         output_silent()
 
-    # Load and update state
-    state = load_state()
-    lines = count_lines(tool_input)
-    directory = get_directory(file_path)
-    is_new_file = tool_name == "Write"
-
-    if file_path not in state["files_touched"]:
-        state["files_touched"].append(file_path)
-    if directory not in state["directories_touched"]:
-        state["directories_touched"].append(directory)
-    if is_new_file:
-        state["new_files_created"] += 1
-    state["total_lines_added"] += lines
-
-    save_state(state)
+    # Record the edit (one appended line) and get updated session metrics
+    from lib.session_store import SessionStore
+    stats = SessionStore().record_edit(
+        file_path,
+        get_directory(file_path),
+        lines=count_lines(tool_input),
+        new_file=tool_name == "Write",
+    )
 
     # Calculate enforcement tier
-    tier = calculate_tier(state, config)
-    summary = format_session_summary(state)
+    tier = calculate_tier(stats, config)
+    summary = format_session_summary(stats)
 
     if tier == "silent":
         output_silent()
@@ -9,20 +9,20 @@ Exit 0 + JSON with permissionDecision: "deny" = block the command
 Exit 0 + no output = allow the command
 """
 import json
+import os
 import re
-import subprocess
 import sys
 
-# Regex patterns for commands that need smarter matching
-# These match the command only when it appears as an actual command invocation,
-# not as a substring inside strings, commit messages, or other content.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Programs blocked when they are the command of any segment (lib/shell.py),
+# not when they appear inside strings, commit messages, or other content.
 #
 # Matches: rm file, ls && rm file, $(rm file), `rm file`, ; rm file, | xargs rm
 # Does NOT match: git commit -m "form optimization", echo "inform user"
-RM_COMMAND_PATTERN = re.compile(
-    r'(^|[;&|`]|\$\()\s*rm\s',
-    re.MULTILINE
-)
+DESTRUCTIVE_PROGRAMS = {
+    "rm": "Use /usr/bin/trash instead. Moves to Trash (recoverable). Example: /usr/bin/trash file.txt",
+}
 
 # Simple substring patterns - these are specific enough to not need regex
 # (they won't accidentally match normal text)
@@ -43,10 +43,10 @@ DESTRUCTIVE_SUBSTRINGS = [
     ("gh repo archive", "Archives repository, making it read-only."),
 ]
 
-# Patterns that need word boundary checking (could appear in strings)
-DESTRUCTIVE_PATTERNS = [
-    # (regex_pattern, reason)
-    (re.compile(r'(^|[;&|`]|\$\()\s*git\s+restore\s+(?!--staged|-S)'),
+# git subcommands that are destructive depending on their arguments
+DESTRUCTIVE_GIT_ARGS = [
+    # (subcommand, predicate on its args, reason)
+    ("restore", lambda args: bool(args) and not args[0].startswith(("--staged", "-S")),
      "git restore can discard uncommitted changes. Use 'git restore --staged' for safe unstaging."),
 ]
 
@@ -68,20 +68,27 @@ SAFE = [
     "--force-if-includes",     # safe force push variant
 ]
 
+# Compiled rule tables, built on first use so non-Bash payloads skip the cost.
+# _raw_matcher scans the original command for SAFE then DANGEROUS_FLAGS;
+# _stripped_matcher scans the quote-stripped command for DESTRUCTIVE_SUBSTRINGS.
+_raw_matcher = None
+_stripped_matcher = None
+
+
+def rule_matchers():
+    """Return (raw, stripped) MultiPattern matchers over the rule tables."""
+    global _raw_matcher, _stripped_matcher
+    if _raw_matcher is None:
+        from lib.multipattern import MultiPattern
+        _raw_matcher = MultiPattern(SAFE + [flag for flag, _ in DANGEROUS_FLAGS])
+        _stripped_matcher = MultiPattern([pattern for pattern, _ in DESTRUCTIVE_SUBSTRINGS])
+    return _raw_matcher, _stripped_matcher
+
+
 def get_current_branch() -> str | None:
     """Get current git branch name, or None if not in a repo."""
-    try:
-        result = subprocess.run(
-            ["git", "branch", "--show-current"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
-    return None
+    from lib.git import current_branch
+    return current_branch()
 
 
 def is_protected_branch(branch: str | None) -> bool:
@@ -96,8 +103,11 @@ def check_merge_protection(cmd: str) -> tuple[bool, str]:
     Merge protection: only block merges when currently ON a protected branch.
     Feature branches can merge anything freely (remote tracking, other branches, etc.)
     """
-    merge_match = re.match(r"^git\s+merge\s+(\S+)", cmd)
-    if not merge_match:
+    from lib.shell import parse, git_subcommand
+    if not any(
+        subcommand == "merge" and args
+        for subcommand, args in map(git_subcommand, parse(cmd).segments)
+    ):
         return False, ""
 
     current_branch = get_current_branch()
@@ -115,11 +125,17 @@ def check_merge_protection(cmd: str) -> tuple[bool, str]:
 
 def check_push_protection(cmd: str) -> tuple[bool, str]:
     """Block pushes to protected branches. Only PRs can update main/master."""
-    push_match = re.match(r"^git\s+push\b(.*)$", cmd)
-    if not push_match:
-        return False, ""
+    from lib.shell import parse, git_subcommand
+    for subcommand, args in map(git_subcommand, parse(cmd).segments):
+        if subcommand == "push":
+            blocked, reason = check_push_args(" ".join(args))
+            if blocked:
+                return True, reason
+    return False, ""
 
-    push_args = push_match.group(1).strip()
+
+def check_push_args(push_args: str) -> tuple[bool, str]:
+    """Check one `git push` invocation's arguments."""
 
     # Case 1: Explicit target (git push origin main/master)
     explicit = re.search(r"\b(\w+)\s+(main|master)\s*$", push_args)
@@ -156,40 +172,12 @@ def check_push_protection(cmd: str) -> tuple[bool, str]:
 def strip_quoted_content(cmd: str) -> str:
     """
     Remove content inside quotes to avoid false positives from string literals.
-    Handles both single and double quotes, and escaped quotes.
+    Heredoc bodies and comments are dropped too (see lib/shell.py).
 
     Example: git commit -m "rm all files" -> git commit -m ""
     """
-    result = []
-    i = 0
-    in_single = False
-    in_double = False
-
-    while i < len(cmd):
-        char = cmd[i]
-
-        # Handle escape sequences
-        if char == '\\' and i + 1 < len(cmd):
-            if not in_single and not in_double:
-                result.append(char)
-                result.append(cmd[i + 1])
-            i += 2
-            continue
-
-        # Handle quote transitions
-        if char == '"' and not in_single:
-            in_double = not in_double
-            result.append(char)  # Keep the quote itself
-        elif char == "'" and not in_double:
-            in_single = not in_single
-            result.append(char)  # Keep the quote itself
-        elif not in_single and not in_double:
-            result.append(char)
-        # If inside quotes, don't append (strip the content)
-
-        i += 1
-
-    return ''.join(result)
+    from lib.shell import strip_quoted_content
+    return strip_quoted_content(cmd)
 
 
 def check_command(cmd: str) -> tuple[bool, str]:
@@ -200,10 +188,14 @@ def check_command(cmd: str) -> tuple[bool, str]:
     if not cmd:
         return False, ""
 
+    # One pass over the original command finds SAFE and DANGEROUS_FLAGS hits;
+    # indices below len(SAFE) are safe patterns, the rest are flags
+    raw_matcher, stripped_matcher = rule_matchers()
+    raw_hits = raw_matcher.search(cmd)
+
     # Check safe patterns first (allowlist) - check original command
-    for safe in SAFE:
-        if safe in cmd:
-            return False, ""
+    if any(hit < len(SAFE) for hit in raw_hits):
+        return False, ""
 
     # Check merge protection (branch-aware)
     blocked, reason = check_merge_protection(cmd)
@@ -219,25 +211,29 @@ def check_command(cmd: str) -> tuple[bool, str]:
     # echo statements, string literals, etc.
     cmd_stripped = strip_quoted_content(cmd)
 
-    # Check rm command with smart pattern (avoids false positives in strings)
-    if RM_COMMAND_PATTERN.search(cmd_stripped):
-        return True, "Use /usr/bin/trash instead. Moves to Trash (recoverable). Example: /usr/bin/trash file.txt"
-
-    # Check simple substring patterns (specific enough to not need regex)
-    for pattern, reason in DESTRUCTIVE_SUBSTRINGS:
-        if pattern in cmd_stripped:
-            return True, reason
-
-    # Check regex patterns (for commands that could appear in strings)
-    for pattern, reason in DESTRUCTIVE_PATTERNS:
-        if pattern.search(cmd_stripped):
-            return True, reason
+    # Check programs by segment command (avoids false positives in strings)
+    from lib.shell import parse, git_subcommand
+    segments = parse(cmd).segments
+    for segment in segments:
+        if segment.command in DESTRUCTIVE_PROGRAMS:
+            return True, DESTRUCTIVE_PROGRAMS[segment.command]
+
+    # Check simple substring patterns (specific enough to not need regex).
+    # First rule in table order supplies the reason.
+    stripped_hits = stripped_matcher.search(cmd_stripped)
+    if stripped_hits:
+        return True, DESTRUCTIVE_SUBSTRINGS[min(stripped_hits)][1]
+
+    # Check argument-dependent git subcommands
+    for subcommand, args in map(git_subcommand, segments):
+        for name, is_destructive, reason in DESTRUCTIVE_GIT_ARGS:
+            if subcommand == name and is_destructive(args):
+                return True, reason
 
     # Check dangerous flags (these are dangerous anywhere, even in strings,
     # because they might be used in eval or variable expansion)
-    for flag, reason in DANGEROUS_FLAGS:
-        if flag in cmd:  # Check original, not stripped
-            return True, reason
+    if raw_hits:  # Hits in the original, not stripped
+        return True, DANGEROUS_FLAGS[min(raw_hits) - len(SAFE)][1]
 
     return False, ""
 
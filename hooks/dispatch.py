@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+PreToolUse dispatcher for Claude Code.
+
+Runs every PreToolUse guard in one interpreter instead of one python3
+process per guard. The payload is parsed once, each guard's pure check
+function is called in a fixed order, and the verdicts are merged into a
+single response.
+
+Merge rules:
+- deny > ask > allow. The first guard to reach the strongest decision
+  supplies the reason. Once something denies, remaining guards are skipped.
+- modifiedToolInput is only emitted when nothing denies.
+- Advisory messages (warnings, reminders) are concatenated in guard order.
+
+Register this as the only PreToolUse hook in place of the individual
+guards. The guard scripts keep working standalone.
+
+delegation-guard.py is NOT dispatched: its session state is keyed on the
+parent PID, so it must stay a direct child of Claude Code.
+"""
+import json
+import os
+import sys
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+EDIT_TOOLS = ("Edit", "Write", "MultiEdit")
+
+# Tools permission-auto-approve can ever approve (see is_safe_tool)
+READ_ONLY_TOOLS = ("Read", "Glob", "Grep", "LS", "Bash", "Task", "WebFetch", "WebSearch")
+
+_modules: dict = {}
+
+
+def load_guard(name: str):
+    """Import hooks/<name>.py as a module (hook filenames aren't identifiers)."""
+    module = _modules.get(name)
+    if module is None:
+        import importlib.util
+        path = os.path.join(HOOKS_DIR, f"{name}.py")
+        spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[name] = module
+    return module
+
+
+def verdict(decision: str | None = None, reason: str = "", **extra) -> dict:
+    """Build a guard verdict. Extra keys: message, system_message,
+    modified_input, stderr."""
+    return {"decision": decision, "reason": reason, **extra}
+
+
+# --- Guard adapters ---
+# Each adapter takes (tool_input, data) and returns a verdict or None.
+# Adapters only call pure check functions; none of them exit or print.
+
+def destructive_command(tool_input: dict, data: dict) -> dict | None:
+    cmd = tool_input.get("command", "")
+    should_block, reason = load_guard("destructive-command-guard").check_command(cmd)
+    if should_block:
+        return verdict("deny", (
+            f"BLOCKED: {reason}\n\n"
+            f"Command: {cmd}\n\n"
+            f"Run this yourself if truly needed."
+        ))
+    return None
+
+
+def block_master_push(tool_input: dict, data: dict) -> dict | None:
+    should_block, reason = load_guard("block-master-push").check_command(
+        tool_input.get("command", "")
+    )
+    if should_block:
+        return verdict("deny", (
+            f"BLOCKED: {reason}\n\n"
+            "Create a feature branch and open a PR instead."
+        ))
+    return None
+
+
+def command_deny(guard: str):
+    """Adapter for guards whose check_command returns (should_block, reason)
+    and whose deny output is 'BLOCKED: reason + Command'."""
+    def adapter(tool_input: dict, data: dict) -> dict | None:
+        cmd = tool_input.get("command", "")
+        should_block, reason = load_guard(guard).check_command(cmd)
+        if should_block:
+            return verdict("deny", f"BLOCKED: {reason}\n\nCommand: {cmd}")
+        return None
+    adapter.__name__ = guard
+    return adapter
+
+
+def convex_deployment(tool_input: dict, data: dict) -> dict | None:
+    cmd = tool_input.get("command", "")
+    action, reason = load_guard("convex-deployment-guard").check_command(cmd)
+    if action == "block":
+        return verdict("deny", f"BLOCKED: {reason}\n\nCommand: {cmd}")
+    return None
+
+
+def billing_security(tool_input: dict, data: dict) -> dict | None:
+    guard = load_guard("billing-security-guard")
+    tool_name = data.get("tool_name", "")
+
+    if tool_name in EDIT_TOOLS:
+        if not guard.is_env_file(tool_input.get("file_path", "")):
+            content = tool_input.get("content", "") or tool_input.get("new_string", "")
+            should_block, reason = guard.check_hardcoded_keys(content)
+            if should_block:
+                return verdict("deny", reason)
+        return None
+
+    cmd = tool_input.get("command", "")
+    action, reason = guard.check_env_mode_mismatch(cmd)
+    if action == "block":
+        return verdict("deny", reason)
+
+    should_warn, reason = guard.check_billing_env_command(cmd)
+    if should_warn:
+        return verdict(message=f"⚠️  BILLING SECURITY WARNING:\n\n{reason}")
+    return None
+
+
+def disk_space(tool_input: dict, data: dict) -> dict | None:
+    guard = load_guard("disk-space-guard")
+    if not guard.is_heavy_command(tool_input.get("command", "")):
+        return None
+
+    free_gb = guard.get_free_space_gb()
+    if free_gb is None:
+        return None
+
+    if free_gb < guard.BLOCK_THRESHOLD_GB:
+        return verdict("deny", (
+            f"BLOCKED: Disk critically low ({free_gb:.1f}GB free). "
+            f"Run 'cache-clean' alias before heavy operations."
+        ))
+    if free_gb < guard.WARN_THRESHOLD_GB:
+        return verdict(stderr=(
+            f"⚠️  Low disk space ({free_gb:.1f}GB free). "
+            f"Consider running 'cache-clean' soon."
+        ))
+    return None
+
+
+def portable_code(tool_input: dict, data: dict) -> dict | None:
+    guard = load_guard("portable-code-guard")
+    issue = None
+    if data.get("tool_name") == "Bash":
+        issue = guard.check_git_add(tool_input)
+    else:
+        for file_path, content in guard.iter_edits(tool_input):
+            issue = guard.detect_issues(file_path, content)
+            if issue:
+                break
+    if not issue:
+        return None
+    return verdict("ask", (
+        f"⚠️  Portability Issue: {issue[0]}\n\n"
+        f"{issue[1]}\n\n"
+        "This will break for other developers or bloat the repository.\n\n"
+        "Proceed anyway?"
+    ))
+
+
+def exclusion(tool_input: dict, data: dict) -> dict | None:
+    guard = load_guard("exclusion-guard")
+    for file_path, content in guard.iter_edits(tool_input):
+        normalized_path = os.path.normpath(file_path) if file_path else ""
+        pattern_type = guard.detect_pattern(normalized_path, content)
+        if pattern_type:
+            return verdict("ask", (
+                f"⚠️  Exclusion Pattern Detected: {pattern_type}\n\n"
+                "Before excluding, consider:\n"
+                "□ Can the code be refactored to be testable?\n"
+                "□ Can handler functions be exported and tested with mocks?\n"
+                "□ Is this genuinely runtime-only code?\n"
+                "□ Are there existing patterns in the codebase for testing similar code?\n\n"
+                "If exclusion is truly necessary, document WHY in a comment.\n\n"
+                "Proceed with this exclusion?"
+            ))
+    return None
+
+
+def stripe_deploy(tool_input: dict, data: dict) -> dict | None:
+    cmd = tool_input.get("command", "")
+    action, should_output, reason = load_guard("stripe-deploy-reminder").check_command(cmd)
+    if action == "block":
+        return verdict("deny", f"🛑 {reason}\n\nCommand blocked: {cmd}")
+    if should_output:
+        return verdict(message=f"✅ {reason}\n\nCommand: {cmd}")
+    return None
+
+
+def github_cli(tool_input: dict, data: dict) -> dict | None:
+    needs_transform, new_cmd, message = load_guard("github-cli-guard").parse_command(
+        tool_input.get("command", "")
+    )
+    if not needs_transform:
+        return None
+    return verdict(
+        modified_input={
+            "command": new_cmd,
+            "description": tool_input.get("description", "View GitHub issue"),
+        },
+        stderr=message,
+    )
+
+
+def rg_reminder(tool_input: dict, data: dict) -> dict | None:
+    message = load_guard("remind-rg-astgrep").build_reminder(
+        data.get("tool_name", ""), tool_input
+    )
+    return verdict(system_message=message) if message else None
+
+
+def todo_quality(tool_input: dict, data: dict) -> dict | None:
+    message = load_guard("check-todo-quality").build_warning(
+        data.get("tool_name", ""), tool_input
+    )
+    return verdict(system_message=message) if message else None
+
+
+def auto_approve(tool_input: dict, data: dict) -> dict | None:
+    tool_name = data.get("tool_name", "")
+    if load_guard("permission-auto-approve").is_safe_tool(tool_name, tool_input):
+        return verdict("allow", f"Auto-approved: {tool_name} is read-only")
+    return None
+
+
+# Evaluation order: cheap local denies first, network-bound checks late,
+# advisory transforms after that, auto-approve last so it can never
+# override a deny or ask.
+GUARDS = [
+    ("destructive-command-guard", ("Bash",), destructive_command),
+    ("block-master-push", ("Bash",), block_master_push),
+    ("env-var-newline-guard", ("Bash",), command_deny("env-var-newline-guard")),
+    ("vercel-prod-guard", ("Bash",), command_deny("vercel-prod-guard")),
+    ("convex-deployment-guard", ("Bash",), convex_deployment),
+    ("stripe-profile-guard", ("Bash",), command_deny("stripe-profile-guard")),
+    ("billing-security-guard", ("Bash",) + EDIT_TOOLS, billing_security),
+    ("disk-space-guard", ("Bash",), disk_space),
+    ("portable-code-guard", ("Bash",) + EDIT_TOOLS, portable_code),
+    ("exclusion-guard", EDIT_TOOLS, exclusion),
+    ("check-todo-quality", EDIT_TOOLS, todo_quality),
+    ("stripe-deploy-reminder", ("Bash",), stripe_deploy),
+    ("github-cli-guard", ("Bash",), github_cli),
+    ("remind-rg-astgrep", ("Bash", "Grep"), rg_reminder),
+    ("permission-auto-approve", READ_ONLY_TOOLS, auto_approve),
+]
+
+DECISION_RANK = {None: 0, "allow": 1, "ask": 2, "deny": 3}
+
+
+def evaluate(data: dict) -> tuple[dict | None, list[str]]:
+    """
+    Run all applicable guards and merge their verdicts.
+    Returns (hook_output or None, stderr_lines).
+    """
+    tool_name = data.get("tool_name", "")
+    tool_input = data.get("tool_input") or {}
+    if tool_name == "Bash":
+        cmd = tool_input.get("command", "")
+        if not isinstance(cmd, str) or not cmd:
+            tool_input = {**tool_input, "command": ""}
+
+    decision, reason = None, ""
+    messages, system_messages, stderr = [], [], []
+    modified_input = None
+
+    for name, tools, adapter in GUARDS:
+        if tool_name not in tools:
+            continue
+        try:
+            result = adapter(tool_input, data)
+        except Exception as e:
+            # A broken guard must not take the others down with it
+            stderr.append(f"[dispatch] {name} failed (non-blocking): {e}")
+            continue
+        if not result:
+            continue
+
+        if DECISION_RANK[result["decision"]] > DECISION_RANK[decision]:
+            decision, reason = result["decision"], result["reason"]
+        if result.get("message"):
+            messages.append(result["message"])
+        if result.get("system_message"):
+            system_messages.append(result["system_message"])
+        if result.get("stderr"):
+            stderr.append(result["stderr"])
+        if result.get("modified_input") and modified_input is None:
+            modified_input = result["modified_input"]
+
+        if decision == "deny":
+            break
+
+    specific = {}
+    if decision:
+        specific["permissionDecision"] = decision
+        if reason:
+            specific["permissionDecisionReason"] = reason
+    if messages:
+        specific["message"] = "\n\n".join(messages)
+    if modified_input and decision != "deny":
+        specific["modifiedToolInput"] = modified_input
+
+    output = {}
+    if specific:
+        output["hookSpecificOutput"] = {"hookEventName": "PreToolUse", **specific}
+    if system_messages:
+        output["systemMessage"] = "\n\n".join(system_messages)
+
+    return output or None, stderr
+
+
+def main():
+    try:
+        data = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        sys.exit(0)
+
+    output, stderr = evaluate(data)
+    for line in stderr:
+        print(line, file=sys.stderr)
+    if output:
+        print(json.dumps(output))
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
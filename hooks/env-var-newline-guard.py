@@ -11,9 +11,11 @@ Or heredoc without trailing newline.
 PreToolUse hook - runs before Bash commands execute.
 """
 import json
-import re
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 # Commands that set environment variables and are sensitive to trailing newlines
 ENV_SETTERS = [
     "vercel env add",
@@ -34,15 +36,8 @@ ENV_SETTERS = [
     "az keyvault secret set",
 ]
 
-# Pattern: echo (with or without flags, but NOT -n) piped to something
-# Matches: echo "foo" | ..., echo foo | ..., echo $VAR | ...
-# Does NOT match: echo -n "foo" | ... (that's safe)
-ECHO_PIPE_PATTERN = re.compile(
-    r'\becho\s+'           # echo followed by space
-    r'(?!-n\b|-en\b)'      # NOT followed by -n or -en (safe flags)
-    r'[^|]*'               # anything until pipe
-    r'\|'                  # pipe character
-)
+# echo flags that suppress the trailing newline
+SAFE_ECHO_FLAGS = ("-n", "-en", "-ne")
 
 
 def check_command(cmd: str) -> tuple[bool, str]:
@@ -50,24 +45,28 @@ def check_command(cmd: str) -> tuple[bool, str]:
     Check if command uses echo (without -n) piped to an env setter.
     Returns (should_block, reason).
     """
-    if not cmd:
-        return False, ""
-
-    # Must have echo piped to something
-    if not ECHO_PIPE_PATTERN.search(cmd):
+    if not cmd or "echo" not in cmd:
         return False, ""
 
-    # Check if any env setter is in the command
-    cmd_lower = cmd.lower()
-    for setter in ENV_SETTERS:
-        if setter.lower() in cmd_lower:
-            return True, (
-                f"`echo` adds a trailing newline that corrupts env vars.\n\n"
-                f"Use printf instead:\n"
-                f"  printf '%s' \"value\" | {setter.split()[0]} ...\n\n"
-                f"Or echo -n (bash-specific):\n"
-                f"  echo -n \"value\" | {setter.split()[0]} ..."
-            )
+    # Must have echo piped to something: echo "foo" | ..., echo $VAR | ...
+    # echo -n "foo" | ... is safe
+    from lib.shell import parse
+    for pipeline in parse(cmd).pipelines():
+        for i, segment in enumerate(pipeline[:-1]):
+            words = segment.words
+            if words[:1] != ["echo"] or words[1:2] and words[1] in SAFE_ECHO_FLAGS:
+                continue
+            # Check if any env setter is downstream in the pipeline
+            downstream = " ".join(" ".join(s.words) for s in pipeline[i + 1:]).lower()
+            for setter in ENV_SETTERS:
+                if setter.lower() in downstream:
+                    return True, (
+                        f"`echo` adds a trailing newline that corrupts env vars.\n\n"
+                        f"Use printf instead:\n"
+                        f"  printf '%s' \"value\" | {setter.split()[0]} ...\n\n"
+                        f"Or echo -n (bash-specific):\n"
+                        f"  echo -n \"value\" | {setter.split()[0]} ..."
+                    )
 
     return False, ""
 
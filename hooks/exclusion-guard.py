@@ -14,7 +14,6 @@ Patterns detected:
 import json
 import re
 import sys
-from pathlib import Path
 
 
 COVERAGE_CONFIG_RE = re.compile(r'(vitest|jest)\.config', re.IGNORECASE)
@@ -106,6 +105,8 @@ def main() -> None:
     if tool_name not in ("Edit", "Write", "MultiEdit"):
         sys.exit(0)
 
+    from pathlib import Path
+
     for file_path, content in iter_edits(tool_input):
         normalized_path = str(Path(file_path)) if file_path else ""
         pattern_type = detect_pattern(normalized_path, content)
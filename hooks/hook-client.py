@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Thin PreToolUse client for hook-daemon.py.
+
+Forwards the stdin payload to the daemon over a Unix socket and replays
+its stdout/stderr/exit code. If the daemon isn't running it is started in
+the background, and this call is answered by running dispatch.py
+in-process. Same fallback when the daemon is slow, stale or broken.
+
+Register in place of dispatch.py:
+  python3 ~/.claude/hooks/hook-client.py
+"""
+import json
+import os
+import socket
+import sys
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HOOKS_DIR)
+SOCKET_PATH = f"/tmp/claude-hooks-{os.getuid()}/hookd.sock"
+
+CONNECT_TIMEOUT = 0.2
+# Generous: the daemon hands network-bound payloads back (fallback), so a
+# reply this slow means it is wedged, and evaluating here is the way out.
+REPLY_TIMEOUT = 30
+
+
+def peer_uid(sock: socket.socket) -> int:
+    """uid of the process on the other end of a connected Unix socket."""
+    if hasattr(socket, "SO_PEERCRED"):
+        import struct
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", creds)[1]
+    return os.lstat(SOCKET_PATH).st_uid     # no SO_PEERCRED (macOS): the socket's owner
+
+
+def ask_daemon(raw: bytes) -> dict | None:
+    """Send payload to daemon. Returns reply, or None if unavailable."""
+    from lib.statedir import private_dir
+    try:
+        private_dir()   # a directory someone else made: never trust its socket
+    except OSError:
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(SOCKET_PATH)
+        if peer_uid(sock) != os.getuid():
+            return None
+        sock.settimeout(REPLY_TIMEOUT)
+        sock.sendall(raw)
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return json.loads(b"".join(chunks))
+    except (FileNotFoundError, ConnectionRefusedError):
+        start_daemon()
+        return None
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def start_daemon() -> None:
+    """Launch the daemon detached; it exits on its own if one is running."""
+    import subprocess
+    subprocess.Popen(
+        [sys.executable, os.path.join(HOOKS_DIR, "hook-daemon.py")],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def run_locally(raw: bytes) -> None:
+    """Fallback: evaluate the guards in this process."""
+    try:
+        data = json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        sys.exit(0)
+    import dispatch
+    output, stderr = dispatch.evaluate(data)
+    for line in stderr:
+        print(line, file=sys.stderr)
+    if output:
+        print(json.dumps(output))
+    sys.exit(0)
+
+
+def main():
+    raw = sys.stdin.buffer.read()
+    reply = ask_daemon(raw)
+
+    # No reply, {"stale": true} from a daemon that is shutting down (the
+    # next call starts a fresh one), or {"fallback": true} for a payload
+    # the daemon leaves to this process
+    if not isinstance(reply, dict) or "code" not in reply:
+        run_locally(raw)
+
+    sys.stderr.write(reply.get("stderr", ""))
+    sys.stdout.write(reply.get("stdout", ""))
+    sys.exit(reply["code"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Persistent PreToolUse hook daemon.
+
+Keeps dispatch.py and every guard module (compiled regexes, caches) loaded
+in one long-lived process, served over a Unix domain socket. hook-client.py
+starts it lazily on first use and forwards payloads to it.
+
+Lifecycle:
+- Single instance per user, enforced with an flock on LOCK_PATH. Socket
+  and lock live in the user's 0700 state directory; if that can't be
+  verified the daemon doesn't start.
+- Exits after IDLE_TIMEOUT seconds without a request, so it can never
+  linger like the vitest zombies in postmortems/2026-02-26-memory-exhaustion.md.
+- Exits (after answering "stale") when any hook source file changes, so
+  edits to hooks take effect on the next call.
+
+Concurrency: connections are handled on threads, but guard evaluation is
+serialized. Guards read the process cwd (git branch, .env files), so each
+request chdirs to the payload's cwd under EVAL_LOCK. Payloads without a
+usable cwd, and deploys that stripe-deploy-reminder checks over the
+network (up to its 15 s probe deadline), are sent back to the client to
+evaluate in its own process instead of holding everyone else up.
+
+Protocol: client sends the raw payload and shuts down its write side.
+Daemon replies with JSON {"stdout": str, "stderr": str, "code": int},
+{"stale": true} or {"fallback": true}.
+"""
+import fcntl
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HOOKS_DIR)
+import dispatch  # noqa: E402
+
+# In the user's private state directory (lib/statedir.py): nobody else can
+# bind the socket first or plant a symlink at the lock
+SOCKET_PATH = f"/tmp/claude-hooks-{os.getuid()}/hookd.sock"
+LOCK_PATH = f"/tmp/claude-hooks-{os.getuid()}/hookd.lock"
+IDLE_TIMEOUT = int(os.environ.get("CLAUDE_HOOKD_IDLE_TIMEOUT", "900"))
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+EVAL_LOCK = threading.Lock()
+_last_request = time.monotonic()
+
+
+def source_fingerprint() -> tuple:
+    """mtimes of every hook source file; changes mean the daemon is stale."""
+    entries = []
+    for directory in (HOOKS_DIR, os.path.join(HOOKS_DIR, "lib")):
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith(".py"):
+                try:
+                    entries.append((name, os.stat(os.path.join(directory, name)).st_mtime_ns))
+                except OSError:
+                    pass
+    return tuple(entries)
+
+
+STARTUP_FINGERPRINT = source_fingerprint()
+
+
+def network_bound(data: dict) -> bool:
+    """Whether the payload is a deploy stripe-deploy-reminder may verify
+    over the network."""
+    if data.get("tool_name") != "Bash":
+        return False
+    cmd = (data.get("tool_input") or {}).get("command")
+    if not isinstance(cmd, str):
+        return False
+    import re
+    patterns = dispatch.load_guard("stripe-deploy-reminder").DEPLOY_PATTERNS
+    return any(re.search(p, cmd, re.IGNORECASE) for p in patterns)
+
+
+def handle_payload(raw: bytes) -> dict:
+    """Evaluate one payload exactly as dispatch.py would, or ask the
+    client to (fallback) when that can't be done here."""
+    try:
+        data = json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return {"stdout": "", "stderr": "", "code": 0}
+    if not isinstance(data, dict):
+        return {"stdout": "", "stderr": "", "code": 0}
+
+    # Without its cwd a guard would read the previous request's
+    cwd = data.get("cwd")
+    if not isinstance(cwd, str) or not os.path.isdir(cwd):
+        return {"fallback": True}
+    if network_bound(data):
+        return {"fallback": True}
+
+    with EVAL_LOCK:
+        os.chdir(cwd)
+        output, stderr = dispatch.evaluate(data)
+
+    return {
+        "stdout": json.dumps(output) + "\n" if output else "",
+        "stderr": "".join(f"{line}\n" for line in stderr),
+        "code": 0,
+    }
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        global _last_request
+        _last_request = time.monotonic()
+
+        chunks, size = [], 0
+        while True:
+            chunk = self.rfile.read1(65536)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_PAYLOAD:
+                return  # client sees EOF and falls back
+            chunks.append(chunk)
+
+        if source_fingerprint() != STARTUP_FINGERPRINT:
+            self.wfile.write(json.dumps({"stale": True}).encode())
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+
+        reply = handle_payload(b"".join(chunks))
+        self.wfile.write(json.dumps(reply).encode())
+        _last_request = time.monotonic()
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def idle_watchdog(server: Server) -> None:
+    """Shut the server down after IDLE_TIMEOUT seconds without requests."""
+    while True:
+        time.sleep(min(30, IDLE_TIMEOUT))
+        if time.monotonic() - _last_request > IDLE_TIMEOUT:
+            server.shutdown()
+            return
+
+
+def main():
+    from lib.statedir import private_dir
+    try:
+        private_dir()
+        lock_fd = os.open(LOCK_PATH, os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+    except OSError:
+        sys.exit(0)  # no safe place for the socket: clients run in-process
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        sys.exit(0)  # another daemon already owns the socket
+
+    try:
+        os.unlink(SOCKET_PATH)
+    except FileNotFoundError:
+        pass
+
+    old_umask = os.umask(0o177)  # socket is 0600: only this user may connect
+    try:
+        server = Server(SOCKET_PATH, Handler)
+    finally:
+        os.umask(old_umask)
+
+    threading.Thread(target=idle_watchdog, args=(server,), daemon=True).start()
+    try:
+        server.serve_forever(poll_interval=1)
+    finally:
+        server.server_close()
+        try:
+            os.unlink(SOCKET_PATH)
+        except FileNotFoundError:
+            pass
+        os.close(lock_fd)
+
+
+if __name__ == "__main__":
+    main()
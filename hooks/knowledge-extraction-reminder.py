@@ -9,9 +9,19 @@ Runs on Stop hook to evaluate entire session context.
 """
 
 import json
+import os
 import subprocess
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Hints, counted as matching lines in the changed files (lib/scan.py)
+PATTERNS = {
+    "error": r"try\s*{|catch\s*\(|\.catch\(",
+    "type": r"type\s+\w+\s*=|interface\s+\w+",
+    "test": r"it\(|test\(|describe\(",
+}
+
 def get_recent_changes():
     """Get files changed in recent commits (context for Claude)."""
     try:
@@ -23,21 +33,6 @@ def get_recent_changes():
     except:
         return []
 
-def count_pattern(pattern: str, files: list[str]) -> int:
-    """Count pattern occurrences across files."""
-    count = 0
-    for f in files:
-        try:
-            result = subprocess.run(
-                ["rg", "-c", pattern, f],
-                capture_output=True, text=True, timeout=2
-            )
-            if result.stdout.strip():
-                count += int(result.stdout.strip())
-        except:
-            pass
-    return count
-
 def main():
     # Read hook context from stdin
     try:
@@ -45,24 +40,29 @@ def main():
     except:
         context = {}
 
-    # Gather bonus context about recent work
-    changed_files = get_recent_changes()
+    # Gather bonus context about this session's work; recent commits for
+    # sessions without a recorded starting point
+    from lib.session_changes import changes
+    session = changes(context)
+    if session is not None:
+        changed_files = [os.path.join(session["worktree"], f) for f in session["files"]]
+    else:
+        changed_files = get_recent_changes()
 
     hints = []
     if changed_files:
         # Check for patterns that might indicate extractable knowledge
         # Note: No threshold - default codify philosophy means any pattern is worth considering
-        error_count = count_pattern(r"try\s*{|catch\s*\(|\.catch\(", changed_files)
-        if error_count > 0:
-            hints.append(f"Error handling patterns detected ({error_count})")
+        from lib.scan import scan
+        counts = scan(changed_files, PATTERNS)
+        if counts["error"] > 0:
+            hints.append(f"Error handling patterns detected ({counts['error']})")
 
-        type_count = count_pattern(r"type\s+\w+\s*=|interface\s+\w+", changed_files)
-        if type_count > 0:
-            hints.append(f"Type definitions added ({type_count})")
+        if counts["type"] > 0:
+            hints.append(f"Type definitions added ({counts['type']})")
 
-        test_count = count_pattern(r"it\(|test\(|describe\(", changed_files)
-        if test_count > 0:
-            hints.append(f"Tests added ({test_count})")
+        if counts["test"] > 0:
+            hints.append(f"Tests added ({counts['test']})")
 
     # Build the evaluation prompt (Claudeception-style)
     hint_text = ""
@@ -0,0 +1,112 @@
+"""Bounded capture of child process output (docs/bounded-io.md).
+
+`go test -v ./...` or a broken tsc build can print megabytes. This keeps,
+per stream, in constant memory however much arrives:
+
+- the first HEAD_BYTES
+- the last TAIL_BYTES (ring of chunks)
+- the first MAX_MATCHES lines after the head that look like errors
+  (ERROR_SIGNATURES), each cut to MATCH_WIDTH; those that end up in the
+  dropped middle are shown, since the first errors are usually the cause
+
+and renders them with an explicit marker saying how much was omitted.
+"""
+import re
+from collections import deque
+
+HEAD_BYTES = 4096
+TAIL_BYTES = 12288
+MAX_MATCHES = 40
+MATCH_WIDTH = 240
+
+# Longest partial line carried between chunks while looking for signatures
+MAX_LINE = 4096
+
+ERROR_SIGNATURES = re.compile(
+    rb"^[^\n]*(?:\berror\b|\bERROR\b|\bError\b|\bFAIL|\bfailed\b|\bpanic:|Traceback|"
+    rb"Exception\b|AssertionError|\bE   |--- FAIL|\xc3\x97|\xe2\x9c\x97|"
+    rb"error\[|error TS\d+|warning:)[^\n]*",
+    re.MULTILINE,
+)
+
+
+class BoundedCapture:
+    """File-like sink: write(bytes) as output arrives, getvalue() at the end."""
+
+    def __init__(self, head_bytes: int = HEAD_BYTES, tail_bytes: int = TAIL_BYTES,
+                 max_matches: int = MAX_MATCHES):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.max_matches = max_matches
+        self.head = bytearray()
+        self.tail: deque[bytes] = deque()
+        self.tail_size = 0
+        self.total = 0
+        self.lines = 0
+        self.partial = b""          # incomplete last line, for signature scans
+        self.matches: list[tuple[int, bytes]] = []   # (offset, line)
+
+    def write(self, chunk: bytes) -> None:
+        offset = self.total
+        self.total += len(chunk)
+        self.lines += chunk.count(b"\n")
+
+        if len(self.head) < self.head_bytes:
+            take = self.head_bytes - len(self.head)
+            self.head += chunk[:take]
+
+        self.tail.append(chunk)
+        self.tail_size += len(chunk)
+        while self.tail_size - len(self.tail[0]) >= self.tail_bytes:
+            self.tail_size -= len(self.tail.popleft())
+
+        self._scan(chunk, offset)
+
+    def _scan(self, chunk: bytes, offset: int) -> None:
+        text = self.partial + chunk
+        base = offset - len(self.partial)
+        cut = text.rfind(b"\n") + 1
+        self.partial = text[cut:][-MAX_LINE:]
+        if len(self.matches) >= self.max_matches or base + cut <= self.head_bytes:
+            return
+        for m in ERROR_SIGNATURES.finditer(text, 0, cut):
+            if base + m.start() >= self.head_bytes:
+                self.matches.append((base + m.start(), m.group()[:MATCH_WIDTH]))
+                if len(self.matches) >= self.max_matches:
+                    break
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > self.head_bytes + self.tail_bytes
+
+    def getvalue(self) -> str:
+        if self.partial:
+            self._scan(b"\n", self.total)
+        if not self.truncated:
+            # The tail still reaches back into the head: nothing was dropped
+            tail_start = self.total - self.tail_size
+            rest = b"".join(self.tail)[len(self.head) - tail_start:]
+            return (bytes(self.head) + rest).decode("utf-8", "replace")
+
+        tail = b"".join(self.tail)[-self.tail_bytes:]
+        tail_start = self.total - len(tail)
+        newline = tail.find(b"\n")
+        if 0 <= newline < len(tail) - 1:
+            tail, tail_start = tail[newline + 1:], tail_start + newline + 1
+
+        head = bytes(self.head)
+        newline = head.rfind(b"\n")
+        if newline > 0:
+            head = head[:newline + 1]
+        middle = [line for pos, line in self.matches if len(head) <= pos < tail_start]
+
+        omitted = tail_start - len(head)
+        marker = f"... [{omitted} bytes omitted of {self.total} ({self.lines} lines)"
+        if middle:
+            marker += f"; {len(middle)} error-like lines from the omitted part follow"
+        marker += "] ..."
+        parts = [head.rstrip(b"\n"), marker.encode(), *middle]
+        if middle:
+            parts.append(b"... [end of omitted part] ...")
+        parts.append(tail)
+        return b"\n".join(parts).decode("utf-8", "replace")
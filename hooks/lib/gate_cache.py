@@ -0,0 +1,217 @@
+"""Result cache for stop-quality-gate.
+
+A green gate run is recorded under a fingerprint of everything that can
+change its outcome:
+
+- every tracked or unignored untracked file in the working tree (path and
+  content hash)
+- the gate's check commands and the binaries they resolve to on PATH
+- install markers (node_modules/.modules.yaml, .venv/pyvenv.cfg, ...) that
+  change when dependencies are reinstalled without touching a lockfile
+
+If the fingerprint matches an earlier green run, the gate can pass without
+running anything.
+
+Content hashes are reused while a file's (mtime_ns, size, inode) is
+unchanged, so an unchanged tree costs one `git ls-files` and a stat() per
+file. Files modified within RACY_SECONDS of hashing are not reused: their
+mtime may not yet reflect a later write in the same tick.
+
+  <git common dir>/claude-gate/results.json   fingerprint -> last used, LRU
+  <git dir>/claude-gate-stat.json             per-worktree stat cache
+  <git dir>/claude-gate-green.json            file hashes at the last green
+                                              run (test impact selection)
+
+Results live in the common dir, so every session and every linked
+worktree of a repository shares them. Paths are hashed relative to the
+worktree root, so two worktrees with identical content share a result.
+"""
+import hashlib
+import json
+import os
+import time
+
+from lib.git import Repo
+
+# Green results kept per repository; least recently used go first
+MAX_ENTRIES = 64
+
+RACY_SECONDS = 2
+
+INSTALL_MARKERS = (
+    "node_modules/.modules.yaml",       # pnpm
+    "node_modules/.package-lock.json",  # npm
+    "node_modules/.yarn-state.yml",     # yarn berry
+    ".venv/pyvenv.cfg",
+)
+
+
+def _results_path(repo: Repo) -> str:
+    return os.path.join(repo.common_dir, "claude-gate", "results.json")
+
+
+def _stat_path(repo: Repo) -> str:
+    return os.path.join(repo.git_dir, "claude-gate-stat.json")
+
+
+def _load(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save(path: str, data: dict) -> None:
+    """Write via temp file + rename so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _list_files(worktree: str) -> list[str] | None:
+    """Tracked plus unignored untracked files, relative to worktree."""
+    import subprocess
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            capture_output=True,
+            timeout=30,
+            cwd=worktree,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return sorted(set(result.stdout.decode("utf-8", "surrogateescape").split("\0")) - {""})
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _green_path(repo: Repo) -> str:
+    return os.path.join(repo.git_dir, "claude-gate-green.json")
+
+
+def tree_hashes(repo: Repo) -> dict[str, str] | None:
+    """{relative path: content hash} for the working tree; None if git fails."""
+    files = _list_files(repo.worktree)
+    if files is None:
+        return None
+
+    stat_cache = _load(_stat_path(repo))
+    fresh, hashes = {}, {}
+    racy_after = time.time_ns() - RACY_SECONDS * 1_000_000_000
+    for rel in files:
+        path = os.path.join(repo.worktree, rel)
+        try:
+            st = os.stat(path)
+            stamp = [st.st_mtime_ns, st.st_size, st.st_ino]
+            cached = stat_cache.get(rel)
+            if cached and cached[:3] == stamp:
+                content = cached[3]
+            else:
+                content = _hash_file(path)
+            if st.st_mtime_ns < racy_after:
+                fresh[rel] = stamp + [content]
+        except OSError:
+            content = "missing"     # deleted but still in the index
+        hashes[rel] = content
+
+    if fresh != stat_cache:
+        try:
+            _save(_stat_path(repo), fresh)
+        except OSError:
+            pass
+    return hashes
+
+
+def fingerprint(repo: Repo, cwd: str, checks: list[tuple[str, list[str]]],
+                hashes: dict[str, str] | None = None) -> str | None:
+    """Key for one gate run in cwd; None outside a work tree or if git fails.
+    Pass hashes when tree_hashes() was already called."""
+    import shutil
+    if repo.worktree is None:
+        return None
+    if hashes is None:
+        hashes = tree_hashes(repo)
+        if hashes is None:
+            return None
+
+    digest = hashlib.blake2b(digest_size=16)
+    for rel, content in sorted(hashes.items()):
+        digest.update(f"{rel}\0{content}\n".encode("utf-8", "surrogateescape"))
+    digest.update(os.path.relpath(cwd, repo.worktree).encode())
+    for name, cmd in checks:
+        tool = shutil.which(cmd[0])
+        try:
+            st = os.stat(tool) if tool else None
+            tool_stamp = (tool, st.st_mtime_ns, st.st_size) if st else None
+        except OSError:
+            tool_stamp = None
+        digest.update(json.dumps([name, cmd, tool_stamp]).encode())
+    for marker in INSTALL_MARKERS:
+        try:
+            st = os.stat(os.path.join(cwd, marker))
+            digest.update(f"{marker}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+        except OSError:
+            pass
+    return digest.hexdigest()
+
+
+def is_green(repo: Repo, key: str) -> bool:
+    """True if key passed before; refreshes its LRU position."""
+    results = _load(_results_path(repo))
+    if key not in results:
+        return False
+    results[key] = time.time()
+    try:
+        _save(_results_path(repo), results)
+    except OSError:
+        pass
+    return True
+
+
+def last_green(repo: Repo) -> dict | None:
+    """{"files": {path: hash}, "sinceFull": n} from this worktree's last
+    green run, or None before the first one."""
+    green = _load(_green_path(repo))
+    return green if "files" in green else None
+
+
+def changed_files(before: dict[str, str], after: dict[str, str]) -> list[str]:
+    """Paths added, removed or modified between two tree_hashes() results."""
+    return sorted(p for p in before.keys() | after.keys() if before.get(p) != after.get(p))
+
+
+def record_green(repo: Repo, key: str | None, max_entries: int = MAX_ENTRIES,
+                 hashes: dict[str, str] | None = None, full: bool = True) -> None:
+    """Remember a green run under key (None: don't cache it). With hashes,
+    also save them as this worktree's impact-selection baseline;
+    full=False counts a test-selected run."""
+    if hashes is not None:
+        previous = last_green(repo) or {}
+        since_full = 0 if full else previous.get("sinceFull", 0) + 1
+        try:
+            _save(_green_path(repo), {"files": hashes, "sinceFull": since_full})
+        except OSError:
+            pass
+    if key is None:
+        return
+
+    results = _load(_results_path(repo))
+    results[key] = time.time()
+    if len(results) > max_entries:
+        keep = sorted(results, key=results.get, reverse=True)[:max_entries]
+        results = {k: results[k] for k in keep}
+    try:
+        _save(_results_path(repo), results)
+    except OSError:
+        pass
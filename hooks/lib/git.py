@@ -0,0 +1,162 @@
+"""Read git state straight from the filesystem, without forking git.
+
+Resolves the repository for a working directory (plain checkouts, linked
+worktrees whose .git is a `gitdir:` file, and $GIT_DIR), then reads HEAD,
+loose refs and packed-refs directly. The current branch is cached per git
+dir and invalidated when HEAD or the index changes, so a long-lived process
+(dispatcher, daemon) pays a couple of stat() calls per lookup.
+
+Anything unusual (reftable, unreadable files) returns None; callers treat
+that like "git failed" and fall back to their previous behavior.
+"""
+import os
+
+# git dir -> (fingerprint, {key: value})
+_cache: dict[str, tuple[tuple, dict]] = {}
+
+
+class Repo:
+    """Paths of one working tree."""
+
+    def __init__(self, worktree: str | None, git_dir: str):
+        self.worktree = worktree            # None for bare repos
+        self.git_dir = git_dir              # per-worktree dir (HEAD, index)
+        self.common_dir = _common_dir(git_dir)   # shared refs and objects
+
+    def __repr__(self) -> str:
+        return f"Repo(worktree={self.worktree!r}, git_dir={self.git_dir!r})"
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _common_dir(git_dir: str) -> str:
+    common = _read(os.path.join(git_dir, "commondir"))
+    if common is None:
+        return git_dir
+    return os.path.normpath(os.path.join(git_dir, common.strip()))
+
+
+def _git_dir_at(directory: str) -> str | None:
+    """The git dir for directory if it contains .git (dir or gitdir file)."""
+    dot_git = os.path.join(directory, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    content = _read(dot_git)
+    if content and content.startswith("gitdir:"):
+        return os.path.normpath(os.path.join(directory, content[7:].strip()))
+    return None
+
+
+def find_repo(path: str | None = None) -> Repo | None:
+    """Repository containing path (default: cwd), or None outside one."""
+    env_git_dir = os.environ.get("GIT_DIR")
+    if env_git_dir:
+        worktree = os.environ.get("GIT_WORK_TREE") or os.getcwd()
+        return Repo(worktree, os.path.abspath(env_git_dir))
+
+    # A few stat() calls per level; not cached, so `git init` and new
+    # worktrees are seen immediately
+    directory = os.path.abspath(path or os.getcwd())
+    while True:
+        git_dir = _git_dir_at(directory)
+        if git_dir:
+            return Repo(directory, git_dir)
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def fingerprint(repo: Repo) -> tuple:
+    """Changes whenever HEAD moves or the index is rewritten."""
+    stamps = []
+    for name in ("HEAD", "index"):
+        try:
+            st = os.stat(os.path.join(repo.git_dir, name))
+            stamps.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def _cached(repo: Repo, key: str, compute):
+    fp = fingerprint(repo)
+    entry = _cache.get(repo.git_dir)
+    if entry is None or entry[0] != fp:
+        entry = (fp, {})
+        _cache[repo.git_dir] = entry
+    values = entry[1]
+    if key not in values:
+        values[key] = compute()
+    return values[key]
+
+
+def _symbolic_head(repo: Repo) -> str | None:
+    """`refs/heads/x` when HEAD is a symbolic ref, "" when detached."""
+    head = _read(os.path.join(repo.git_dir, "HEAD"))
+    if head is None:
+        return None
+    head = head.strip()
+    if head.startswith("ref:"):
+        return head[4:].strip()
+    return ""
+
+
+def read_ref(repo: Repo, ref: str) -> str | None:
+    """Object id a ref points to: loose ref first, then packed-refs."""
+    for base in (repo.git_dir, repo.common_dir):
+        value = _read(os.path.join(base, ref))
+        if value is not None:
+            value = value.strip()
+            if value.startswith("ref:"):
+                return read_ref(repo, value[4:].strip())
+            return value
+    packed = _read(os.path.join(repo.common_dir, "packed-refs")) or ""
+    for line in packed.splitlines():
+        if line.endswith(" " + ref) and not line.startswith(("#", "^")):
+            return line.split(" ", 1)[0]
+    return None
+
+
+def current_branch(path: str | None = None) -> str | None:
+    """Like `git branch --show-current`: branch name, "" when detached,
+    None outside a repository."""
+    repo = find_repo(path)
+    if repo is None:
+        return None
+
+    def compute():
+        ref = _symbolic_head(repo)
+        if ref is None:
+            return None
+        return ref.removeprefix("refs/heads/") if ref else ""
+
+    return _cached(repo, "branch", compute)
+
+
+def head_commit(path: str | None = None) -> str | None:
+    """Object id of HEAD, or None (outside a repo, or an unborn branch)."""
+    repo = find_repo(path)
+    if repo is None:
+        return None
+
+    # Not cached: commits move the branch ref without touching HEAD
+    ref = _symbolic_head(repo)
+    if ref is None:
+        return None
+    if ref:
+        return read_ref(repo, ref)
+    head = _read(os.path.join(repo.git_dir, "HEAD"))
+    return head.strip() if head else None
+
+
+def is_inside_work_tree(path: str | None = None) -> bool:
+    """Like `git rev-parse --is-inside-work-tree`."""
+    repo = find_repo(path)
+    return repo is not None and repo.worktree is not None
@@ -0,0 +1,227 @@
+"""Test impact selection for stop-quality-gate.
+
+Maps the files changed since the last green gate run to the tests they can
+affect, so a one-file edit runs a handful of tests instead of the suite:
+
+- python: reverse import graph over the project's .py files (ast, cached by
+  path and content hash); a test is selected when it imports a changed module,
+  directly or transitively
+- go: packages containing changed .go files, plus every package in the
+  module that depends on one (`go list -deps`)
+- node: `vitest related` / `jest --findRelatedTests` with the changed files
+- rust: not narrowed; cargo test covers the crate graph itself
+
+select_tests() returns the test command to run instead of the project's
+full one, [] when no test can be affected, or None to run the full suite
+(unknown layout, config or lockfile changed, too many files changed, or a
+changed file the selector can't trace: data, fixtures, templates, Go
+testdata, stylesheets, deleted modules and packages).
+"""
+import ast
+import json
+import os
+
+# Changes to these run the full suite: they affect every test
+FULL_SUITE_TRIGGERS = {
+    "python": {"conftest.py", "pyproject.toml", "setup.cfg", "setup.py", "pytest.ini",
+               "tox.ini", "requirements.txt", "uv.lock", "poetry.lock"},
+    "go": {"go.mod", "go.sum", "go.work"},
+    "node": {"package.json", "pnpm-lock.yaml", "package-lock.json", "yarn.lock",
+             "vitest.config.ts", "vitest.config.js", "jest.config.js", "jest.config.ts",
+             "tsconfig.json"},
+}
+
+# Files each selector can trace to tests; any other change runs the full suite
+NODE_SOURCE = (".ts", ".tsx", ".js", ".jsx", ".mts", ".cts", ".mjs", ".cjs", ".vue", ".svelte")
+SOURCE_SUFFIXES = {"python": (".py",), "go": (".go",), "node": NODE_SOURCE}
+
+# Beyond this many changed source files, selection stops paying off
+MAX_CHANGED = 200
+
+
+def select_tests(project_type: str, cwd: str, worktree: str, changed: list[str],
+                 hashes: dict[str, str]) -> list[str] | None:
+    """Narrowed test command for changed (paths relative to worktree)."""
+    prefix = os.path.relpath(cwd, worktree)
+    prefix = "" if prefix == "." else prefix + "/"
+    # Only the project under cwd; other changes can't affect its tests
+    changed = [p[len(prefix):] for p in changed if p.startswith(prefix)]
+    if not changed:
+        return []
+    triggers = FULL_SUITE_TRIGGERS.get(project_type)
+    if triggers is None or len(changed) > MAX_CHANGED:
+        return None
+    if any(os.path.basename(p) in triggers for p in changed):
+        return None
+    if not all(traceable(project_type, p) for p in changed):
+        return None
+
+    if project_type == "python":
+        files = {p[len(prefix):]: h for p, h in hashes.items() if p.startswith(prefix)}
+        # A deleted module leaves no file to trace its importers through
+        if any(files.get(p, "missing") == "missing" for p in changed):
+            return None
+        tests = python_tests(cwd, worktree, changed, files)
+        return ["pytest", "-x", "--tb=short", *tests] if tests else []
+    if project_type == "go":
+        packages = go_packages(cwd, changed)
+        if packages is None:
+            return None
+        return ["go", "test", "-v", *packages] if packages else []
+    if project_type == "node":
+        return node_related(cwd, changed)
+    return None
+
+
+def traceable(project_type: str, path: str) -> bool:
+    """Whether the selector can map a change to path onto the tests it affects."""
+    if not path.endswith(SOURCE_SUFFIXES[project_type]):
+        return False
+    # Go ignores testdata/ when building packages, but tests read from it
+    return not (project_type == "go" and "testdata" in path.split("/"))
+
+
+# --- python -----------------------------------------------------------------
+
+def is_python_test(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def module_name(path: str) -> str:
+    """a/b/c.py -> a.b.c, a/b/__init__.py -> a.b, with a leading src/ dropped."""
+    path = path.removeprefix("src/").removesuffix(".py")
+    return path.removesuffix("/__init__").replace("/", ".")
+
+
+def _imports(source: bytes, module: str, is_package: bool) -> list[str]:
+    """Absolute names imported by a module; `from a import b` yields a and a.b."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    package = module if is_package else module.rpartition(".")[0]
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".") if package else []
+                parts = parts[:len(parts) - node.level + 1]
+                base = ".".join(parts + ([base] if base else []))
+            if base:
+                names.append(base)
+            names += [f"{base}.{alias.name}" if base else alias.name for alias in node.names]
+    return names
+
+
+def _import_cache_path(worktree: str) -> str | None:
+    from lib.git import find_repo
+    repo = find_repo(worktree)
+    return os.path.join(repo.git_dir, "claude-gate-imports.json") if repo else None
+
+
+def python_tests(cwd: str, worktree: str, changed: list[str], files: dict[str, str]) -> list[str]:
+    """Test files under cwd that import a changed module, transitively."""
+    sources = [p for p, h in files.items() if p.endswith(".py") and h != "missing"]
+    modules = {module_name(p): p for p in sources}
+
+    cache_path = _import_cache_path(worktree)
+    cache = {}
+    if cache_path:
+        try:
+            with open(cache_path) as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            cache = {}
+
+    # Reverse edges: imported file -> files importing it
+    importers: dict[str, set[str]] = {}
+    fresh = {}
+    for path in sources:
+        # Relative imports resolve against the path, so identical files differ
+        cache_key = f"{path}:{files[path]}"
+        names = cache.get(cache_key)
+        if names is None:
+            try:
+                with open(os.path.join(cwd, path), "rb") as f:
+                    source = f.read()
+            except OSError:
+                continue
+            names = _imports(source, module_name(path), path.endswith("__init__.py"))
+        fresh[cache_key] = names
+        for name in names:
+            target = modules.get(name)
+            if target and target != path:
+                importers.setdefault(target, set()).add(path)
+
+    if cache_path and fresh.keys() != cache.keys():
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(fresh, f)
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+
+    seen = set()
+    queue = [p for p in changed if p.endswith(".py")]
+    while queue:
+        path = queue.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        queue.extend(importers.get(path, ()))
+    return sorted(p for p in seen if is_python_test(p) and files.get(p, "missing") != "missing")
+
+
+# --- go ---------------------------------------------------------------------
+
+def go_packages(cwd: str, changed: list[str]) -> list[str] | None:
+    """./pkg paths for changed packages and their dependents in the module."""
+    import subprocess
+    dirs = {os.path.dirname(p) for p in changed if p.endswith(".go")}
+    if not dirs:
+        return []
+    try:
+        result = subprocess.run(
+            ["go", "list", "-f", "{{.Dir}}\t{{.ImportPath}}\t{{join .Deps \" \"}}", "./..."],
+            capture_output=True,
+            text=True,
+            timeout=60,
+            cwd=cwd,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+
+    packages = []
+    for line in result.stdout.splitlines():
+        directory, import_path, deps = (line.split("\t") + ["", ""])[:3]
+        packages.append((os.path.relpath(directory, cwd), import_path, set(deps.split())))
+    listed = {"" if rel == "." else rel for rel, _, _ in packages}
+    if not dirs <= listed:
+        return None     # a deleted package: its dependents can't be found
+    changed_imports = {imp for rel, imp, _ in packages if rel in dirs or (rel == "." and "" in dirs)}
+    selected = [rel for rel, imp, deps in packages
+                if imp in changed_imports or deps & changed_imports]
+    return sorted("./" + rel if rel != "." else "." for rel in selected)
+
+
+# --- node -------------------------------------------------------------------
+
+
+def node_related(cwd: str, changed: list[str]) -> list[str] | None:
+    """Runner-native related-test selection; None when the runner is unknown."""
+    sources = [p for p in changed if p.endswith(NODE_SOURCE)]
+    if not sources:
+        return []
+    bin_dir = os.path.join(cwd, "node_modules", ".bin")
+    if os.path.exists(os.path.join(bin_dir, "vitest")):
+        return ["pnpm", "exec", "vitest", "related", "--run", "--passWithNoTests", *sources]
+    if os.path.exists(os.path.join(bin_dir, "jest")):
+        return ["pnpm", "exec", "jest", "--findRelatedTests", "--passWithNoTests", *sources]
+    return None
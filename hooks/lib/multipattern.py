@@ -0,0 +1,77 @@
+"""Aho-Corasick matcher: find every rule substring in one pass over the text."""
+import re
+from collections import deque
+
+# Below this many patterns, one C-speed `in` scan per pattern beats the
+# pure-Python automaton (crossover measured by bench/rule_scaling.py)
+NAIVE_BELOW = 100
+
+
+class MultiPattern:
+    """Compiled set of literal patterns.
+
+    search() walks the text once regardless of how many patterns there are.
+    While the automaton sits at the root, it jumps straight to the next
+    character that can start a pattern, so long commands with few candidate
+    characters are skipped at C speed. Sets smaller than naive_below skip
+    the automaton and test each pattern with `in`.
+    """
+
+    def __init__(self, patterns: list[str], naive_below: int = NAIVE_BELOW):
+        self.patterns = list(patterns)
+        if not all(self.patterns):
+            raise ValueError("empty pattern")
+        self._naive = len(self.patterns) < naive_below
+        if self._naive:
+            return
+        goto: list[dict[str, int]] = [{}]
+        out: list[tuple[int, ...]] = [()]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in goto[state]:
+                    goto.append({})
+                    out.append(())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            out[state] += (index,)
+
+        # Breadth-first failure links, folded into a full transition table
+        # over the pattern alphabet so the scan never follows a failure chain
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            out[state] += out[fail[state]]
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0)
+                queue.append(child)
+
+        self._delta = delta
+        self._out = out
+        starts = "".join(sorted(goto[0]))
+        self._start = re.compile(f"[{re.escape(starts)}]") if starts else None
+
+    def search(self, text: str) -> set[int]:
+        """Indices of all patterns occurring in text."""
+        if self._naive:
+            return {i for i, pattern in enumerate(self.patterns) if pattern in text}
+        hits: set[int] = set()
+        if self._start is None:
+            return hits
+        delta, out, start = self._delta, self._out, self._start
+        state, i, n = 0, 0, len(text)
+        while i < n:
+            if state == 0:
+                m = start.search(text, i)
+                if m is None:
+                    break
+                i = m.start()
+            state = delta[state].get(text[i], 0)
+            if out[state]:
+                hits.update(out[state])
+            i += 1
+        return hits
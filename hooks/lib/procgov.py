@@ -0,0 +1,214 @@
+"""Resource governor for quality-gate child processes.
+
+subprocess.run(timeout=...) kills only the direct child; a pnpm -> node ->
+vitest worker tree survives it (see postmortems/2026-02-26-memory-
+exhaustion.md). Governed processes instead:
+
+- run in their own session and process group, so the whole tree can be
+  signalled at once
+- get RLIMIT_CPU (per process, inherited by everything they spawn)
+- are watched for the process group's total RSS
+- on timeout, RSS or CPU breach, or cancellation, lose the whole group:
+  SIGTERM, then SIGKILL after KILL_GRACE seconds
+- have their group SIGKILLed after the leader exits too, so workers the
+  runner forgot to stop don't outlive the check
+
+Wall time, CPU time (user + system) and peak RSS are recorded: CPU time
+from wait4() rusage; peak RSS is the larger of rusage's ru_maxrss and the
+watchdog's sampled group total.
+
+Processes that call setsid() themselves leave the group and escape; cgroups
+would catch those but are rarely delegated to user sessions, so they are
+not used.
+"""
+import os
+import resource
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+# Seconds between exit checks, and between RSS samples of the group
+POLL_INTERVAL = 0.02
+SAMPLE_INTERVAL = 0.25
+
+# Seconds between SIGTERM and SIGKILL
+KILL_GRACE = 2.0
+
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024 if hasattr(os, "sysconf") else 4
+
+
+class Limits:
+    def __init__(self, timeout: float = 120, max_rss_mb: int | None = None,
+                 cpu_seconds: int | None = None):
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.cpu_seconds = cpu_seconds
+
+
+class Result:
+    def __init__(self):
+        self.returncode: int | None = None
+        self.stdout = ""
+        self.stderr = ""
+        self.wall = 0.0             # seconds
+        self.cpu = 0.0              # user + system seconds
+        self.peak_rss_mb = 0.0
+        self.killed: str | None = None   # timeout, memory, cpu, cancelled
+
+    @property
+    def output(self) -> str:
+        return (self.stdout + self.stderr).strip()
+
+    def usage(self) -> str:
+        return f"{self.wall:.1f}s wall, {self.cpu:.1f}s CPU, {self.peak_rss_mb:.0f} MB peak RSS"
+
+
+def group_rss_kb(pgid: int) -> int:
+    """Total RSS of a process group, in KB (0 if it can't be read)."""
+    if os.path.isdir("/proc/self"):
+        total = 0
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "rb") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # Fields after "(comm)": state ppid pgrp ... rss is the 22nd
+            fields = stat[stat.rfind(b")") + 2:].split()
+            if len(fields) > 21 and int(fields[2]) == pgid:
+                total += int(fields[21]) * PAGE_KB
+        return total
+    try:
+        out = subprocess.run(["ps", "-A", "-o", "pgid=,rss="], capture_output=True,
+                             text=True, timeout=5).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return 0
+    total = 0
+    for line in out.splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[0] == str(pgid):
+            total += int(parts[1])
+    return total
+
+
+class GovernedProcess:
+    """One command under Limits. start(), then wait() for its Result;
+    kill(reason) from another thread stops the whole tree."""
+
+    def __init__(self, cmd: list[str], cwd: str, env: dict, limits: Limits, sink=None):
+        """sink: factory for per-stream collectors with .write(bytes) and
+        .getvalue() -> str, e.g. lib.capture.BoundedCapture; default keeps
+        everything."""
+        self.sink = sink or _BytesSink
+        self.cmd = cmd
+        self.cwd = cwd
+        self.env = env
+        self.limits = limits
+        self.result = Result()
+        self.proc: subprocess.Popen | None = None
+        self._kill_reason: str | None = None
+        self._readers: list[threading.Thread] = []
+        self._sinks: dict = {}
+
+    def start(self) -> None:
+        """Raises FileNotFoundError like Popen if the program is missing."""
+        self.started = time.monotonic()
+        self.proc = subprocess.Popen(
+            self.cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.cwd,
+            env=self.env,
+            start_new_session=True,     # own session + process group
+        )
+        if self.limits.cpu_seconds and hasattr(resource, "prlimit"):
+            try:
+                # Applied after exec; children forked from here on inherit it
+                resource.prlimit(self.proc.pid, resource.RLIMIT_CPU,
+                                 (self.limits.cpu_seconds, self.limits.cpu_seconds + 5))
+            except OSError:
+                pass
+        for pipe, attr in ((self.proc.stdout, "stdout"), (self.proc.stderr, "stderr")):
+            self._sinks[attr] = self.sink()
+            reader = threading.Thread(target=self._drain, args=(pipe, attr), daemon=True)
+            reader.start()
+            self._readers.append(reader)
+
+    def _drain(self, pipe, attr: str) -> None:
+        sink = self._sinks[attr]
+        for chunk in iter(lambda: pipe.read1(65536), b""):
+            sink.write(chunk)
+        pipe.close()
+
+    def kill(self, reason: str) -> None:
+        """Stop the whole process tree; the first reason given is kept."""
+        if self._kill_reason is None:
+            self._kill_reason = reason
+        self._signal_group(signal.SIGTERM)
+
+    def _signal_group(self, sig: int) -> None:
+        try:
+            os.killpg(self.proc.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def wait(self) -> Result:
+        pid, limits, result = self.proc.pid, self.limits, self.result
+        deadline = self.started + limits.timeout
+        term_sent_at = None
+        peak_kb, next_sample = 0, 0.0
+        while True:
+            waited, status, rusage = os.wait4(pid, os.WNOHANG)
+            if waited:
+                break
+            now = time.monotonic()
+            if now >= next_sample:
+                peak_kb = max(peak_kb, group_rss_kb(pid))
+                next_sample = now + SAMPLE_INTERVAL
+            if self._kill_reason is None:
+                if now > deadline:
+                    self.kill("timeout")
+                elif limits.max_rss_mb and peak_kb > limits.max_rss_mb * 1024:
+                    self.kill("memory")
+            if self._kill_reason and term_sent_at is None:
+                term_sent_at = now
+            elif term_sent_at is not None and now - term_sent_at > KILL_GRACE:
+                self._signal_group(signal.SIGKILL)
+            time.sleep(POLL_INTERVAL)
+
+        result.wall = time.monotonic() - self.started
+
+        # Whatever the leader left behind goes with it
+        self._signal_group(signal.SIGKILL)
+        for reader in self._readers:
+            # A descendant that escaped the group may hold the pipe open
+            reader.join(KILL_GRACE)
+        result.stdout = self._sinks["stdout"].getvalue()
+        result.stderr = self._sinks["stderr"].getvalue()
+
+        self.proc.returncode = os.waitstatus_to_exitcode(status)
+        result.returncode = self.proc.returncode
+        result.cpu = rusage.ru_utime + rusage.ru_stime
+        # ru_maxrss is KB on Linux, bytes on macOS
+        maxrss_kb = rusage.ru_maxrss / 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+        result.peak_rss_mb = max(peak_kb, maxrss_kb) / 1024
+        if self._kill_reason:
+            result.killed = self._kill_reason
+        elif result.returncode == -signal.SIGXCPU:
+            result.killed = "cpu"
+        return result
+
+
+class _BytesSink:
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    def write(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+
+    def getvalue(self) -> str:
+        return b"".join(self.chunks).decode("utf-8", "replace")
@@ -0,0 +1,227 @@
+"""What this session changed, computed once per Stop for every Stop hook.
+
+At SessionStart, record_baseline() stores where the session began
+(kept across resume and compact, replaced on startup and clear):
+
+- HEAD
+- the working tree as a commit object (`git stash create`: tracked
+  changes, nothing is stashed or touched) or HEAD if it was clean
+- content hashes of the unignored untracked files
+
+At Stop, changes() diffs the current working tree against that baseline:
+files changed by the session's commits and uncommitted edits alike,
+minus anything already dirty at start and left alone. Nothing depends
+on HEAD~N, so shallow clones and fresh repos work. The result (files,
+session commits, unified diff hunks per file; untracked files appear as
+wholly added) is cached per session.
+Stop hooks run in parallel; the first computes it under an exclusive
+flock while the others wait and read it. The cache holds while HEAD and
+the transcript are unchanged, so the next turn's Stop recomputes.
+
+  /tmp/claude-session-changes-{session}.base.json   baseline
+  /tmp/claude-session-changes-{session}.json        latest snapshot
+  /tmp/claude-session-changes-{session}.lock
+
+Sessions without a baseline (started before this was installed, or
+outside a repository) get None; callers keep their previous behavior.
+"""
+import fcntl
+import json
+import os
+import re
+
+# Diff text kept per Stop; files past the cut get no hunks
+MAX_DIFF_BYTES = 1 << 20
+
+# Untracked files larger than this are listed but not shown as hunks
+MAX_NEW_FILE_BYTES = 64 << 10
+
+
+def _path(session_id: str, suffix: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_-]", "_", session_id)
+    return f"/tmp/claude-session-changes-{safe}{suffix}"
+
+
+def _load(path: str) -> dict | None:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _save(path: str, data: dict) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _git(worktree: str, *args: str) -> str | None:
+    import subprocess
+    try:
+        result = subprocess.run(["git", *args], capture_output=True, timeout=30, cwd=worktree)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode("utf-8", "surrogateescape")
+
+
+def _untracked(worktree: str) -> dict[str, str] | None:
+    """{path: content hash} of unignored untracked files."""
+    from lib.gate_cache import _hash_file
+    out = _git(worktree, "ls-files", "-z", "--others", "--exclude-standard")
+    if out is None:
+        return None
+    hashes = {}
+    for rel in filter(None, out.split("\0")):
+        try:
+            hashes[rel] = _hash_file(os.path.join(worktree, rel))
+        except OSError:
+            pass
+    return hashes
+
+
+def record_baseline(session_id: str, cwd: str, source: str | None = None) -> None:
+    """Remember the session's starting point (SessionStart). SessionStart
+    also fires on resume and compact with the same session_id; those keep
+    the existing baseline, only startup and clear replace it."""
+    from lib.git import find_repo, head_commit
+    if not session_id:
+        return
+    if source not in ("startup", "clear") and os.path.exists(_path(session_id, ".base.json")):
+        return
+    repo = find_repo(cwd)
+    if repo is None or repo.worktree is None:
+        return
+    head = head_commit(repo.worktree)
+    untracked = _untracked(repo.worktree)
+    if head is None or untracked is None:
+        return      # unborn branch or git failing: nothing to diff against
+    base = (_git(repo.worktree, "stash", "create") or "").strip() or head
+    try:
+        _save(_path(session_id, ".base.json"), {
+            "worktree": repo.worktree, "head": head, "base": base, "untracked": untracked,
+        })
+    except OSError:
+        pass
+
+
+def _stamp(worktree: str, transcript: str | None) -> list | None:
+    from lib.git import head_commit
+    if not transcript:
+        return None
+    try:
+        st = os.stat(transcript)
+    except OSError:
+        return None
+    return [head_commit(worktree), st.st_size, st.st_mtime_ns]
+
+
+def _split_hunks(diff: str) -> dict[str, str]:
+    hunks, current, lines = {}, None, []
+    for line in diff.splitlines(keepends=True):
+        m = re.match(r"diff --git a/(.*) b/(.*)\n?$", line)
+        if m:
+            if current is not None:
+                hunks[current] = "".join(lines)
+            current, lines = m.group(2), []
+        lines.append(line)
+    if current is not None:
+        hunks[current] = "".join(lines)
+    return hunks
+
+
+def _new_file_hunk(worktree: str, rel: str) -> str | None:
+    try:
+        with open(os.path.join(worktree, rel), "rb") as f:
+            data = f.read(MAX_NEW_FILE_BYTES + 1)
+    except OSError:
+        return None
+    if len(data) > MAX_NEW_FILE_BYTES or b"\0" in data:
+        return None
+    lines = data.decode("utf-8", "replace").splitlines()
+    body = "".join(f"+{line}\n" for line in lines)
+    return f"--- /dev/null\n+++ b/{rel}\n@@ -0,0 +1,{len(lines)} @@\n{body}"
+
+
+def _compute(baseline: dict) -> dict | None:
+    worktree, base = baseline["worktree"], baseline["base"]
+    tracked = _git(worktree, "diff", "--name-only", "-z", "--no-renames", base)
+    untracked = _untracked(worktree)
+    if tracked is None or untracked is None:
+        return None
+    from lib.gate_cache import _hash_file
+    started_untracked = baseline["untracked"]
+    tracked_changed = []
+    for rel in filter(None, tracked.split("\0")):
+        if rel in started_untracked:
+            # Untracked at start, committed since: only a change if edited
+            try:
+                if _hash_file(os.path.join(worktree, rel)) == started_untracked[rel]:
+                    continue
+            except OSError:
+                pass
+        tracked_changed.append(rel)
+    new_or_edited = [rel for rel, digest in untracked.items()
+                     if started_untracked.get(rel) != digest]
+    # Untracked at start, deleted since
+    gone = [rel for rel in started_untracked if rel not in untracked
+            and not os.path.exists(os.path.join(worktree, rel))]
+
+    hunks: dict[str, str] = {}
+    if tracked_changed:
+        diff = _git(worktree, "diff", "--no-color", "--no-renames", base, "--", *tracked_changed)
+        if diff is not None:
+            hunks = _split_hunks(diff[:MAX_DIFF_BYTES])
+    size = sum(map(len, hunks.values()))
+    for rel in new_or_edited:
+        hunk = _new_file_hunk(worktree, rel)
+        if hunk and size + len(hunk) <= MAX_DIFF_BYTES:
+            hunks[rel] = hunk
+            size += len(hunk)
+
+    commits = []
+    head = baseline["head"]
+    log = _git(worktree, "rev-list", "--reverse", f"{head}..HEAD")
+    if log is not None:
+        commits = log.split()
+    return {
+        "worktree": worktree,
+        "files": sorted(set(tracked_changed + new_or_edited + gone)),
+        "commits": commits,
+        "hunks": hunks,
+    }
+
+
+def changes(payload: dict) -> dict | None:
+    """This session's changes for a Stop payload: {"worktree", "files"
+    (relative to worktree), "commits", "hunks" (path -> unified diff)}.
+    None without a baseline or if git fails."""
+    session_id = payload.get("session_id")
+    if not session_id:
+        return None
+    baseline = _load(_path(session_id, ".base.json"))
+    if baseline is None:
+        return None
+    stamp = _stamp(baseline["worktree"], payload.get("transcript_path"))
+
+    try:
+        lock_fd = os.open(_path(session_id, ".lock"), os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        return _compute(baseline)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        snapshot = _load(_path(session_id, ".json"))
+        if stamp is not None and snapshot is not None and snapshot.get("stamp") == stamp:
+            return snapshot["changes"]
+        result = _compute(baseline)
+        if result is not None and stamp is not None:
+            try:
+                _save(_path(session_id, ".json"), {"stamp": stamp, "changes": result})
+            except OSError:
+                pass
+        return result
+    finally:
+        os.close(lock_fd)
@@ -0,0 +1,177 @@
+"""Delegation session metrics shared by delegation-guard, codex-session-init
+and codex-post-feedback.
+
+Storage is an append-only event log plus a compacted snapshot:
+
+  /tmp/claude-delegation-{key}.json   snapshot (files_touched, directories_touched,
+                                      new_files_created, total_lines_added)
+  /tmp/claude-delegation-{key}.log    one JSON line per edit since the snapshot
+
+Recording an edit appends one short line instead of rewriting the whole
+file. Readers load the snapshot into sets and replay the log. Once the log
+passes COMPACT_AFTER lines, the next writer folds it into the snapshot.
+The key is the parent PID: every hook Claude Code spawns in one session
+shares it.
+
+Parallel tool calls run these hooks concurrently. An advisory flock on
+/tmp/claude-delegation-{key}.lock orders them: appends and reads take it
+shared (O_APPEND lines don't interleave), compaction and reset take it
+exclusive, so no reader ever sees a snapshot that already contains log
+lines still on disk. Compaction only tries the lock: flock lets a steady
+stream of shared holders starve an exclusive waiter, and a busy session
+can just compact on a later edit. Snapshots are written to a temp file
+and renamed.
+"""
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+
+STATE_PREFIX = "/tmp/claude-delegation-"
+
+# Log lines before the next writer folds them into the snapshot
+COMPACT_AFTER = 200
+
+
+class SessionStats:
+    """Session metrics with O(1) membership on files and directories."""
+
+    def __init__(self):
+        self.files: set[str] = set()
+        self.directories: set[str] = set()
+        self.new_files_created = 0
+        self.total_lines_added = 0
+
+    @property
+    def num_files(self) -> int:
+        return len(self.files)
+
+    @property
+    def num_dirs(self) -> int:
+        return len(self.directories)
+
+    def apply(self, event: dict) -> None:
+        self.files.add(event["f"])
+        self.directories.add(event["d"])
+        self.new_files_created += event.get("n", 0)
+        self.total_lines_added += event.get("l", 0)
+
+    def to_snapshot(self) -> dict:
+        return {
+            "files_touched": sorted(self.files),
+            "new_files_created": self.new_files_created,
+            "total_lines_added": self.total_lines_added,
+            "directories_touched": sorted(self.directories),
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "SessionStats":
+        stats = cls()
+        stats.files = set(data.get("files_touched", []))
+        stats.directories = set(data.get("directories_touched", []))
+        stats.new_files_created = data.get("new_files_created", 0)
+        stats.total_lines_added = data.get("total_lines_added", 0)
+        return stats
+
+
+class SessionStore:
+    def __init__(self, key: int | str | None = None):
+        key = os.getppid() if key is None else key
+        self.snapshot_path = f"{STATE_PREFIX}{key}.json"
+        self.log_path = f"{STATE_PREFIX}{key}.log"
+        self.lock_path = f"{STATE_PREFIX}{key}.lock"
+        self.lock_wait = 0.0    # seconds spent blocked on the lock
+
+    @contextmanager
+    def _locked(self, mode: int):
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            start = time.perf_counter()
+            fcntl.flock(fd, mode)
+            self.lock_wait += time.perf_counter() - start
+            yield
+        finally:
+            os.close(fd)  # releases the lock
+
+    def _read_snapshot(self) -> dict | None:
+        try:
+            with open(self.snapshot_path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _read_log(self) -> list[dict]:
+        try:
+            with open(self.log_path) as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # torn trailing line from a crashed writer
+        return events
+
+    def load(self) -> tuple[SessionStats | None, int]:
+        """(stats, log length), stats None when the session has no state."""
+        snapshot = self._read_snapshot()
+        events = self._read_log()
+        if snapshot is None and not events:
+            return None, 0
+        stats = SessionStats.from_snapshot(snapshot or {})
+        for event in events:
+            stats.apply(event)
+        return stats, len(events)
+
+    def stats(self) -> SessionStats | None:
+        """Current metrics, or None before the first recorded edit/reset."""
+        with self._locked(fcntl.LOCK_SH):
+            return self.load()[0]
+
+    def reset(self) -> None:
+        """Start an empty session (SessionStart)."""
+        with self._locked(fcntl.LOCK_EX):
+            self._write_snapshot(SessionStats())
+            try:
+                os.unlink(self.log_path)
+            except FileNotFoundError:
+                pass
+
+    def record_edit(self, file_path: str, directory: str, lines: int, new_file: bool) -> SessionStats:
+        """Append one edit and return the updated metrics."""
+        event = {"f": file_path, "d": directory, "n": int(new_file), "l": lines}
+        line = (json.dumps(event, separators=(",", ":")) + "\n").encode()
+        with self._locked(fcntl.LOCK_SH):
+            # One write() on an O_APPEND fd: concurrent lines never interleave
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            stats, log_length = self.load()
+
+        if log_length >= COMPACT_AFTER:
+            self._compact()
+        return stats
+
+    def _compact(self) -> None:
+        try:
+            with self._locked(fcntl.LOCK_EX | fcntl.LOCK_NB):
+                # Re-read: another writer may have compacted since our load
+                stats, log_length = self.load()
+                if stats is None or log_length < COMPACT_AFTER:
+                    return
+                self._write_snapshot(stats)
+                os.unlink(self.log_path)
+        except BlockingIOError:
+            pass  # others are mid-update; a later edit compacts
+
+    def _write_snapshot(self, stats: SessionStats) -> None:
+        """Temp file + rename: readers see the old or new snapshot, never half."""
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(stats.to_snapshot(), f)
+        os.replace(tmp, self.snapshot_path)
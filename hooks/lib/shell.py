@@ -0,0 +1,332 @@
+"""Bash command parser shared by the PreToolUse guards.
+
+parse() splits a command string once into segments: simple commands
+separated by ;, &&, ||, |, &, newlines, subshells, $(...) and backticks.
+Each segment carries its argv (quotes removed), the operator that ended it,
+redirections, heredoc bodies and its raw text. Guards query segments instead
+of rescanning the whole string with their own regexes.
+
+Tokenizing is one regex pass, so cost is linear in command length even for
+multi-megabyte heredocs. It is a guard's parser, not a shell: no expansion,
+no arithmetic, no nested quoting inside "$(...)".
+"""
+import re
+from functools import lru_cache
+
+# One alternative per token kind, tried in order at each position. "plain"
+# swallows whole runs of unquoted words and blanks; str.split() separates them.
+TOKEN = re.compile(r"""
+    (?P<plain>[^'"\\|&;()<>`$#\n]+)
+  | (?P<newline>\n)
+  | (?P<continuation>\\\r?\n)
+  | (?P<single>'[^']*'?)
+  | (?P<double>"[^"\\]*(?:\\[\s\S]?[^"\\]*)*"?)
+  | (?P<ansi>\$'(?:[^'\\]|\\[\s\S])*'?)
+  | (?P<escape>\\[\s\S]?)
+  | (?P<heredoc><<-?)(?!<)
+  | (?P<redirect><<<|&>>|&>|>>|>&|<&|>\||<>|>|<)
+  | (?P<op>&&|\|\||;;|\|&|[;&|])
+  | (?P<subopen>\$\(|\(|`)
+  | (?P<subclose>\))
+  | (?P<hash>\#)
+  | (?P<dollar>\$)
+""", re.VERBOSE)
+
+ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*\+?=")
+
+# Shell words that precede the command proper: `if git push`, `{ rm x; }`
+RESERVED = {"!", "{", "}", "if", "then", "elif", "else", "do", "while", "until"}
+
+# Commands that run their arguments as another command
+WRAPPERS = {"sudo", "env", "command", "exec", "nohup", "time", "xargs", "nice"}
+
+# Interpreters whose -c argument or heredoc stdin is itself shell code
+SHELLS = {"sh", "bash", "zsh", "dash", "ksh"}
+
+# Builtins that run their joined arguments as shell code
+EVALUATORS = {"eval"}
+
+GIT_OPTIONS_WITH_VALUE = {"-C", "-c", "--git-dir", "--work-tree", "--namespace"}
+
+
+class Segment:
+    """One simple command."""
+
+    def __init__(self, start: int, depth: int):
+        self.argv: list[str] = []
+        self.op = ""                 # operator that ended it: |, &&, ;, ...
+        self.redirects: list[tuple[str, str]] = []
+        self.heredocs: list[tuple[str, str]] = []   # (delimiter, body)
+        self.depth = depth           # subshell / substitution nesting
+        self.start = start
+        self.end = start
+        self.text = ""               # raw source, heredoc bodies excluded
+        # argv without leading assignments, reserved words and wrappers,
+        # and its first word: what actually runs
+        self.words: list[str] = []
+        self.command = ""
+
+    def __repr__(self) -> str:
+        return f"Segment({self.argv!r}, op={self.op!r}, depth={self.depth})"
+
+
+def command_words(argv: list[str]) -> list[str]:
+    """argv without leading assignments, reserved words and wrappers."""
+    i = 0
+    while i < len(argv):
+        if argv[i] in RESERVED or ASSIGNMENT.match(argv[i]):
+            i += 1
+        elif argv[i] in WRAPPERS:
+            i += 1
+            while i < len(argv) and argv[i].startswith("-"):
+                i += 1
+        else:
+            break
+    return argv[i:] if i else argv
+
+
+class ParsedCommand:
+    def __init__(self, source: str):
+        self.source = source
+        self.segments: list[Segment] = []
+        # Source with quoted content, heredoc bodies and comments removed
+        # (quote characters kept): what regex guards should scan
+        self.unquoted = ""
+        self.quoted_spans: list[tuple[int, int]] = []
+
+    def commands(self, name: str) -> list[Segment]:
+        return [s for s in self.segments if s.command == name]
+
+    def pipelines(self) -> list[list[Segment]]:
+        """Segments grouped into pipelines (runs joined by | or |&)."""
+        groups, current = [], []
+        for segment in self.segments:
+            current.append(segment)
+            if segment.op not in ("|", "|&"):
+                groups.append(current)
+                current = []
+        if current:
+            groups.append(current)
+        return groups
+
+
+def unquote(raw: str, kind: str) -> str:
+    if kind == "single":
+        return raw[1:-1] if len(raw) > 1 and raw.endswith("'") else raw[1:]
+    if kind == "double":
+        inner = raw[1:-1] if len(raw) > 1 and raw.endswith('"') else raw[1:]
+        return re.sub(r'\\([\\"$`])', r"\1", inner)
+    if kind == "ansi":
+        return raw[2:-1] if raw.endswith("'") else raw[2:]
+    if kind == "escape":
+        return raw[1:]
+    return raw
+
+
+class _Parser:
+    """Single left-to-right pass over TOKEN matches."""
+
+    def __init__(self, cmd: str, depth: int):
+        self.cmd = cmd
+        self.parsed = ParsedCommand(cmd)
+        self.unquoted: list[str] = []
+        self.segment = self.open_segment(0, depth)
+        self.word: list[str] | None = None         # word being assembled
+        self.redirect: str | None = None           # operator awaiting its target
+        self.heredocs: list[tuple[Segment, str, bool]] = []  # bodies still to read
+        # Enclosing (segment, word, closer) for each open $( ( or `
+        self.stack: list[tuple[Segment, list[str] | None, str]] = []
+
+    def open_segment(self, start: int, depth: int) -> Segment:
+        segment = Segment(start, depth)
+        self.parsed.segments.append(segment)
+        return segment
+
+    def add_piece(self, piece: str) -> None:
+        if self.word is None:
+            self.word = []
+        self.word.append(piece)
+
+    def add_plain(self, raw: str) -> None:
+        """Unquoted run: blank-separated words, the first and last possibly
+        glued to neighbouring quoted pieces."""
+        if raw[0] in " \t\r":
+            self.finish_word()
+        parts = raw.split()
+        for i, part in enumerate(parts):
+            if i:
+                self.finish_word()
+            self.add_piece(part)
+        if parts and raw[-1] in " \t\r":
+            self.finish_word()
+
+    def finish_word(self) -> None:
+        if self.word is None:
+            return
+        value = "".join(self.word)
+        self.word = None
+        if self.redirect is None:
+            self.segment.argv.append(value)
+            return
+        self.segment.redirects.append((self.redirect, value))
+        if self.redirect in ("<<", "<<-"):
+            self.heredocs.append((self.segment, value, self.redirect == "<<-"))
+        self.redirect = None
+
+    def close_segment(self, end: int, op: str) -> None:
+        self.finish_word()
+        segment = self.segment
+        segment.end = end
+        segment.text = self.cmd[segment.start:end].strip()
+        segment.op = op
+        segment.words = command_words(segment.argv)
+        segment.command = segment.words[0] if segment.words else ""
+
+    def run(self) -> ParsedCommand:
+        cmd, unquoted = self.cmd, self.unquoted
+        pos, n = 0, len(cmd)
+        while pos < n:
+            m = TOKEN.match(cmd, pos)
+            kind, raw, end = m.lastgroup, m.group(), m.end()
+
+            if kind == "plain":
+                self.add_plain(raw)
+                unquoted.append(raw)
+            elif kind == "hash" and self.word is None:
+                # Comment: runs to end of line, never scanned
+                nl = cmd.find("\n", pos)
+                end = n if nl < 0 else nl
+            elif kind in ("single", "double", "ansi"):
+                self.add_piece(unquote(raw, kind))
+                self.parsed.quoted_spans.append((pos, end))
+                quote = "'" if kind == "ansi" else raw[0]
+                unquoted.append(quote * 2)
+            elif kind in ("escape", "hash", "dollar"):
+                self.add_piece(unquote(raw, kind))
+                unquoted.append(raw)
+            elif kind == "continuation":
+                self.finish_word()
+                unquoted.append(" ")
+            elif kind in ("heredoc", "redirect"):
+                if self.word is not None and "".join(self.word).isdigit():
+                    self.word = None   # fd number: 2>&1
+                self.finish_word()
+                self.redirect = raw
+                unquoted.append(raw)
+            elif kind == "newline":
+                self.close_segment(pos, ";")
+                unquoted.append("\n")
+                if self.heredocs:
+                    end = _read_heredocs(cmd, end, self.heredocs)
+                    self.heredocs = []
+                self.segment = self.open_segment(end, self.segment.depth)
+            elif kind == "op":
+                self.close_segment(pos, raw)
+                unquoted.append(raw)
+                self.segment = self.open_segment(end, self.segment.depth)
+            elif kind == "subopen" and raw == "`" and self.stack and self.stack[-1][2] == "`":
+                self.close_subshell(pos, raw)
+            elif kind == "subopen":
+                # $(...) and `...` belong to the enclosing word; ( starts a group
+                outer_word = self.word if self.word is not None else ([] if raw != "(" else None)
+                self.stack.append((self.segment, outer_word, "`" if raw == "`" else ")"))
+                self.word = None
+                unquoted.append(raw)
+                self.segment = self.open_segment(end, self.segment.depth + 1)
+            elif kind == "subclose":
+                if self.stack and self.stack[-1][2] == ")":
+                    self.close_subshell(pos, raw)
+                else:
+                    unquoted.append(raw)
+            pos = end
+
+        self.close_segment(n, "")
+        while self.stack:
+            self.segment, self.word, _ = self.stack.pop()
+            self.close_segment(n, "")
+
+        parsed = self.parsed
+        # Blank lines, leading operators and the like leave empty segments
+        parsed.segments = [s for s in parsed.segments if s.argv or s.redirects]
+        parsed.unquoted = "".join(unquoted)
+        return parsed
+
+    def close_subshell(self, pos: int, raw: str) -> None:
+        self.close_segment(pos, raw)
+        self.unquoted.append(raw)
+        self.segment, self.word, _ = self.stack.pop()
+
+
+def _parse(cmd: str, depth: int = 0) -> ParsedCommand:
+    parsed = _Parser(cmd, depth).run()
+    # Shell code hidden from the outer parse: `bash -c "..."`, `eval "..."`,
+    # `bash <<EOF` and `cat <<EOF | sh`
+    for pipeline in parsed.pipelines():
+        for segment, code in _embedded_code(pipeline):
+            inner = _parse(code, segment.depth + 1)
+            parsed.segments.extend(inner.segments)
+            parsed.unquoted += "\n" + inner.unquoted
+    return parsed
+
+
+def _read_heredocs(cmd: str, pos: int, pending: list[tuple[Segment, str, bool]]) -> int:
+    """Consume heredoc bodies starting at pos; return position after them."""
+    for segment, delimiter, strip_tabs in pending:
+        terminator = re.compile(
+            r"^" + (r"\t*" if strip_tabs else "") + re.escape(delimiter) + r"[ \t]*$",
+            re.MULTILINE,
+        )
+        m = terminator.search(cmd, pos)
+        body_end = m.start() if m else len(cmd)
+        segment.heredocs.append((delimiter, cmd[pos:body_end]))
+        pos = min(m.end() + 1, len(cmd)) if m else len(cmd)
+    return pos
+
+
+def _is_shell(segment: Segment) -> bool:
+    return segment.command.rsplit("/", 1)[-1] in SHELLS
+
+
+def _embedded_code(pipeline: list[Segment]) -> list[tuple[Segment, str]]:
+    code = []
+    for i, segment in enumerate(pipeline):
+        if segment.command in EVALUATORS:
+            code.append((segment, " ".join(segment.words[1:])))
+            continue
+        if not _is_shell(segment):
+            continue
+        words = segment.words
+        for j, word in enumerate(words[1:-1], 1):
+            if word.startswith("-") and not word.startswith("--") and "c" in word:
+                code.append((segment, words[j + 1]))
+                break
+        else:
+            # No -c: stdin is the script, from its own heredoc or upstream
+            for feeder in pipeline[:i + 1]:
+                code += [(segment, body) for _, body in feeder.heredocs]
+    return code
+
+
+@lru_cache(maxsize=16)
+def parse(cmd: str) -> ParsedCommand:
+    """Parse a Bash command. Cached: every guard in one process shares it."""
+    return _parse(cmd)
+
+
+def git_subcommand(segment: Segment) -> tuple[str, list[str]]:
+    """("push", [args]) for a git segment, skipping global options; ("", [])
+    if the segment isn't git."""
+    words = segment.words
+    if not words or words[0] != "git":
+        return "", []
+    i = 1
+    while i < len(words) and words[i].startswith("-"):
+        i += 2 if words[i] in GIT_OPTIONS_WITH_VALUE else 1
+    if i >= len(words):
+        return "", []
+    return words[i], words[i + 1:]
+
+
+def strip_quoted_content(cmd: str) -> str:
+    """Command with quoted content, heredoc bodies and comments removed."""
+    return parse(cmd).unquoted
@@ -0,0 +1,37 @@
+"""Private per-user directories for hook state that other users must not
+read or plant: anything holding secrets, commands to run, or verdicts a
+hook trusts.
+
+  /tmp/claude-hooks-{uid}/           0700, owned by the current user
+  /tmp/claude-hooks-{uid}/<name>/    same
+
+private_dir() creates what's missing and refuses (PermissionError) a
+directory that is a symlink, belongs to another user, or is open to
+group or others: someone created it first. Callers treat that like any
+other state-file failure and fall back to running without the state.
+"""
+import os
+import stat
+
+BASE = f"/tmp/claude-hooks-{os.getuid()}"
+
+
+def _ensure(path: str) -> None:
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if (not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid()
+            or st.st_mode & 0o077):
+        raise PermissionError(f"{path} is not a private directory of this user")
+
+
+def private_dir(name: str = "") -> str:
+    """Path of the verified private directory BASE/name (BASE if no name)."""
+    _ensure(BASE)
+    if not name:
+        return BASE
+    path = os.path.join(BASE, name)
+    _ensure(path)
+    return path
@@ -1,6 +1,5 @@
 """Shared utilities for agent team detection."""
 import time
-from pathlib import Path
 
 
 def is_in_active_team() -> bool:
@@ -9,6 +8,7 @@ def is_in_active_team() -> bool:
     Looks for fresh (<24h) config files in ~/.claude/teams/.
     Freshness prevents stale configs from permanently disabling enforcement.
     """
+    from pathlib import Path
     teams_dir = Path.home() / ".claude/teams"
     if not teams_dir.exists():
         return False
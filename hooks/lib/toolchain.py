@@ -0,0 +1,186 @@
+"""Resolve quality-gate commands to concrete binaries, without forking.
+
+`which` costs a fork per lookup, and `pnpm tsc` / `pnpm lint` pay a few
+hundred milliseconds of pnpm startup before the real tool runs. The gate
+resolves each command once per project instead:
+
+- tools: node_modules/.bin (cwd up to the repository root), the project
+  virtualenv (.venv, venv, $VIRTUAL_ENV; uv and in-project poetry envs
+  live in .venv), ~/.cargo/bin, Go's bin dirs, then PATH
+- `pnpm <bin>` and `pnpm exec <bin>` run the bin directly
+- `pnpm <script>` runs the script's own command line (with its flags)
+  directly when it is one plain command; scripts with shell syntax, env
+  assignments or pre/post hooks still go through the package manager
+
+Lookups are cached per project in /tmp/claude-toolchain-{hash}.json and
+invalidated when a lockfile or manifest changes mtime or PATH changes.
+"""
+import hashlib
+import json
+import os
+
+PACKAGE_MANAGERS = {"pnpm", "npm", "yarn"}
+
+# Built-in subcommands: never a bin of the same name
+PACKAGE_MANAGER_COMMANDS = {"test", "start", "install", "add", "remove", "update",
+                            "exec", "run", "dlx", "create", "publish"}
+
+# Any change here can move, add or remove binaries
+LOCKFILES = (
+    "package.json", "pnpm-lock.yaml", "package-lock.json", "yarn.lock",
+    "pyproject.toml", "uv.lock", "poetry.lock", "requirements.txt",
+    "Cargo.toml", "Cargo.lock", "go.mod", "go.sum",
+)
+
+# Script text that needs a real shell
+SHELL_SYNTAX = set("&|;<>$`()*?\\\"'\n")
+
+
+def _stamp(cwd: str) -> list:
+    stamp = []
+    for name in LOCKFILES:
+        try:
+            stamp.append(os.stat(os.path.join(cwd, name)).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return stamp + [os.environ.get("PATH", ""), os.environ.get("VIRTUAL_ENV", "")]
+
+
+def _project_root(cwd: str) -> str:
+    from lib.git import find_repo
+    repo = find_repo(cwd)
+    return repo.worktree if repo and repo.worktree else cwd
+
+
+def search_dirs(cwd: str) -> list[str]:
+    """Project-local bin dirs first, then toolchain homes, then PATH."""
+    dirs = []
+    root = _project_root(cwd)
+    directory = os.path.abspath(cwd)
+    while True:
+        dirs.append(os.path.join(directory, "node_modules", ".bin"))
+        if directory == root or os.path.dirname(directory) == directory:
+            break
+        directory = os.path.dirname(directory)
+
+    for venv in (os.path.join(cwd, ".venv"), os.path.join(cwd, "venv"), os.environ.get("VIRTUAL_ENV")):
+        if venv:
+            dirs.append(os.path.join(venv, "bin"))
+
+    home = os.path.expanduser("~")
+    dirs.append(os.path.join(os.environ.get("CARGO_HOME", os.path.join(home, ".cargo")), "bin"))
+    if os.environ.get("GOROOT"):
+        dirs.append(os.path.join(os.environ["GOROOT"], "bin"))
+    dirs.append(os.path.join(os.environ.get("GOPATH", os.path.join(home, "go")), "bin"))
+    dirs.append("/usr/local/go/bin")
+
+    dirs += os.environ.get("PATH", "").split(os.pathsep)
+    return dirs
+
+
+def bin_path(cwd: str) -> str:
+    """PATH for checks: project bin dirs first, like `pnpm run` sets up."""
+    return os.pathsep.join(d for d in search_dirs(cwd) if d)
+
+
+class Toolchain:
+    """Binary lookups for one project directory."""
+
+    def __init__(self, cwd: str):
+        self.cwd = os.path.abspath(cwd)
+        key = hashlib.sha1(self.cwd.encode()).hexdigest()[:16]
+        self.cache_path = f"/tmp/claude-toolchain-{key}.json"
+        self.stamp = _stamp(self.cwd)
+        self.tools: dict[str, str | None] = {}
+        self.dirty = False
+        self._dirs: list[str] | None = None
+        self._scripts: dict | None = None
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            if cached.get("stamp") == self.stamp:
+                self.tools = cached.get("tools", {})
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def find(self, tool: str, node_only: bool = False) -> str | None:
+        """Absolute path of tool, or None if it isn't installed. node_only
+        limits the search to node_modules/.bin, where `pnpm <bin>` looks."""
+        if os.sep in tool:
+            return tool if os.access(tool, os.X_OK) else None
+        key = f"node_modules/.bin/{tool}" if node_only else tool
+        path = self.tools.get(key)
+        if path and os.access(path, os.X_OK):
+            return path
+        if key in self.tools and path is None:
+            return None
+        if self._dirs is None:
+            self._dirs = search_dirs(self.cwd)
+        path = None
+        for directory in self._dirs:
+            if node_only and not directory.endswith(os.path.join("node_modules", ".bin")):
+                continue
+            candidate = os.path.join(directory, tool)
+            if directory and os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+                path = candidate
+                break
+        self.tools[key] = path
+        self.dirty = True
+        return path
+
+    def scripts(self) -> dict:
+        if self._scripts is None:
+            try:
+                with open(os.path.join(self.cwd, "package.json")) as f:
+                    self._scripts = json.load(f).get("scripts") or {}
+            except (OSError, json.JSONDecodeError, AttributeError):
+                self._scripts = {}
+        return self._scripts
+
+    def script_command(self, name: str) -> list[str] | None:
+        """argv of a package.json script that is one plain command."""
+        scripts = self.scripts()
+        script = scripts.get(name)
+        if not isinstance(script, str) or f"pre{name}" in scripts or f"post{name}" in scripts:
+            return None
+        if SHELL_SYNTAX & set(script):
+            return None
+        argv = script.split()
+        if not argv or "=" in argv[0] or argv[0] in PACKAGE_MANAGERS:
+            return None
+        binary = self.find(argv[0])
+        return [binary, *argv[1:]] if binary else None
+
+    def resolve(self, cmd: list[str]) -> list[str] | None:
+        """cmd with its program made absolute and package-manager
+        trampolines removed; None if the program isn't installed."""
+        program, args = cmd[0], cmd[1:]
+        if program in PACKAGE_MANAGERS and args:
+            direct = None
+            if args[0] == "exec" and len(args) > 1:
+                binary = self.find(args[1], node_only=True)
+                direct = [binary, *args[2:]] if binary else None
+            elif args[0] == "run" and len(args) > 1:
+                script = self.script_command(args[1])
+                direct = script + args[2:] if script else None
+            elif args[0] in self.scripts():
+                script = self.script_command(args[0])
+                direct = script + args[1:] if script else None
+            elif args[0] not in PACKAGE_MANAGER_COMMANDS:
+                binary = self.find(args[0], node_only=True)
+                direct = [binary, *args[1:]] if binary else None
+            if direct:
+                return direct
+        binary = self.find(program)
+        return [binary, *args] if binary else None
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"stamp": self.stamp, "tools": self.tools}, f)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass
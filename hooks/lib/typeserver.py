@@ -0,0 +1,341 @@
+"""Warm type-checker servers for stop-quality-gate.
+
+Cold `tsc --noEmit` rebuilds the whole program at every Stop. With
+"warmTypecheck" on, the gate instead keeps one watcher per project
+(`tsc --noEmit --watch`) alive between turns and reads its latest
+diagnostics.
+
+Only watchers that print a line when a cycle starts are offered: without
+one there's no telling whether a cycle saw the latest edit. That rules
+out `pyright --watch`, which prints nothing until a cycle is done;
+pyright always runs cold.
+
+Each watcher runs under a detached supervisor (`python3 lib/typeserver.py
+serve <key>`) that:
+
+- holds an exclusive flock on <key>.lock for its lifetime: one instance
+  per project and command
+- records each completed check cycle (start time, error count, bounded
+  output) in <key>.result.json; the start is the watcher's cycle-start
+  line ("Starting ... compilation" for tsc)
+- exits, killing the watcher's process group, once <key>.used is older
+  than the idle timeout or the watcher dies
+
+Registry, all under REGISTRY_DIR (private to the user, lib/statedir.py:
+the spec holds the environment, and results are trusted):
+  <key>.json          pid/pgid, command, project, start time, idle timeout
+  <key>.spec.json     what to run (written by the gate before spawning)
+  <key>.used          touched by every query; its mtime is "last used"
+  <key>.result.json   the latest completed cycle
+  <key>.log           the supervisor's stderr
+
+A query waits for a cycle that started after the newest source file was
+modified. If none arrives within the wait limit (the watcher missed an
+event, or the first build is slow), or the server exits first, the gate
+falls back to a cold run.
+session-health-check.py calls reap() to clear dead entries and kill
+servers past their idle timeout.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import signal
+import sys
+import time
+
+REGISTRY_DIR = f"/tmp/claude-hooks-{os.getuid()}/typeservers"
+
+IDLE_TIMEOUT = 900      # seconds without a query before a server exits
+WAIT_LIMIT = 60         # longest a query waits for a fresh cycle
+START_GRACE = 5         # seconds a new supervisor has to register itself
+
+# Files whose change a cycle must have seen, per kind
+SOURCE_SUFFIXES = {
+    "tsc": (".ts", ".tsx", ".mts", ".cts", ".js", ".jsx", "tsconfig.json", "package.json"),
+}
+
+# Cycle-start lines; a kind needs one to be served warm
+STARTS = {
+    "tsc": re.compile(r"Starting (?:incremental )?compilation"),
+}
+
+# Cycle-complete lines: (error count group)
+MARKERS = {
+    "tsc": re.compile(r"Found (\d+) errors?\. Watching for file changes"),
+}
+
+
+def watch_command(cmd: list[str]) -> tuple[str, list[str]] | None:
+    """(kind, watch argv) for a type-check command that has a watch mode."""
+    program = os.path.basename(cmd[0])
+    if program == "tsc" and "--noEmit" in cmd and "--build" not in cmd and "-b" not in cmd:
+        return "tsc", [*cmd, "--watch", "--preserveWatchOutput", "--pretty", "false"]
+    return None
+
+
+def source_files(kind: str, root: str, worktree: str, files) -> list[str]:
+    """Absolute paths of kind's sources under root (files relative to
+    worktree), plus their directories: a deletion only touches those."""
+    prefix = os.path.relpath(root, worktree)
+    prefix = "" if prefix == "." else prefix + "/"
+    paths = set()
+    for rel in files:
+        if rel.startswith(prefix) and rel.endswith(SOURCE_SUFFIXES[kind]) and "node_modules/" not in rel:
+            path = os.path.join(worktree, rel)
+            paths.add(path)
+            paths.add(os.path.dirname(path))
+    return sorted(paths)
+
+
+def _paths(key: str) -> dict[str, str]:
+    base = os.path.join(REGISTRY_DIR, key)
+    return {name: f"{base}{suffix}" for name, suffix in (
+        ("entry", ".json"), ("spec", ".spec.json"), ("result", ".result.json"),
+        ("used", ".used"), ("lock", ".lock"), ("log", ".log"))}
+
+
+def _load(path: str) -> dict | None:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _save(path: str, data: dict) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    try:
+        # A killed supervisor stays a zombie until its new parent reaps it
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        return stat[stat.rfind(b")") + 2:][:1] != b"Z"
+    except OSError:
+        return True
+
+
+def _running(paths: dict) -> bool:
+    """True while some supervisor holds the project's lock."""
+    try:
+        fd = os.open(paths["lock"], os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return False
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+
+
+def _exited(paths: dict, waited: float) -> bool:
+    """True once the server is gone: the supervisor removed its spec on
+    exit, died, or never registered within START_GRACE seconds. (Probing
+    the flock instead could make a starting supervisor lose its race.)"""
+    if not os.path.exists(paths["spec"]):
+        return True
+    entry = _load(paths["entry"])
+    if entry is None:
+        return waited > START_GRACE
+    return not _alive(entry["pid"])
+
+
+def _touch(path: str) -> None:
+    with open(path, "a"):
+        pass
+    os.utime(path)
+
+
+def ensure_server(kind: str, argv: list[str], cwd: str, env: dict,
+                  idle_timeout: int = IDLE_TIMEOUT) -> str:
+    """Start the project's server unless one is running; returns its key."""
+    import subprocess
+    from lib.statedir import private_dir
+    private_dir("typeservers")      # PermissionError if someone else's
+    key = hashlib.sha1(json.dumps([cwd, argv]).encode()).hexdigest()[:16]
+    paths = _paths(key)
+    _touch(paths["used"])
+    if _running(paths):
+        return key
+
+    _save(paths["spec"], {"kind": kind, "argv": argv, "cwd": cwd, "env": env,
+                          "idle_timeout": idle_timeout})
+    try:
+        os.unlink(paths["result"])      # never trust a previous server's cycle
+    except FileNotFoundError:
+        pass
+    hooks_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(paths["log"], "ab") as log:
+        subprocess.Popen(
+            [sys.executable, os.path.join(hooks_dir, "lib", "typeserver.py"), "serve", key],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+            cwd=cwd,
+            start_new_session=True,
+            close_fds=True,
+        )
+    return key
+
+
+def query(key: str, files: list[str], timeout: float, cancelled=lambda: False):
+    """(returncode, output) from the first cycle that started after every
+    file in files was last modified; None on timeout or once the server
+    has exited (run cold instead)."""
+    paths = _paths(key)
+    newest = 0.0
+    for path in files:
+        try:
+            newest = max(newest, os.stat(path).st_mtime)
+        except OSError:
+            pass
+    start = time.monotonic()
+    deadline = start + min(timeout, WAIT_LIMIT)
+    while time.monotonic() < deadline and not cancelled():
+        _touch(paths["used"])
+        result = _load(paths["result"])
+        if result and result["started_at"] > newest:
+            return (1 if result["errors"] else 0), result["output"]
+        if _exited(paths, time.monotonic() - start):
+            return None     # e.g. the watcher quit on a bad config
+        time.sleep(0.1)
+    return None
+
+
+def serve(key: str) -> None:
+    """Supervisor main loop (runs detached, one per key)."""
+    import subprocess
+    import threading
+    from lib.capture import BoundedCapture
+
+    from lib.statedir import private_dir
+    private_dir("typeservers")
+    paths = _paths(key)
+    lock_fd = os.open(paths["lock"], os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return      # another supervisor won the race
+    spec = _load(paths["spec"])
+    if spec is None:
+        return
+
+    # Supervisor and watcher share this session's process group: killpg
+    # on it takes down the whole watcher tree
+    launched = time.time()
+    watcher = subprocess.Popen(
+        spec["argv"], cwd=spec["cwd"], env=spec["env"],
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+    )
+    _save(paths["entry"], {
+        "pid": os.getpid(), "pgid": os.getpgid(0), "watcher": watcher.pid,
+        "kind": spec["kind"], "argv": spec["argv"], "cwd": spec["cwd"],
+        "started": time.time(), "idle_timeout": spec["idle_timeout"],
+    })
+
+    start_marker, marker = STARTS[spec["kind"]], MARKERS[spec["kind"]]
+
+    def read_cycles():
+        # started_at must not be later than the cycle really began, or a
+        # cycle that missed an edit looks fresh: take the start line, with
+        # the launch as a lower bound should the first one be missed
+        capture, started = BoundedCapture(), launched
+        for raw in watcher.stdout:
+            line = raw.decode("utf-8", "replace")
+            if start_marker.search(line):
+                started = time.time()
+            capture.write(raw)
+            m = marker.search(line)
+            if m:
+                completed = time.time()
+                _save(paths["result"], {"started_at": started, "completed_at": completed,
+                                        "errors": int(m.group(1)), "output": capture.getvalue()})
+                capture, started = BoundedCapture(), completed
+
+    reader = threading.Thread(target=read_cycles, daemon=True)
+    reader.start()
+    try:
+        while watcher.poll() is None:
+            try:
+                idle = time.time() - os.stat(paths["used"]).st_mtime
+            except OSError:
+                idle = float("inf")
+            if idle > spec["idle_timeout"]:
+                break
+            time.sleep(5)
+    finally:
+        for name in ("entry", "result", "spec"):
+            try:
+                os.unlink(paths[name])
+            except FileNotFoundError:
+                pass
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        os.killpg(0, signal.SIGTERM)
+
+
+def servers() -> list[dict]:
+    """Registry entries, each with "key" and "idle" (seconds) added."""
+    from lib.statedir import private_dir
+    entries = []
+    try:
+        private_dir("typeservers")
+        names = os.listdir(REGISTRY_DIR)
+    except OSError:
+        return []
+    for name in names:
+        if not name.endswith(".json") or name.count(".") != 1:
+            continue
+        key = name[:-5]
+        entry = _load(os.path.join(REGISTRY_DIR, name))
+        if entry is None:
+            continue
+        try:
+            used = os.stat(_paths(key)["used"]).st_mtime
+        except OSError:
+            used = entry.get("started", 0)
+        entries.append({**entry, "key": key, "idle": time.time() - used})
+    return entries
+
+
+def reap() -> tuple[int, int]:
+    """Kill servers whose supervisor died or that are past their idle
+    timeout, and clear their entries. Returns (still running, reaped)."""
+    running = reaped = 0
+    for entry in servers():
+        paths = _paths(entry["key"])
+        stale = (not _alive(entry["pid"])
+                 or entry["idle"] > entry.get("idle_timeout", IDLE_TIMEOUT))
+        if stale:
+            # The watcher outlives a killed supervisor: take the whole group
+            try:
+                os.killpg(entry["pgid"], signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            reaped += 1
+            for name in ("entry", "result", "spec"):
+                try:
+                    os.unlink(paths[name])
+                except FileNotFoundError:
+                    pass
+        else:
+            running += 1
+    return running, reaped
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["serve"]:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    serve(sys.argv[2])
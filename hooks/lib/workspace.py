@@ -0,0 +1,265 @@
+"""Workspace discovery for stop-quality-gate: which packages a repo holds
+and which of them a set of changed files touches.
+
+A package is a directory with a manifest (package.json, pyproject.toml,
+Cargo.toml, go.mod). Nested manifests only count when they are the
+outermost of their kind or a declared workspace member:
+
+- pnpm-workspace.yaml `packages:` / package.json `workspaces`
+- Cargo.toml `[workspace] members` (minus `exclude`)
+- go.work `use`
+- pyproject.toml `[tool.uv.workspace] members`
+
+so fixtures and examples with their own manifest are not gated. Each
+changed file belongs to the deepest package containing it; files outside
+every package (a root README in a repo without a root manifest) gate
+nothing. Packages that depend on an affected one, transitively, are
+affected too:
+
+- node: dependencies naming another package's package.json `name`
+- rust: dependencies with a `path`, or `workspace = true` naming a
+  member crate
+- go: `require`d module paths of other modules, and `replace` targets
+  that are local directories
+- python: `[project] dependencies` naming another package's project name
+"""
+import json
+import os
+import re
+from fnmatch import fnmatch
+
+MANIFESTS = {
+    "package.json": "node",
+    "pyproject.toml": "python",
+    "Cargo.toml": "rust",
+    "go.mod": "go",
+}
+
+
+class Package:
+    def __init__(self, path: str, kind: str, worktree: str):
+        self.path = path            # relative to worktree, "" for the root
+        self.kind = kind            # node, python, rust, go
+        self.root = os.path.join(worktree, path) if path else worktree
+
+    def __repr__(self) -> str:
+        return f"Package({self.path or '.'!r}, {self.kind!r})"
+
+    def contains(self, rel: str) -> bool:
+        return not self.path or rel.startswith(self.path + "/")
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _toml(path: str) -> dict:
+    try:
+        import tomllib
+    except ImportError:
+        return {}   # Python < 3.11: TOML manifests declare no members
+    try:
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+
+
+def _pnpm_globs(text: str) -> list[str]:
+    """`packages:` list items from pnpm-workspace.yaml (no YAML parser)."""
+    globs, in_packages = [], False
+    for line in text.splitlines():
+        if re.match(r"^packages\s*:", line):
+            in_packages = True
+        elif in_packages:
+            m = re.match(r"^\s+-\s*['\"]?([^'\"#]+?)['\"]?\s*(?:#.*)?$", line)
+            if m:
+                globs.append(m.group(1))
+            elif line.strip() and not line.startswith((" ", "\t", "#")):
+                in_packages = False
+    return globs
+
+
+def member_globs(worktree: str, package: str, kind: str) -> list[str]:
+    """Workspace member globs a package declares, relative to the worktree.
+    Globs starting with ! exclude."""
+    root = os.path.join(worktree, package)
+    globs: list[str] = []
+    if kind == "node":
+        globs += _pnpm_globs(_read(os.path.join(root, "pnpm-workspace.yaml")))
+        try:
+            workspaces = json.loads(_read(os.path.join(root, "package.json")) or "{}").get("workspaces")
+        except (json.JSONDecodeError, AttributeError):
+            workspaces = None
+        if isinstance(workspaces, dict):
+            workspaces = workspaces.get("packages")
+        if isinstance(workspaces, list):
+            globs += [g for g in workspaces if isinstance(g, str)]
+    elif kind == "rust":
+        workspace = _toml(os.path.join(root, "Cargo.toml")).get("workspace", {})
+        globs += workspace.get("members", [])
+        globs += ["!" + g for g in workspace.get("exclude", [])]
+    elif kind == "go":
+        text = _read(os.path.join(root, "go.work"))
+        for block in re.findall(r"^use\s*\(([^)]*)\)", text, re.MULTILINE):
+            globs += block.split()
+        globs += re.findall(r"^use\s+([^\s(]+)", text, re.MULTILINE)
+    elif kind == "python":
+        uv = _toml(os.path.join(root, "pyproject.toml")).get("tool", {}).get("uv", {})
+        workspace = uv.get("workspace", {})
+        globs += workspace.get("members", [])
+        globs += ["!" + g for g in workspace.get("exclude", [])]
+
+    prefix = package + "/" if package else ""
+    out = []
+    for glob in globs:
+        negate = glob.startswith("!")
+        glob = os.path.normpath(glob.lstrip("!")).removeprefix("./").rstrip("/")
+        glob = "" if glob == "." else glob
+        out.append(("!" if negate else "") + prefix + glob)
+    return out
+
+
+def _declared(path: str, globs: list[str]) -> bool:
+    included = any(fnmatch(path, g) for g in globs if not g.startswith("!"))
+    return included and not any(fnmatch(path, g[1:]) for g in globs if g.startswith("!"))
+
+
+def discover(worktree: str, files) -> list[Package]:
+    """Packages among files (paths relative to worktree), outermost first."""
+    candidates = []
+    for rel in files:
+        name = os.path.basename(rel)
+        if name in MANIFESTS and "node_modules/" not in rel:
+            candidates.append((os.path.dirname(rel), MANIFESTS[name]))
+    candidates.sort(key=lambda c: (c[0].count("/") if c[0] else -1, c[0]))
+
+    packages: list[Package] = []
+    globs: dict[str, list[str]] = {}      # accepted package path -> member globs
+    for path, kind in candidates:
+        ancestors = [p for p in packages
+                     if p.kind == kind and p.path != path and p.contains(path)]
+        if ancestors and not any(_declared(path, globs[a.path + kind]) for a in ancestors):
+            continue
+        packages.append(Package(path, kind, worktree))
+        globs[path + kind] = member_globs(worktree, path, kind)
+    return packages
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _identity(package: Package) -> tuple[str | None, list[str]]:
+    """(name other packages depend on it by, names or local paths it
+    depends on). Paths are relative to the worktree, prefixed with /."""
+    root = package.root
+    if package.kind == "node":
+        try:
+            manifest = json.loads(_read(os.path.join(root, "package.json")) or "{}")
+        except json.JSONDecodeError:
+            return None, []
+        if not isinstance(manifest, dict):
+            return None, []
+        deps = []
+        for field in ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies"):
+            if isinstance(manifest.get(field), dict):
+                deps += manifest[field]
+        name = manifest.get("name")
+        return (name if isinstance(name, str) else None), deps
+    if package.kind == "python":
+        project = _toml(os.path.join(root, "pyproject.toml")).get("project", {})
+        deps = [_normalize(m.group(0)) for d in project.get("dependencies", [])
+                if isinstance(d, str) and (m := re.match(r"[A-Za-z0-9][A-Za-z0-9._-]*", d))]
+        name = project.get("name")
+        return (_normalize(name) if isinstance(name, str) else None), deps
+    if package.kind == "go":
+        text = _read(os.path.join(root, "go.mod"))
+        m = re.search(r"^module\s+(\S+)", text, re.MULTILINE)
+        deps = re.findall(r"^\s*(?:require\s+)?(\S+)\s+v\d", text, re.MULTILINE)
+        for target in re.findall(r"=>\s*(\.{1,2}/\S*)", text):
+            deps.append("/" + os.path.normpath(os.path.join(package.path, target)))
+        return (m.group(1) if m else None), deps
+    if package.kind == "rust":
+        cargo = _toml(os.path.join(root, "Cargo.toml"))
+        tables = [cargo.get(k, {}) for k in ("dependencies", "dev-dependencies", "build-dependencies")]
+        deps = []
+        for table in tables:
+            for name, spec in table.items():
+                if isinstance(spec, dict) and isinstance(spec.get("path"), str):
+                    deps.append("/" + os.path.normpath(os.path.join(package.path, spec["path"])))
+                elif isinstance(spec, dict) and spec.get("workspace"):
+                    deps.append(name)   # a workspace crate, matched by name
+        name = cargo.get("package", {}).get("name")
+        return (name if isinstance(name, str) else None), deps
+    return None, []
+
+
+def dependents(packages: list[Package]) -> dict[int, set[int]]:
+    """Reverse dependency edges: id(package) -> ids of the packages of the
+    same kind that depend on it."""
+    identities = {id(p): _identity(p) for p in packages}
+    by_key: dict[tuple[str, str], int] = {}
+    for p in packages:
+        name = identities[id(p)][0]
+        if name:
+            by_key[(p.kind, name)] = id(p)
+        by_key[(p.kind, "/" + os.path.normpath(p.path or "."))] = id(p)
+    edges: dict[int, set[int]] = {}
+    for p in packages:
+        for dep in identities[id(p)][1]:
+            target = by_key.get((p.kind, dep))
+            if target is not None and target != id(p):
+                edges.setdefault(target, set()).add(id(p))
+    return edges
+
+
+def affected(packages: list[Package], changed: list[str]) -> list[Package]:
+    """Packages owning at least one changed file, plus every package that
+    depends on one of them, in discovery order."""
+    hit = set()
+    for rel in changed:
+        owners = [p for p in packages if p.contains(rel)]
+        if owners:
+            deepest = max(len(p.path) for p in owners)
+            # Polyglot dirs (package.json next to pyproject.toml) gate both
+            hit.update(id(p) for p in owners if len(p.path) == deepest)
+    if hit and len(packages) > 1:
+        edges = dependents(packages)
+        queue = list(hit)
+        while queue:
+            for dependent in edges.get(queue.pop(), ()):
+                if dependent not in hit:
+                    hit.add(dependent)
+                    queue.append(dependent)
+    return [p for p in packages if id(p) in hit]
+
+
+def dirty_files(worktree: str) -> list[str] | None:
+    """Files differing from HEAD, including untracked; None if git fails."""
+    import subprocess
+    try:
+        result = subprocess.run(
+            ["git", "status", "--porcelain", "-z", "--untracked-files=all"],
+            capture_output=True,
+            timeout=30,
+            cwd=worktree,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    files, entries = [], result.stdout.decode("utf-8", "surrogateescape").split("\0")
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        if len(entry) > 3:
+            files.append(entry[3:])
+            if entry[0] in "RC":
+                i += 1      # rename source follows
+        i += 1
+    return files
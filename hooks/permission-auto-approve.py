@@ -101,8 +101,11 @@ SAFE_BASH_COMMANDS = [
     r'^npx\s+convex\s+(env\s+list|dashboard|logs)',
 ]
 
-# Compile patterns for efficiency
-SAFE_BASH_PATTERNS = [re.compile(p, re.IGNORECASE) for p in SAFE_BASH_COMMANDS]
+# Tools whose safe patterns are indexed by subcommand too
+SUBCOMMAND_TOOLS = {"git", "gh", "npm", "pnpm", "vercel", "npx"}
+
+# A command's first word and the word after it, as index keys
+COMMAND_WORDS = re.compile(r"(\w+)(?:\s+(\w+))?")
 
 # --- NEVER AUTO-APPROVE ---
 # Even if they match safe patterns, block these
@@ -114,7 +117,11 @@ NEVER_APPROVE = [
     r'>\s',              # redirect to file
     r'>>\s',             # append to file
     r'\|\s*tee\b',       # pipe to tee
-    r'curl.*-[dXP]',     # curl with POST/PUT/DELETE
+    # curl with POST/PUT/DELETE. Matching only after the first curl on a
+    # line keeps it linear; a lookahead plus backreference is an atomic
+    # group that also compiles before Python 3.11 (named: this list is
+    # joined into one regex)
+    r'^(?=(?P<curl>.*?curl))(?P=curl).*-[dXP]',
     r'wget\s',           # wget downloads
     r'sudo\b',
     r'su\b',
@@ -126,22 +133,85 @@ NEVER_APPROVE = [
     r'killall\b',
 ]
 
-NEVER_APPROVE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in NEVER_APPROVE]
+# Compiled into one alternation: one search per command
+NEVER_APPROVE_ANY = re.compile("|".join(f"(?:{p})" for p in NEVER_APPROVE),
+                               re.IGNORECASE | re.MULTILINE)
+
+
+def index_keys(pattern: str) -> list[str] | None:
+    """
+    Index keys of a safe pattern: its first word ("ls"), or for
+    SUBCOMMAND_TOOLS the first word and subcommand(s) ("git status").
+    None if the pattern doesn't start with a plain word, so it must be
+    tried against every command.
+
+    Keys are whole words, like the lookup: `^git\s+(diff|show)` is
+    found for `git diff` but no longer for `git difftool`.
+    """
+    m = re.match(r"\^([a-z0-9_-]+)(.*)$", pattern)
+    if not m:
+        return None
+    literal, rest = m.groups()
+    word = re.match(r"\w*", literal).group()
+    # "ls" must be a whole word ("^ls\b"); "ast" in "^ast-grep" already is
+    if not word or (word == literal and not re.match(r"\\b|\\s|\$", rest)):
+        return None
+    if word not in SUBCOMMAND_TOOLS:
+        return [word]
+
+    sub = re.match(r"\\s\+(?:\(([^()]*)\)|([a-z0-9_-]+))", rest)
+    if not sub:
+        return [word]
+    keys = []
+    for alternative in (sub.group(1) or sub.group(2)).split("|"):
+        subcommand = re.match(r"\w*", alternative).group()
+        if not subcommand or (subcommand != alternative and alternative[len(subcommand)] not in "\\-"):
+            return [word]
+        keys.append(f"{word} {subcommand}")
+    return keys
+
+
+class SafeCommandIndex:
+    """Safe patterns bucketed by index_keys(), so a command is only tried
+    against the few patterns for its first word and subcommand."""
+
+    def __init__(self, patterns: list[str]):
+        self.buckets: dict[str, list[re.Pattern]] = {}
+        self.unkeyed: list[re.Pattern] = []
+        for pattern in patterns:
+            compiled = re.compile(pattern, re.IGNORECASE)
+            keys = index_keys(pattern)
+            if keys is None:
+                self.unkeyed.append(compiled)
+            for key in keys or ():
+                self.buckets.setdefault(key, []).append(compiled)
+
+    def candidates(self, cmd: str) -> list[re.Pattern]:
+        m = COMMAND_WORDS.match(cmd)
+        if not m:
+            return self.unkeyed
+        first = m.group(1).lower()
+        found = self.buckets.get(first, []) + self.unkeyed
+        if first in SUBCOMMAND_TOOLS and m.group(2):
+            found += self.buckets.get(f"{first} {m.group(2).lower()}", [])
+        return found
+
+    def match(self, cmd: str) -> bool:
+        return any(pattern.match(cmd) for pattern in self.candidates(cmd))
+
+
+# Compiled into buckets by first word and subcommand
+SAFE_BASH_INDEX = SafeCommandIndex(SAFE_BASH_COMMANDS)
 
 
 def is_safe_bash(cmd: str) -> bool:
     """Check if bash command is safe for auto-approval."""
     # First check never-approve patterns
-    for pattern in NEVER_APPROVE_PATTERNS:
-        if pattern.search(cmd):
-            return False
+    if NEVER_APPROVE_ANY.search(cmd):
+        return False
 
-    # Then check if it matches any safe pattern
-    for pattern in SAFE_BASH_PATTERNS:
-        if pattern.match(cmd.strip()):
-            return True
-
-    return False
+    # Then check the safe patterns for its first word (and subcommand)
+    return SAFE_BASH_INDEX.match(cmd.strip())
 
 
 def is_safe_tool(tool_name: str, tool_input: dict) -> bool:
@@ -11,7 +11,6 @@ These issues break collaboration and bloat repositories.
 import json
 import re
 import sys
-from pathlib import Path
 
 
 # Machine-specific path patterns (common home directories)
@@ -61,6 +60,8 @@ def detect_issues(file_path: str, content: str) -> tuple[str, str] | None:
     if not content:
         return None
 
+    from pathlib import Path
+
     # Check for hardcoded home paths in shell scripts and config files
     shell_extensions = {'.sh', '.bash', '.zsh', ''}
     config_files = {'lefthook', 'husky', '.gitconfig', '.env'}
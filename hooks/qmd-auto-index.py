@@ -6,7 +6,6 @@ Non-blocking — fires and forgets so it never delays Claude's response.
 """
 import json
 import os
-import subprocess
 import sys
 
 
@@ -30,6 +29,7 @@ def main():
 
     qmd_bin = os.path.expanduser("~/.bun/bin/qmd")
     if os.path.exists(qmd_bin):
+        import subprocess
         subprocess.Popen(
             [qmd_bin, "update"],
             stdout=subprocess.DEVNULL,
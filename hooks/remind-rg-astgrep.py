@@ -11,77 +11,86 @@ import json
 import sys
 import re
 
-def main():
-    try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+def build_reminder(tool_name: str, tool_input: dict) -> str | None:
+    """Return the reminder message for this tool call, or None."""
+    # Check for Grep tool usage
+    if tool_name == "Grep":
+        return (
+            "🔍 Reminder: The Grep tool already uses ripgrep (rg) internally for optimal performance. "
+            "For semantic code search, consider using ast-grep for structural pattern matching."
+        )
 
-        tool_name = input_data.get("tool_name", "")
-        tool_input = input_data.get("tool_input", {})
+    # Check for Bash commands containing grep
+    if tool_name != "Bash":
+        return None
 
-        # Initialize response
-        response = {
-            "continue": True,  # Don't block the tool call
-            "suppressOutput": True  # Don't show raw output in transcript
-        }
+    command = tool_input.get("command", "")
+
+    # Check if command contains grep (but not ripgrep or ast-grep)
+    grep_pattern = r'\bgrep\b'
+    rg_pattern = r'\brg\b|\bripgrep\b'
+    ast_pattern = r'\bast-grep\b'
 
-        # Check for Grep tool usage
-        if tool_name == "Grep":
-            response["systemMessage"] = (
-                "🔍 Reminder: The Grep tool already uses ripgrep (rg) internally for optimal performance. "
-                "For semantic code search, consider using ast-grep for structural pattern matching."
-            )
+    if (not re.search(grep_pattern, command) or
+            re.search(rg_pattern, command) or
+            re.search(ast_pattern, command)):
+        return None
 
-        # Check for Bash commands containing grep
-        elif tool_name == "Bash":
-            command = tool_input.get("command", "")
+    # Provide context-aware suggestions
+    suggestions = []
 
-            # Check if command contains grep (but not ripgrep or ast-grep)
-            grep_pattern = r'\bgrep\b'
-            rg_pattern = r'\brg\b|\bripgrep\b'
-            ast_pattern = r'\bast-grep\b'
+    # Basic grep usage
+    if re.search(r'grep\s+["\'].*?["\']', command) or re.search(r'grep\s+-\w*\s+["\'].*?["\']', command):
+        suggestions.append("• Use 'rg <pattern>' for faster file content search")
 
-            if (re.search(grep_pattern, command) and
-                not re.search(rg_pattern, command) and
-                not re.search(ast_pattern, command)):
+    # Recursive grep
+    if re.search(r'grep\s+-r', command):
+        suggestions.append("• Use 'rg <pattern>' (recursive by default)")
 
-                # Provide context-aware suggestions
-                suggestions = []
+    # Case insensitive
+    if re.search(r'grep\s+-i', command):
+        suggestions.append("• Use 'rg -i <pattern>' for case-insensitive search")
 
-                # Basic grep usage
-                if re.search(r'grep\s+["\'].*?["\']', command) or re.search(r'grep\s+-\w*\s+["\'].*?["\']', command):
-                    suggestions.append("• Use 'rg <pattern>' for faster file content search")
+    # Files with matches only
+    if re.search(r'grep\s+-l', command):
+        suggestions.append("• Use 'rg -l <pattern>' to list files with matches")
 
-                # Recursive grep
-                if re.search(r'grep\s+-r', command):
-                    suggestions.append("• Use 'rg <pattern>' (recursive by default)")
+    # For code structure search
+    if re.search(r'grep.*\b(function|class|def|impl|struct)\b', command):
+        suggestions.append("• Consider 'ast-grep' for semantic code structure search")
 
-                # Case insensitive
-                if re.search(r'grep\s+-i', command):
-                    suggestions.append("• Use 'rg -i <pattern>' for case-insensitive search")
+    # Build the message
+    message = "🔍 Performance tip: Consider using ripgrep (rg) or ast-grep instead of grep:\n"
 
-                # Files with matches only
-                if re.search(r'grep\s+-l', command):
-                    suggestions.append("• Use 'rg -l <pattern>' to list files with matches")
+    if suggestions:
+        message += "\n".join(suggestions)
+    else:
+        message += (
+            "• 'rg <pattern>' - Faster alternative to grep with better defaults\n"
+            "• 'ast-grep' - Semantic code search for structural patterns"
+        )
 
-                # For code structure search
-                if re.search(r'grep.*\b(function|class|def|impl|struct)\b', command):
-                    suggestions.append("• Consider 'ast-grep' for semantic code structure search")
+    message += "\n\nThese tools are pre-installed and optimized for code search."
+    return message
 
-                # Build the message
-                message = "🔍 Performance tip: Consider using ripgrep (rg) or ast-grep instead of grep:\n"
 
-                if suggestions:
-                    message += "\n".join(suggestions)
-                else:
-                    message += (
-                        "• 'rg <pattern>' - Faster alternative to grep with better defaults\n"
-                        "• 'ast-grep' - Semantic code search for structural patterns"
-                    )
+def main():
+    try:
+        # Read JSON input from stdin
+        input_data = json.load(sys.stdin)
+
+        tool_name = input_data.get("tool_name", "")
+        tool_input = input_data.get("tool_input", {})
 
-                message += "\n\nThese tools are pre-installed and optimized for code search."
+        # Initialize response
+        response = {
+            "continue": True,  # Don't block the tool call
+            "suppressOutput": True  # Don't show raw output in transcript
+        }
 
-                response["systemMessage"] = message
+        message = build_reminder(tool_name, tool_input)
+        if message:
+            response["systemMessage"] = message
 
         # Output the response
         print(json.dumps(response))
@@ -97,4 +106,4 @@ def main():
         sys.exit(0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
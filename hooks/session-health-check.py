@@ -9,6 +9,8 @@ import os
 import subprocess
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 
 def get_disk_percent():
     """Get disk usage percentage."""
@@ -62,6 +64,16 @@ def count_orphan_test_processes():
     return count
 
 
+def reap_type_servers():
+    """Reap warm type-check servers of stop-quality-gate that are dead or
+    idle past their timeout. Returns (running, reaped)."""
+    try:
+        from lib.typeserver import reap
+        return reap()
+    except Exception:
+        return 0, 0
+
+
 def main():
     warnings = []
 
@@ -80,6 +92,14 @@ def main():
             f"Run: pkill -f vitest"
         )
 
+    running, reaped = reap_type_servers()
+    if reaped:
+        from lib.typeserver import REGISTRY_DIR
+        warnings.append(
+            f"Reaped {reaped} stale type-check server(s); "
+            f"{running} still warm ({REGISTRY_DIR})"
+        )
+
     if warnings:
         message = "[codex] ⚠️ SYSTEM HEALTH:\n" + "\n".join(warnings)
         print(json.dumps({"message": message}))
@@ -7,12 +7,71 @@ STRICT mode: blocks completion (exit 2) on any type/lint/test failure.
 Claude must fix issues before being allowed to complete.
 
 This implements the Boris Cherny pattern: "Give Claude a way to verify its work."
+
+Checks run concurrently (up to `parallelism` at once). A failure cancels
+every check ordered after it; earlier checks finish, so the failure
+reported is the same one a sequential run would report.
+
+Green runs are cached by a fingerprint of the working tree, toolchain and
+install state (lib/gate_cache.py); a Stop after a turn that changed
+nothing passes without running anything.
+
+With "testSelection": "impact", the test check only runs the tests that
+the files changed since this worktree's last green run can affect
+(lib/impact.py). The full suite still runs every `fullEvery` green gates,
+when selection can't tell, or when QUALITY_GATE_FULL=1 is set.
+
+Commands run their tools directly: node_modules/.bin, the project venv,
+cargo/go toolchains, then PATH, resolved once per lockfile state
+(lib/toolchain.py) instead of forking `which` and `pnpm` per check.
+
+In a monorepo or polyglot repo (pnpm/npm workspaces, Cargo workspaces,
+go.work, several pyproject roots; lib/workspace.py), only the packages
+owning files changed since the last green run, and the workspace
+packages depending on them, are gated, each with its own checks, all
+under the one `parallelism` cap.
+
+Each check runs in its own process group under lib/procgov.py: a process
+tree RSS ceiling, RLIMIT_CPU, and on timeout, breach or cancellation the
+whole tree is killed, not just the direct child. Wall time, CPU time and
+peak RSS per check are reported. Output is captured through a bounded
+head/tail ring plus error-like lines (lib/capture.py), so megabytes of
+`go test -v` neither pile up in memory nor flood the transcript.
+
+With "warmTypecheck" on, type checks are answered by a per-project
+`tsc --noEmit --watch` kept alive between turns
+(lib/typeserver.py): the gate waits for the watcher's first cycle that
+saw the current sources instead of rebuilding the program cold. Servers
+exit after `typeServerIdleMinutes` without a query; session-health-check
+reaps any that outlive it. If no fresh cycle arrives in time, the check
+runs cold as usual.
+
+Config: ~/.claude/config/quality-gate.json
+  {"parallelism": 3, "timeout": 120, "cache": true, "cacheEntries": 64,
+   "testSelection": "full", "fullEvery": 10, "maxRssMb": 8192, "cpuSeconds": 900,
+   "warmTypecheck": false, "typeServerIdleMinutes": 15}
 """
-import subprocess
 import sys
 import os
 import json
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+CONFIG_PATH = os.path.expanduser("~/.claude/config/quality-gate.json")
+
+DEFAULT_CONFIG = {
+    "parallelism": 3,   # checks running at once; 1 = sequential
+    "timeout": 120,     # seconds per check
+    "cache": True,      # skip checks when the tree matches a green run
+    "cacheEntries": 64, # green fingerprints kept per repository (LRU)
+    "testSelection": "full",  # "impact": only tests affected by changes
+    "fullEvery": 10,    # impact mode: full suite every Nth run (0 = never)
+    "maxRssMb": 8192,   # per check, whole process tree; killed above it
+    "cpuSeconds": 900,  # RLIMIT_CPU per process in a check's tree
+    "warmTypecheck": False,       # answer type checks from watch-mode servers
+    "typeServerIdleMinutes": 15,  # warm servers exit after this long unused
+}
+
 def get_hook_input():
     """Parse hook input from stdin."""
     try:
@@ -20,6 +79,14 @@ def get_hook_input():
     except:
         return {}
 
+def load_config():
+    """Load config with fallback to defaults."""
+    try:
+        with open(CONFIG_PATH) as f:
+            return {**DEFAULT_CONFIG, **json.load(f)}
+    except (OSError, json.JSONDecodeError):
+        return DEFAULT_CONFIG
+
 def detect_project(cwd):
     """Detect project type based on config files."""
     if os.path.exists(os.path.join(cwd, "package.json")):
@@ -32,76 +99,234 @@ def detect_project(cwd):
         return "go"
     return None
 
-def has_command(cmd):
-    """Check if a command exists."""
-    try:
-        subprocess.run(
-            ["which", cmd],
-            capture_output=True,
-            check=True
-        )
-        return True
-    except:
-        return False
-
-def run_checks(project_type, cwd):
-    """
-    Run quality checks in order: type check -> lint -> test.
-    Short-circuit on first failure.
-    Returns (success, failed_check_name, output)
-    """
-    checks = []
+def resolve_checks(checks, toolchain):
+    """Checks with concrete binaries (lib/toolchain.py); checks whose tool
+    isn't installed are dropped."""
+    resolved = []
+    for name, cmd in checks:
+        cmd = toolchain.resolve(cmd)
+        if cmd:
+            resolved.append((name, cmd))
+    toolchain.save()
+    return resolved
 
+def checks_for(project_type):
+    """(name, command) pairs in report order: type check -> lint -> test."""
     if project_type == "node":
         # Just use pnpm test - let package.json handle the test runner flags
         # This avoids issues where package.json already includes 'vitest run'
         # and we'd end up with 'vitest run --run --passWithNoTests'
-        checks = [
+        return [
             ("Type check", ["pnpm", "tsc", "--noEmit"]),
             ("Lint", ["pnpm", "lint"]),
             ("Test", ["pnpm", "test"]),
         ]
-    elif project_type == "python":
-        checks = [
+    if project_type == "python":
+        return [
             ("Type check", ["pyright"]),
             ("Lint", ["ruff", "check", "."]),
             ("Test", ["pytest", "-x", "--tb=short"]),
         ]
-    elif project_type == "rust":
-        checks = [
+    if project_type == "rust":
+        return [
             ("Check", ["cargo", "check"]),
             ("Clippy", ["cargo", "clippy", "--", "-D", "warnings"]),
             ("Test", ["cargo", "test"]),
         ]
-    elif project_type == "go":
-        checks = [
+    if project_type == "go":
+        return [
             ("Vet", ["go", "vet", "./..."]),
             ("Test", ["go", "test", "-v", "./..."]),
         ]
+    return []
 
-    for name, cmd in checks:
-        # Skip if command doesn't exist
-        if not has_command(cmd[0]):
-            continue
+class CheckRunner:
+    """Runs checks concurrently with ordered fail-fast cancellation.
+
+    Checks start in list order. When check i fails, checks after i are
+    killed or never started; checks before i keep running, since one of
+    them failing too would take precedence in the report.
+    """
+
+    def __init__(self, checks, parallelism, limits, warm=None):
+        import threading
+        from lib.toolchain import bin_path
+        self.checks = checks            # (name, command, cwd)
+        self.parallelism = max(1, parallelism)
+        self.limits = limits
+        self.warm = warm                # (idle seconds, worktree, files) or None
+        self.warm_hits = set()          # indices answered by a warm server
+        self.usage = {}                 # index -> Result of finished checks
+        self.envs = {
+            cwd: {**os.environ, "CI": "true", "PATH": bin_path(cwd)}
+            for cwd in {cwd for _, _, cwd in checks}
+        }
+        self.lock = threading.Lock()
+        self.procs = {}                 # index -> running GovernedProcess
+        self.cancel_after = len(checks)  # indices above this are cancelled
 
+    def cancelled(self, index):
+        return index > self.cancel_after
+
+    def run_warm(self, index):
+        """(returncode, output) from the check's warm type-check server;
+        None if it has none or it has no fresh result in time."""
+        import time
+        from lib import typeserver
+        from lib.procgov import Result
+        name, cmd, cwd = self.checks[index]
+        watch = typeserver.watch_command(cmd)
+        if watch is None:
+            return None
+        kind, argv = watch
+        idle, worktree, files = self.warm
+        started = time.monotonic()
+        try:
+            key = typeserver.ensure_server(kind, argv, cwd, self.envs[cwd], idle)
+        except OSError:
+            return None     # registry unusable (e.g. another user's): run cold
+        files = typeserver.source_files(kind, cwd, worktree, files)
+        answer = typeserver.query(key, files, self.limits.timeout, lambda: self.cancelled(index))
+        if answer is not None:
+            result = Result()
+            result.returncode = answer[0]
+            result.wall = time.monotonic() - started
+            self.usage[index] = result
+            self.warm_hits.add(index)
+        return answer
+
+    def run_one(self, index):
+        """(returncode or None if skipped/cancelled, output)."""
+        from lib.capture import BoundedCapture
+        from lib.procgov import GovernedProcess
+        name, cmd, cwd = self.checks[index]
+        if self.warm and name.startswith("Type check"):
+            answer = self.run_warm(index)
+            if self.cancelled(index):
+                return None, ""
+            if answer is not None:
+                return answer
+        with self.lock:
+            if self.cancelled(index):
+                return None, ""
+            # Head + tail + error lines, constant memory (docs/bounded-io.md)
+            proc = GovernedProcess(cmd, cwd, self.envs[cwd], self.limits, BoundedCapture)
+            try:
+                proc.start()
+            except FileNotFoundError:
+                return None, ""  # Skip if command not found
+            self.procs[index] = proc
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120,
-                cwd=cwd,
-                env={**os.environ, "CI": "true"}
-            )
-            if result.returncode != 0:
-                output = result.stdout + result.stderr
-                return (False, name, output.strip())
-        except subprocess.TimeoutExpired:
-            return (False, name, f"{name} timed out after 120s")
-        except FileNotFoundError:
-            continue  # Skip if command not found
-
-    return (True, None, None)
+            result = proc.wait()
+        finally:
+            with self.lock:
+                self.procs.pop(index, None)
+        if result.killed == "cancelled" or self.cancelled(index):
+            return None, ""
+        self.usage[index] = result
+        if result.killed == "timeout":
+            return -1, f"{name} timed out after {self.limits.timeout}s"
+        if result.killed == "memory":
+            return -1, (f"{name} exceeded {self.limits.max_rss_mb} MB RSS and was killed "
+                        f"with its process tree\n\n{result.output}").strip()
+        if result.killed == "cpu":
+            return -1, (f"{name} exceeded {self.limits.cpu_seconds}s of CPU time\n\n"
+                        f"{result.output}").strip()
+        return result.returncode, result.output
+
+    def fail(self, index):
+        """Cancel every check ordered after index."""
+        with self.lock:
+            if index >= self.cancel_after:
+                return
+            self.cancel_after = index
+            for other, proc in self.procs.items():
+                if other > index:
+                    proc.kill("cancelled")
+
+    def run(self):
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        failures = {}
+        with ThreadPoolExecutor(max_workers=self.parallelism) as pool:
+            futures = {pool.submit(self.run_one, i): i for i in range(len(self.checks))}
+            for future in as_completed(futures):
+                index = futures[future]
+                returncode, output = future.result()
+                if returncode:
+                    failures[index] = output
+                    self.fail(index)
+        if not failures:
+            return (True, None, None)
+        first = min(failures)
+        return (False, self.checks[first][0], failures[first])
+
+def select_tests(checks, project_type, cwd, repo, hashes, config):
+    """
+    Replace the Test check with the tests affected by changes since the
+    last green run. Returns (checks, ran_full_suite).
+    """
+    from lib import gate_cache, impact
+    green = gate_cache.last_green(repo)
+    if green is None or os.environ.get("QUALITY_GATE_FULL") == "1":
+        return checks, True
+    full_every = config["fullEvery"]
+    if full_every and green.get("sinceFull", 0) >= full_every - 1:
+        return checks, True
+
+    changed = gate_cache.changed_files(green["files"], hashes)
+    test_cmd = impact.select_tests(project_type, cwd, repo.worktree, changed, hashes)
+    if test_cmd is None:
+        return checks, True
+    selected = [(name, cmd) for name, cmd in checks if name != "Test"]
+    if test_cmd:
+        selected.append(("Test", test_cmd))
+    return selected, False
+
+def gate_targets(cwd, repo, hashes, session=None):
+    """
+    (label, project_type, directory) for each project to gate. In a
+    monorepo or polyglot repo, only the packages owning files changed since
+    the last green run (before the first one: files this session changed,
+    else uncommitted files), each labelled with its path; otherwise the
+    project at cwd, unlabelled.
+    """
+    single = [("", detect_project(cwd), cwd)] if detect_project(cwd) else []
+    if hashes is None:
+        return single
+    from lib import gate_cache, workspace
+    packages = workspace.discover(repo.worktree, hashes)
+    if len(packages) <= 1:
+        return single
+
+    green = gate_cache.last_green(repo)
+    if green is not None:
+        changed = gate_cache.changed_files(green["files"], hashes)
+    elif session is not None and session["worktree"] == repo.worktree:
+        changed = session["files"]
+    else:
+        changed = workspace.dirty_files(repo.worktree)
+        if changed is None:
+            return single
+    return [(p.path or ".", p.kind, p.root) for p in workspace.affected(packages, changed)]
+
+def run_checks(checks, config=DEFAULT_CONFIG, worktree=None, files=None):
+    """
+    Run quality checks concurrently, reporting the first failure in
+    package, then type check -> lint -> test order.
+    Checks are (name, command, cwd). worktree and files (relative paths of
+    its tracked and untracked files) enable warm type-check servers.
+    Returns (success, failed_check_name, output, usage)
+    """
+    from lib.procgov import Limits
+    limits = Limits(config["timeout"], config["maxRssMb"], config["cpuSeconds"])
+    warm = None
+    if config["warmTypecheck"] and files is not None:
+        warm = (config["typeServerIdleMinutes"] * 60, worktree, files)
+    runner = CheckRunner(checks, config["parallelism"], limits, warm)
+    success, failed_check, output = runner.run()
+    usage = [(checks[i][0] + (" [warm server]" if i in runner.warm_hits else ""), runner.usage[i])
+             for i in sorted(runner.usage)]
+    return success, failed_check, output, usage
 
 def check_for_web_project(cwd):
     """Check if this is a web project that needs UI verification."""
@@ -123,19 +348,62 @@ def main():
     hook_input = get_hook_input()
     cwd = hook_input.get("cwd", os.getcwd())
 
-    project_type = detect_project(cwd)
+    config = load_config()
+    impact = config["testSelection"] == "impact"
+
+    from lib.git import find_repo
+    from lib import gate_cache
+    repo, hashes, cache_key = find_repo(cwd), None, None
+    if repo is not None and repo.worktree is not None:
+        hashes = gate_cache.tree_hashes(repo)
 
-    if not project_type:
-        # Not a recognized project - allow completion
+    session = None
+    if hashes is not None and gate_cache.last_green(repo) is None:
+        # Shared with the other Stop hooks (lib/session_changes.py)
+        from lib.session_changes import changes
+        session = changes(hook_input)
+    targets = gate_targets(cwd, repo, hashes, session)
+    if not targets:
+        # Not a recognized project, or no package affected - allow completion
         sys.exit(0)
 
-    success, failed_check, output = run_checks(project_type, cwd)
+    from lib.toolchain import Toolchain
+    plans = []
+    for label, project_type, directory in targets:
+        toolchain = Toolchain(directory)
+        plans.append((label, project_type, directory, toolchain,
+                      resolve_checks(checks_for(project_type), toolchain)))
+
+    def labelled(label, checks):
+        return [(f"{name} ({label})" if label else name, cmd) for name, cmd in checks]
+
+    # Nothing changed since a green run (in any session or worktree)
+    if hashes is not None and config["cache"]:
+        all_checks = [c for label, *_, checks in plans for c in labelled(label, checks)]
+        cache_key = gate_cache.fingerprint(repo, cwd, all_checks, hashes)
+        if cache_key and gate_cache.is_green(repo, cache_key):
+            print("[stop-quality-gate] No changes since last green run (cached)")
+            sys.exit(0)
+
+    full_suite = True
+    run_list = []
+    for label, project_type, directory, toolchain, checks in plans:
+        if hashes is not None and impact:
+            checks, full = select_tests(checks, project_type, directory, repo, hashes, config)
+            checks = resolve_checks(checks, toolchain)
+            full_suite = full_suite and full
+        run_list += [(name, cmd, directory) for name, cmd in labelled(label, checks)]
+
+    success, failed_check, output, usage = run_checks(
+        run_list, config, repo.worktree if hashes is not None else None, hashes)
+    report = "\n".join(f"  {name}: {result.usage()}" for name, result in usage)
 
     if not success:
         # STRICT: Block completion, Claude must fix
         print(f"[stop-quality-gate] {failed_check} FAILED", file=sys.stderr)
         print(f"\n{output}", file=sys.stderr)
         print(f"\nFix these issues before completing.", file=sys.stderr)
+        print(f"\nResource usage:\n{report}", file=sys.stderr)
         sys.exit(2)  # Exit 2 = block stoppage
 
     # Check if UI verification is needed (informational)
@@ -143,7 +411,22 @@ def main():
         print("[stop-quality-gate] Web project detected with dev server running.")
         print("Consider using Chrome MCP to verify UI changes visually.")
 
-    print("[stop-quality-gate] All quality checks passed")
+    if hashes is not None:
+        # The file hashes are the baseline for impact selection and for
+        # finding affected packages next time. A test-selected run is not
+        # the full check list, so it isn't cached under that list's key
+        gate_cache.record_green(repo, cache_key if full_suite else None,
+                                config["cacheEntries"], hashes, full_suite)
+
+    gated = ", ".join(label for label, *_ in plans if label)
+    if gated:
+        print(f"[stop-quality-gate] Gated packages: {gated}")
+    if full_suite:
+        print("[stop-quality-gate] All quality checks passed")
+    else:
+        print("[stop-quality-gate] All quality checks passed (tests selected by impact)")
+    if report:
+        print(report)
     sys.exit(0)
 
 if __name__ == "__main__":
@@ -3,18 +3,28 @@
 Stripe deploy verification hook for Claude Code.
 
 When deploying projects with Stripe integration:
-1. Verifies webhook URLs don't redirect (Stripe won't follow redirects)
+1. Verifies webhook URLs don't redirect (Stripe won't follow redirects):
+   one unfollowed POST per URL, all URLs concurrently, under one deadline
 2. Checks env var configuration
 3. BLOCKS deploy if critical issues found
 
 PreToolUse hook - runs before Bash commands execute.
+
+The webhook inventory and its redirect verdicts are cached per project in
+/tmp/claude-hooks-{uid}/stripe-webhooks/{hash}.json (private to the user,
+lib/statedir.py) for WEBHOOK_CACHE_TTL seconds. Only passes are trusted
+from the cache: redirecting URLs are probed again before they block. At
+SessionStart (also registered) a stale cache is refreshed in a detached
+`stripe-deploy-reminder.py --refresh <dir>`, so a deploy normally reads
+the cache and only waits on the Stripe CLI when it is stale. Bash commands
+running `stripe webhook_endpoints create/update/delete` invalidate it.
 """
 import json
 import os
 import re
-import subprocess
 import sys
-from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Deploy command patterns
 DEPLOY_PATTERNS = [
@@ -28,10 +38,23 @@ DEPLOY_PATTERNS = [
 # Stripe indicators in env files
 STRIPE_INDICATORS = ['STRIPE_', 'NEXT_PUBLIC_STRIPE']
 
+# Webhook redirect probes: concurrent requests, seconds per request, and
+# seconds for all of them together
+PROBE_WORKERS = 8
+PROBE_TIMEOUT = 10
+PROBE_DEADLINE = 15
+
+# Seconds a fetched webhook inventory (and its verdicts) stays fresh
+WEBHOOK_CACHE_TTL = 900
+
+# stripe webhook_endpoints subcommands that change the inventory
+WEBHOOK_MUTATIONS = {"create", "update", "delete"}
+
 
-def has_stripe_integration() -> bool:
-    """Check if current project has Stripe integration."""
-    cwd = Path.cwd()
+def has_stripe_integration(directory: str | None = None) -> bool:
+    """Check if the project (default: current directory) has Stripe integration."""
+    from pathlib import Path
+    cwd = Path(directory or os.getcwd())
 
     for env_file in ['.env.local', '.env', '.env.example']:
         path = cwd / env_file
@@ -46,8 +69,10 @@ def has_stripe_integration() -> bool:
     return False
 
 
-def get_webhook_urls() -> list[str]:
-    """Get webhook URLs from Stripe CLI (production, live mode)."""
+def get_webhook_urls() -> list[str] | None:
+    """Get webhook URLs from Stripe CLI (production, live mode); None if
+    the CLI failed."""
+    import subprocess
     try:
         result = subprocess.run(
             ['stripe', '-p', 'production', 'webhook_endpoints', 'list', '--live'],
@@ -56,45 +81,204 @@ def get_webhook_urls() -> list[str]:
             timeout=10
         )
         if result.returncode != 0:
-            return []
+            return None
 
         # Extract URLs from JSON output
         urls = re.findall(r'"url":\s*"(https://[^"]+)"', result.stdout)
         return urls
     except Exception:
-        return []
+        return None
 
 
-def check_url_for_redirect(url: str) -> tuple[bool, str | None]:
+def check_url_for_redirect(url: str, timeout: float = PROBE_TIMEOUT) -> tuple[bool, str | None]:
     """
-    Check if URL returns a redirect.
+    Check if URL returns a redirect, with one POST that is not followed.
     Returns (has_redirect, redirect_location).
+    Raises OSError (incl. timeouts) or http.client.HTTPException if the
+    URL can't be checked.
     """
+    import http.client
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    if parts.scheme == "https":
+        conn = http.client.HTTPSConnection(parts.hostname, parts.port, timeout=timeout)
+    else:
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
     try:
-        result = subprocess.run(
-            ['curl', '-s', '-o', '/dev/null', '-w', '%{http_code}', '-I', '-X', 'POST', url],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        http_code = result.stdout.strip()
-
-        if http_code.startswith('3'):
-            # Get redirect location
-            loc_result = subprocess.run(
-                ['curl', '-s', '-I', '-X', 'POST', url],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            for line in loc_result.stdout.split('\n'):
-                if line.lower().startswith('location:'):
-                    return True, line.split(':', 1)[1].strip()
-            return True, None
-
+        # Same request Stripe makes, minus the payload; the body is never read
+        conn.request("POST", path, body=b"", headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        if 300 <= response.status < 400:
+            return True, response.getheader("Location")
         return False, None
-    except Exception:
-        return False, None  # Can't check, allow through
+    finally:
+        conn.close()
+
+
+def probe_urls(urls: list[str], deadline: float = PROBE_DEADLINE) -> dict[str, tuple[bool, str | None] | None]:
+    """
+    Check all URLs concurrently (at most PROBE_WORKERS at once), giving up
+    after deadline seconds overall.
+    Returns url -> (has_redirect, redirect_location), or None if the URL
+    couldn't be checked in time.
+    """
+    import queue
+    import threading
+    import time
+
+    results: dict[str, tuple[bool, str | None] | None] = {url: None for url in urls}
+    pending: queue.SimpleQueue = queue.SimpleQueue()
+    for url in urls:
+        pending.put(url)
+    end = time.monotonic() + deadline
+
+    def worker():
+        while True:
+            try:
+                url = pending.get_nowait()
+            except queue.Empty:
+                return
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                results[url] = check_url_for_redirect(url, min(PROBE_TIMEOUT, remaining))
+            except Exception:
+                pass  # Can't check, allow through
+
+    # Daemon threads: a probe stuck past the deadline doesn't hold up exit
+    workers = [threading.Thread(target=worker, daemon=True)
+               for _ in range(min(PROBE_WORKERS, len(urls)))]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join(max(0.0, end - time.monotonic()))
+    return dict(results)
+
+
+def cache_path(directory: str) -> str:
+    """Cache file in the user's private state directory; OSError if that
+    can't be verified (a planted {"urls": []} would pass every deploy)."""
+    import hashlib
+    from lib.statedir import private_dir
+    key = hashlib.sha1(os.path.abspath(directory).encode()).hexdigest()[:16]
+    return os.path.join(private_dir("stripe-webhooks"), f"{key}.json")
+
+
+def load_inventory(directory: str) -> dict | None:
+    """Cached {"fetched_at", "urls", "results"} if still fresh, else None."""
+    import time
+    try:
+        with open(cache_path(directory)) as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    fetched_at = cached.get("fetched_at")
+    if fetched_at is None or time.time() - fetched_at > WEBHOOK_CACHE_TTL:
+        return None
+    if cached.get("invalidated_at", 0) >= fetched_at:
+        return None
+    return cached
+
+
+def save_inventory(directory: str, started_at: float, urls: list[str], results: dict) -> None:
+    """Store an inventory fetched from started_at on, unless it was
+    invalidated while the fetch was running."""
+    try:
+        path = cache_path(directory)
+    except OSError:
+        return
+    try:
+        with open(path) as f:
+            invalidated_at = json.load(f).get("invalidated_at", 0)
+    except (OSError, json.JSONDecodeError, AttributeError):
+        invalidated_at = 0
+    if invalidated_at >= started_at:
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump({"fetched_at": started_at, "urls": urls,
+                       "results": {url: list(r) if r else None for url, r in results.items()}}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def invalidate_inventory(directory: str) -> None:
+    import time
+    try:
+        path = cache_path(directory)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"invalidated_at": time.time()}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def refresh_inventory(directory: str) -> tuple[list[str] | None, dict]:
+    """Fetch the inventory, probe every URL and cache the result.
+    Returns (urls or None if the CLI failed, url -> verdict)."""
+    import time
+    started_at = time.time()
+    urls = get_webhook_urls()
+    if urls is None:
+        return None, {}
+    results = probe_urls(urls)
+    save_inventory(directory, started_at, urls, results)
+    return urls, results
+
+
+def webhook_inventory(directory: str) -> tuple[list[str] | None, dict]:
+    """(urls, url -> verdict) from the cache when fresh, else fetched now.
+    Only passes are taken from the cache: URLs the cached run couldn't
+    reach, and redirecting ones, are probed again (a redirect may have
+    been fixed in DNS or host config since), one request each. A URL
+    that redirected and can't be reached now keeps its redirect."""
+    cached = load_inventory(directory)
+    if cached is None:
+        return refresh_inventory(directory)
+    urls = cached["urls"]
+    results = {url: tuple(r) if r else None for url, r in cached["results"].items()}
+    recheck = [url for url in urls if results.get(url) is None or results[url][0]]
+    if recheck:
+        for url, verdict in probe_urls(recheck).items():
+            if verdict is not None:
+                results[url] = verdict
+        save_inventory(directory, cached["fetched_at"], urls, results)
+    return urls, results
+
+
+def start_background_refresh(directory: str) -> None:
+    """Refresh a stale inventory in a detached process."""
+    import subprocess
+    if load_inventory(directory) is not None:
+        return
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--refresh", directory],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=directory,
+        start_new_session=True,
+    )
+
+
+def is_webhook_mutation(cmd: str) -> bool:
+    """True if cmd runs `stripe ... webhook_endpoints create/update/delete`."""
+    from lib.shell import parse
+    for segment in parse(cmd).commands("stripe"):
+        words = segment.words
+        if "webhook_endpoints" in words:
+            rest = words[words.index("webhook_endpoints") + 1:]
+            if rest and rest[0] in WEBHOOK_MUTATIONS:
+                return True
+    return False
 
 
 def verify_webhook_urls() -> tuple[bool, str]:
@@ -102,14 +286,18 @@ def verify_webhook_urls() -> tuple[bool, str]:
     Verify all webhook URLs don't redirect.
     Returns (all_passed, message).
     """
-    urls = get_webhook_urls()
+    urls, results = webhook_inventory(os.getcwd())
 
     if not urls:
         return True, "No webhook URLs found to verify"
 
     issues = []
+    unchecked = 0
     for url in urls:
-        has_redirect, redirect_to = check_url_for_redirect(url)
+        if results.get(url) is None:
+            unchecked += 1
+            continue
+        has_redirect, redirect_to = results[url]
         if has_redirect:
             if redirect_to:
                 issues.append(f"  {url}\n    → Redirects to: {redirect_to}")
@@ -132,6 +320,9 @@ def verify_webhook_urls() -> tuple[bool, str]:
         ]
         return False, "\n".join(message)
 
+    if unchecked:
+        return True, (f"✓ {len(urls) - unchecked} of {len(urls)} webhook URLs verified "
+                      f"(no redirects); {unchecked} could not be reached")
     return True, f"✓ All {len(urls)} webhook URLs verified (no redirects)"
 
 
@@ -144,6 +335,12 @@ def check_command(cmd: str) -> tuple[str, bool, str]:
     if not cmd:
         return "allow", False, ""
 
+    # The cached inventory is about to go out of date; a deploy chained
+    # after the mutation is still checked below
+    mutation = "webhook_endpoints" in cmd and is_webhook_mutation(cmd)
+    if mutation:
+        invalidate_inventory(os.getcwd())
+
     # Check if this is a deploy command
     is_deploy = any(re.search(p, cmd, re.IGNORECASE) for p in DEPLOY_PATTERNS)
     if not is_deploy:
@@ -155,6 +352,9 @@ def check_command(cmd: str) -> tuple[str, bool, str]:
 
     # Verify webhook URLs for redirects
     urls_passed, urls_message = verify_webhook_urls()
+    if mutation:
+        # What was just fetched predates the mutation later in this command
+        invalidate_inventory(os.getcwd())
 
     if not urls_passed:
         return "block", True, urls_message
@@ -197,11 +397,21 @@ def warn(cmd: str, reason: str) -> None:
 
 
 def main():
+    if sys.argv[1:2] == ["--refresh"]:
+        refresh_inventory(sys.argv[2])
+        sys.exit(0)
+
     try:
         data = json.load(sys.stdin)
     except json.JSONDecodeError:
         sys.exit(0)
 
+    if data.get("hook_event_name") == "SessionStart":
+        directory = data.get("cwd") or os.getcwd()
+        if has_stripe_integration(directory):
+            start_background_refresh(directory)
+        sys.exit(0)
+
     if data.get("tool_name") != "Bash":
         sys.exit(0)
 
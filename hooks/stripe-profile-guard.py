@@ -16,9 +16,12 @@ test mode in favor of fully isolated sandbox accounts. If you need to test,
 use the sandbox account (profile: sandbox), not test-mode keys.
 """
 import json
+import os
 import re
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 # Commands that are safe without profile (don't touch account data)
 SAFE_PATTERNS = [
     r"^stripe\s+(--)?help",
@@ -38,11 +41,19 @@ HAS_LIVE_FLAG = re.compile(r"\s+--live\b")
 
 
 def check_command(cmd: str) -> tuple[bool, str]:
-    if not cmd:
-        return False, ""
-    cmd = cmd.strip()
-    if not re.match(r"^stripe\b", cmd):
+    """Check every stripe invocation in the command, including `cd x && stripe ...`."""
+    if not cmd or "stripe" not in cmd:
         return False, ""
+    from lib.shell import parse
+    for segment in parse(cmd).commands("stripe"):
+        blocked, reason = check_invocation(" ".join(segment.words))
+        if blocked:
+            return True, reason
+    return False, ""
+
+
+def check_invocation(cmd: str) -> tuple[bool, str]:
+    """Check one stripe invocation (argv joined, starting with `stripe`)."""
     for pattern in SAFE_PATTERNS:
         if re.search(pattern, cmd, re.IGNORECASE):
             return False, ""
@@ -9,7 +9,6 @@ start and outputs the current datetime so Claude can reason about time correctly
 import json
 import sys
 from datetime import datetime
-from zoneinfo import ZoneInfo
 
 def main():
     # Get local timezone
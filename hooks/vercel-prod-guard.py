@@ -8,9 +8,12 @@ Allows all other commands including explicit prod deploys.
 PreToolUse hook - runs before Bash commands execute.
 """
 import json
+import os
 import re
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 # Safe patterns - always allowed without checks
 SAFE_PATTERNS = [
     r"^(npx\s+)?vercel\s+(--)?help",
@@ -38,13 +41,23 @@ def check_command(cmd: str) -> tuple[bool, str]:
     Check Vercel command for environment clarity.
     Returns (should_block, reason).
     """
-    if not cmd:
+    if not cmd or "vercel" not in cmd:
         return False, ""
 
-    # Only check vercel commands
-    if not re.search(r"\bvercel\b", cmd):
-        return False, ""
+    # Only check vercel invocations: vercel ... or npx vercel ...
+    from lib.shell import parse
+    for segment in parse(cmd).segments:
+        words = segment.words
+        if words[:1] == ["vercel"] or words[:2] == ["npx", "vercel"]:
+            blocked, reason = check_invocation(" ".join(words))
+            if blocked:
+                return True, reason
+
+    return False, ""
+
 
+def check_invocation(cmd: str) -> tuple[bool, str]:
+    """Check one vercel invocation (argv joined)."""
     # Safe patterns pass through
     for pattern in SAFE_PATTERNS:
         if re.search(pattern, cmd, re.IGNORECASE):